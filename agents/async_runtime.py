@@ -0,0 +1,158 @@
+import asyncio
+import inspect
+import signal
+
+import zmq
+import zmq.asyncio
+
+
+class AsyncPublisher:
+    """Awaitable send() for a CommFramework publisher socket."""
+
+    def __init__(self, comm, socket):
+        self.comm = comm
+        self.socket = socket
+        self.async_socket = zmq.asyncio.Socket.from_socket(socket)
+
+    async def send(self, payload, msg_type=None, ticker=None, serializer=None):
+        agent, topic, frames = self.comm.encode_outgoing(self.socket, payload, msg_type, ticker, serializer)
+        seq = self.comm.sequences[(self.socket, topic)]
+        try:
+            await self.async_socket.send_multipart(frames, copy=False)
+        except zmq.ZMQError:
+            self.comm.unstamp(self.socket, topic, seq)
+            self.comm.metrics.inc("send_failed", agent, topic)
+            raise
+        self.comm.metrics.inc("published", agent, topic)
+
+
+class AsyncRuntime:
+    """Run agents as coroutines on one asyncio loop, on zmq.asyncio sockets.
+
+    Sockets come from the CommFramework (same ports, transport, high-water
+    marks, metrics and tracing) and are awaited instead of polled, so each
+    subscription is an idle task until a message arrives. Agents that define
+    `async def run_async(self, runtime)` run on the loop; other agents run
+    their blocking run() in a worker thread. stop() cancels every task;
+    agents release resources in `finally` blocks.
+    """
+
+    def __init__(self, comm, shutdown_timeout=5.0):
+        self.comm = comm
+        self.logger = comm.logger
+        self.shutdown_timeout = shutdown_timeout
+        self.tasks = set()
+        self.loop = None
+        self.stopping = None
+
+    def spawn(self, coroutine, name=None):
+        """Start a task owned by the runtime (cancelled on shutdown)."""
+        task = asyncio.get_running_loop().create_task(coroutine, name=name)
+        self.tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"❌ Task {task.get_name()} failed: {task.exception()!r}")
+
+    async def _call(self, callback, *args):
+        result = callback(*args)
+        if inspect.isawaitable(result):
+            await result
+
+    def every(self, interval, callback, name=None):
+        """Run `callback()` (plain or async) every `interval` seconds, without drifting."""
+        async def tick():
+            loop = asyncio.get_running_loop()
+            deadline = loop.time()
+            while True:
+                deadline = max(deadline + interval, loop.time())  # ✅ Skip ticks missed by a slow callback
+                await asyncio.sleep(deadline - loop.time())
+                try:
+                    await self._call(callback)
+                except Exception as e:
+                    self.logger.error(f"❌ Timer {name or callback} failed: {e}")
+        return self.spawn(tick(), name)
+
+    def call_later(self, delay, callback, name=None):
+        """Run `callback()` (plain or async) once after `delay` seconds."""
+        async def later():
+            await asyncio.sleep(delay)
+            await self._call(callback)
+        return self.spawn(later(), name)
+
+    def publisher(self, agent_name):
+        """Create the agent's publisher and return an AsyncPublisher (None if it failed)."""
+        socket = self.comm.create_publisher(agent_name)
+        return AsyncPublisher(self.comm, socket) if socket is not None else None
+
+    def subscribe(self, agent_name, handler, msg_types=None, tickers=None):
+        """Create the agent's subscriber and consume it in a task. Many tickers can share one socket."""
+        socket = self.comm.create_subscriber(agent_name, msg_types=msg_types, tickers=tickers)
+        if socket is None:
+            return None
+        return self.spawn(self.consume(socket, handler), name=f"{agent_name}-subscriber")
+
+    async def consume(self, socket, handler):
+        """Await messages on a CommFramework SUB socket and pass each one to `handler` (plain or async)."""
+        async_socket = zmq.asyncio.Socket.from_socket(socket)
+        tracer = self.comm.tracer
+        while True:
+            frames = await async_socket.recv_multipart(copy=False)
+            try:
+                await self._call(handler, self.comm.decode_incoming(socket, frames))
+            except Exception as e:
+                self.logger.error(f"❌ Error handling message on {self.comm.socket_names.get(socket)}: {e}")
+            finally:
+                if tracer:
+                    tracer.clear()  # ✅ Tasks spawned by the handler keep the trace; this one does not
+
+    async def run_in_thread(self, agent):
+        """Run a blocking agent in a worker thread; cancelling the task stops the agent."""
+        future = asyncio.ensure_future(asyncio.to_thread(agent.run))
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            agent.running = False
+            if hasattr(agent, "stop"):
+                agent.stop()
+            await asyncio.wait([future], timeout=self.shutdown_timeout)
+            raise
+
+    def stop(self, signum=None, frame=None):
+        """Request shutdown. Safe to call from any thread or as a signal handler."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+    async def run(self, agents):
+        """Run agents until stop() is called, then cancel every task."""
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows, or not running in the main thread
+
+        for agent in agents:
+            name = agent.__class__.__name__
+            coroutine = agent.run_async(self) if hasattr(agent, "run_async") else self.run_in_thread(agent)
+            self.spawn(coroutine, name=name)
+            self.logger.info(f"✅ {name} started on the asyncio runtime.")
+
+        await self.stopping.wait()
+        await self.shutdown()
+
+    async def shutdown(self):
+        """Cancel every task and wait for them to finish their cleanup."""
+        self.logger.info(f"🛑 Cancelling {len(self.tasks)} task(s)...")
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.shutdown_timeout)
+            if pending:
+                self.logger.warning(f"⚠️ {len(pending)} task(s) did not stop in time.")
+        self.logger.info("✅ Asyncio runtime stopped.")
@@ -0,0 +1,188 @@
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+# Builds bars from ticks (trades or quote updates, e.g. IBKR reqMktData) for
+# several bar specs at once:
+#   "<n>ms" / "<n>s" / "<n>m" / "<n>h"  time bars, aligned to the epoch (UTC)
+#   "<n>t"                              tick bars: one bar per n ticks
+#   "<n>v"                              volume bars: closed once n shares traded
+#                                       (the tick that crosses n stays in the bar)
+#
+# State per ticker and spec is the bar in progress plus the last finished bar,
+# whatever the tick rate. Ticks arrive in any order:
+# - A tick up to `lateness` seconds older than the ticker's newest tick still counts.
+#   Otherwise it is dropped and counted in `dropped`.
+# - A late tick of a time bar that is still open moves its open/close by timestamp.
+# - A late tick of the time bar just finished revises it, and the bar is emitted again.
+# - A late tick of an older bar is dropped.
+# - Time bars without newer ticks are finished by flush() once their end is `lateness` past.
+#
+# Finished bars are collected until drain(); bar_frames() turns them into one
+# DataFrame per (ticker, spec), the payload MarketDataAgent publishes as
+# "bars_<spec>" messages.
+
+TIME, TICK, VOLUME = "time", "tick", "volume"
+SPEC = re.compile(r"^(\d+(?:\.\d+)?)(ms|s|m|h|t|v)$")
+UNITS_NS = {"ms": 10 ** 6, "s": 10 ** 9, "m": 60 * 10 ** 9, "h": 3600 * 10 ** 9}
+FIELDS = ("Ticker", "Interval", "Date", "End", "Open", "High", "Low", "Close", "Volume", "Ticks", "Revised")
+
+
+def parse_bar_spec(spec):
+    """("5s" -> ("5s", "time", 5_000_000_000 ns); "100t" -> tick bars; "10000v" -> volume bars."""
+    match = SPEC.match(str(spec))
+    if not match:
+        raise ValueError(f"Unsupported bar spec '{spec}' (expected e.g. 5s, 1m, 100t, 10000v)")
+    value, unit = match.groups()
+    if unit in UNITS_NS:
+        return spec, TIME, int(float(value) * UNITS_NS[unit])
+    return spec, TICK if unit == "t" else VOLUME, float(value)
+
+
+class Bar:
+    __slots__ = ("key", "start", "end", "first", "last", "open", "high", "low", "close", "volume", "ticks")
+
+    def __init__(self, key, start, end, ts, price, size):
+        self.key = key  # Time bars: bucket number (start // length)
+        self.start, self.end = start, end
+        self.first = self.last = ts
+        self.open = self.high = self.low = self.close = price
+        self.volume = size
+        self.ticks = 1
+
+    def row(self, ticker, spec, revised=False):
+        end = self.end if self.end is not None else self.last
+        return (ticker, spec, self.start, end, self.open, self.high, self.low, self.close, self.volume,
+                self.ticks, revised)
+
+
+class BarAggregator:
+    """Incremental time, tick and volume bars for many tickers and specs at once."""
+
+    def __init__(self, specs=("5s", "1m"), lateness=2.0):
+        self.specs = [parse_bar_spec(spec) for spec in specs]
+        self.lateness = int(lateness * 1e9)
+        self.state = {}  # ticker -> [bars in progress per spec, last finished bars per spec, newest tick ns]
+        self.pending = []  # Finished (or revised) bar rows, see FIELDS
+        self.ticks = 0
+        self.dropped = 0
+
+    def on_tick(self, ticker, ts, price, size=0.0):
+        """Add a tick (`ts` in ns since the epoch, UTC) to every bar spec of its ticker."""
+        self.ticks += 1
+        state = self.state.get(ticker)
+        if state is None:
+            state = self.state[ticker] = [[None] * len(self.specs), [None] * len(self.specs), ts]
+        elif ts > state[2]:
+            state[2] = ts
+        elif state[2] - ts > self.lateness:
+            self.dropped += 1
+            return
+        current, previous = state[0], state[1]
+
+        for i, (spec, kind, length) in enumerate(self.specs):
+            bar = current[i]
+            if kind is TIME:
+                key = ts // length
+                if bar is None or key != bar.key:
+                    newest = bar if bar is not None else previous[i]
+                    if newest is None or key > newest.key:
+                        if bar is not None:
+                            previous[i] = bar
+                            self.pending.append(bar.row(ticker, spec))
+                        current[i] = Bar(key, key * length, key * length + length, ts, price, size)
+                        continue
+                    bar = previous[i]
+                    if bar is None or key != bar.key:
+                        self.dropped += 1
+                        continue
+                    self._update(bar, ts, price, size)
+                    self.pending.append(bar.row(ticker, spec, revised=True))
+                    continue
+                self._update(bar, ts, price, size)
+            else:
+                if bar is None:
+                    bar = current[i] = Bar(0, ts, None, ts, price, size)
+                else:
+                    # ✅ Arrival order decides which bar a tick joins; only the close follows timestamps
+                    if price > bar.high:
+                        bar.high = price
+                    elif price < bar.low:
+                        bar.low = price
+                    if ts >= bar.last:
+                        bar.last = ts
+                        bar.close = price
+                    bar.volume += size
+                    bar.ticks += 1
+                if (bar.ticks if kind is TICK else bar.volume) >= length:
+                    previous[i] = bar
+                    current[i] = None
+                    self.pending.append(bar.row(ticker, spec))
+
+    @staticmethod
+    def _update(bar, ts, price, size):
+        if price > bar.high:
+            bar.high = price
+        elif price < bar.low:
+            bar.low = price
+        if ts >= bar.last:
+            bar.last = ts
+            bar.close = price
+        elif ts < bar.first:
+            bar.first = ts
+            bar.open = price  # ✅ Out of order: the earliest tick opens the bar
+        bar.volume += size
+        bar.ticks += 1
+
+    def on_ticks(self, tickers, times, prices, sizes=None):
+        """Add a batch of ticks (sequences or NumPy arrays of equal length)."""
+        on_tick = self.on_tick
+        times = times.tolist() if isinstance(times, np.ndarray) else times
+        prices = prices.tolist() if isinstance(prices, np.ndarray) else prices
+        if sizes is None:
+            sizes = [0.0] * len(prices)
+        elif isinstance(sizes, np.ndarray):
+            sizes = sizes.tolist()
+        if isinstance(tickers, str):
+            for ts, price, size in zip(times, prices, sizes):
+                on_tick(tickers, ts, price, size)
+        else:
+            for ticker, ts, price, size in zip(tickers, times, prices, sizes):
+                on_tick(ticker, ts, price, size)
+
+    def flush(self, now=None):
+        """Finish time bars whose end is `lateness` behind `now` (ns, default: the clock); return how many."""
+        now = time.time_ns() if now is None else now
+        finished = 0
+        for ticker, (current, previous, _) in self.state.items():
+            for i, (spec, kind, _) in enumerate(self.specs):
+                bar = current[i]
+                if kind is TIME and bar is not None and bar.end + self.lateness <= now:
+                    previous[i] = bar
+                    current[i] = None
+                    self.pending.append(bar.row(ticker, spec))
+                    finished += 1
+        return finished
+
+    def drain(self):
+        """Rows of the bars finished or revised since the last drain (see FIELDS)."""
+        rows, self.pending = self.pending, []
+        return rows
+
+
+def bar_frames(rows):
+    """{(ticker, spec): DataFrame} of drained rows, oldest bar first; Date/End as UTC datetimes."""
+    groups = {}
+    for row in rows:
+        groups.setdefault((row[0], row[1]), []).append(row)
+    frames = {}
+    for (ticker, spec), bars in groups.items():
+        if parse_bar_spec(spec)[1] is TIME:
+            bars = sorted({row[2]: row for row in bars}.values())  # ✅ A revision replaces the bar it revises
+        columns = list(zip(*bars))
+        frames[(ticker, spec)] = pd.DataFrame({
+            "Date": np.array(columns[2], dtype="datetime64[ns]"), "End": np.array(columns[3], dtype="datetime64[ns]"),
+            **{field: np.array(values) for field, values in zip(FIELDS[4:], columns[4:])}})
+    return frames
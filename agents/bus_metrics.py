@@ -0,0 +1,77 @@
+import threading
+from collections import defaultdict
+
+try:
+    from prometheus_client import Counter, start_http_server
+except ImportError:  # prometheus_client is optional: counters are still kept in memory
+    Counter = None
+    start_http_server = None
+
+COUNTERS = {
+    "published": "Messages published on the agent bus",
+    "received": "Messages received from the agent bus",
+    "dropped": "Messages lost before delivery (sequence gaps, e.g. high-water mark reached)",
+    "conflated": "Messages replaced by a newer message on the same topic before being handled",
+    "send_failed": "Messages that could not be sent (socket would block or is closed)",
+}
+
+
+def msg_type_of(topic):
+    """Message type part of a "<msgtype>.<ticker>." topic."""
+    return topic.split(".", 1)[0] if topic else "untyped"
+
+
+class BusMetrics:
+    """Per-agent, per-message-type counters for the CommFramework bus.
+
+    Counts are always available through snapshot(); when prometheus_client is
+    installed they are also exported as `ai_trading_bus_<name>_total`.
+    """
+
+    _prometheus = {}
+    _server_started = False
+
+    def __init__(self, metrics_port=None, logger=None):
+        self.logger = logger
+        self.counts = defaultdict(int)
+        self.last_sequence = {}
+        self.lock = threading.Lock()
+
+        if Counter is not None and not BusMetrics._prometheus:
+            for name, description in COUNTERS.items():
+                BusMetrics._prometheus[name] = Counter(f"ai_trading_bus_{name}", description, ["agent", "msg_type"])
+
+        if metrics_port and start_http_server is not None and not BusMetrics._server_started:
+            try:
+                start_http_server(metrics_port)
+                BusMetrics._server_started = True
+                if self.logger:
+                    self.logger.info(f"📈 Bus metrics exported for Prometheus on port {metrics_port}")
+            except OSError as e:  # e.g. another agent process already exports on this port
+                if self.logger:
+                    self.logger.warning(f"⚠️ Could not export bus metrics on port {metrics_port}: {e}")
+
+    def inc(self, name, agent, topic, amount=1):
+        msg_type = msg_type_of(topic)
+        with self.lock:
+            self.counts[(name, agent, msg_type)] += amount
+        if name in BusMetrics._prometheus:
+            BusMetrics._prometheus[name].labels(agent=agent, msg_type=msg_type).inc(amount)
+
+    def observe_sequence(self, agent, source, topic, sequence):
+        """Count the messages missing between two sequence numbers of the same topic."""
+        if sequence is None:
+            return
+        key = (agent, source, topic)
+        previous = self.last_sequence.get(key)
+        self.last_sequence[key] = sequence
+        if previous is not None and sequence > previous + 1:
+            self.inc("dropped", agent, topic, sequence - previous - 1)
+
+    def snapshot(self):
+        """Return {agent: {msg_type: {counter: value}}}."""
+        result = defaultdict(lambda: defaultdict(dict))
+        with self.lock:
+            for (name, agent, msg_type), value in self.counts.items():
+                result[agent][msg_type][name] = value
+        return {agent: dict(types) for agent, types in result.items()}
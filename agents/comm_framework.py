@@ -1,31 +1,74 @@
 import zmq
+import json
 import logging
 import yaml
 import os
-import psutil
 import time
 import sys
+import heapq
+import itertools
+import tempfile
+import socket as stdlib_socket
+from contextlib import closing, contextmanager, nullcontext
+from collections import defaultdict
 
 # Ensure Python can find the parent directory
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from utils.logger import get_logger
+from utils.logger import setup_logger
+from agents.serializers import decode_body, encode_message, get_serializer, make_topic, split_frames
+from agents.bus_metrics import BusMetrics, msg_type_of
+from agents.tracing import Tracer
+
+# Single-frame `send_json` messages have no topic frame: subscribing to the
+# first byte of a JSON object receives them without receiving every topic.
+LEGACY_JSON_TOPIC = "{"
+
 
 class CommFramework:
-    def __init__(self, config_path="config/config.yml"):
-        """Initialize the communication framework with ZeroMQ context."""
+    TRANSPORTS = ("tcp", "ipc", "inproc")
+
+    def __init__(self, config_path="config/config.yml", transport=None):
+        """Initialize the communication framework with ZeroMQ context.
+
+        `transport` overrides bus.transport from the config file. inproc only
+        works between agents that share this process (and this context).
+        """
+        started = time.perf_counter()
         self.context = zmq.Context()
         self.publishers = {}
         self.subscribers = {}
-        self.logger = get_logger("trading", "logs/comm_framework.log")
+        self.repliers = {}
+        self.event_loops = []
+        self.logger = setup_logger("CommFramework", "logs/comm_framework.log")
+        self.settings = {}
         self.config = self.load_config(config_path)
+        self.bus_config = self.settings.get("bus") or {}
+        self.serializer = get_serializer(self.bus_config.get("serializer", "json"))
+        self.transport = transport or self.bus_config.get("transport", "tcp")
+        self.host = self.bus_config.get("host", "localhost")
+        self.ipc_dir = self.bus_config.get("ipc_dir") or tempfile.gettempdir()
+        self.conflate_types = set(self.bus_config.get("conflate") or [])
+        self.metrics = BusMetrics(self.bus_config.get("metrics_port"), self.logger)
+        self.sequences = defaultdict(int)  # Per (socket, topic) sequence numbers for drop detection
+        self.socket_names = {}
+        self.tracing = self.bus_config.get("tracing") or {}
+        self.tracer = Tracer(self.tracing.get("record")) if self.tracing.get("enabled") else None
+
+        if self.transport not in self.TRANSPORTS:
+            self.logger.error(f"❌ Unknown transport '{self.transport}', falling back to tcp.")
+            self.transport = "tcp"
 
         if not self.config:
             self.logger.error("❌ No valid configuration found. Exiting CommFramework initialization.")
             return
         
-        # ✅ Ensure ports are free before starting
-        self.free_ports()
+        # ✅ Ensure ports are free before starting (only TCP ports can clash with other processes)
+        if self.transport == "tcp":
+            self.free_ports()
+
+        self.logger.info(f"🚀 CommFramework ready in {(time.perf_counter() - started) * 1000:.1f} ms "
+                         f"({self.transport} transport).")
 
     def load_config(self, config_path):
         """Load the configuration file for port assignments."""
@@ -41,55 +84,152 @@ class CommFramework:
                 return {}
 
             self.logger.info("✅ Configuration loaded successfully.")
+            self.settings = config
             return config.get("ports", {})
         except Exception as e:
             self.logger.error(f"❌ Failed to load configuration: {e}")
             return {}
 
+    def configured_ports(self):
+        """Every TCP port named in the `ports` section."""
+        return {ports[key] for ports in self.config.values() for key in ["publisher", "subscriber", "snapshot"]
+                if ports.get(key)}
+
+    def find_port_conflicts(self, ports):
+        """Return {port: pid} for the ports another socket is listening on (pid None if unknown).
+
+        Takes a single snapshot of the connection table for all ports. Where
+        that needs privileges psutil does not have, falls back to a bind probe.
+        """
+        import psutil  # ✅ Deferred: only TCP deployments check ports
+        try:
+            return {conn.laddr.port: conn.pid for conn in psutil.net_connections(kind="tcp")
+                    if conn.status == psutil.CONN_LISTEN and conn.laddr.port in ports}
+        except psutil.AccessDenied:
+            conflicts = {}
+            for port in ports:
+                with closing(stdlib_socket.socket()) as probe:
+                    try:
+                        probe.bind(("", port))
+                    except OSError:
+                        conflicts[port] = None
+            return conflicts
+
     def free_ports(self):
-        """Finds and kills processes using required ports before binding."""
-        for agent, ports in self.config.items():
-            for key in ["publisher", "subscriber"]:
-                port = ports.get(key)
-                if port:
-                    self._kill_process_using_port(port)
-
-    def _kill_process_using_port(self, port):
-        """Kill process occupying a given port."""
-        for conn in psutil.net_connections():
-            if conn.laddr.port == port:
-                try:
-                    process = psutil.Process(conn.pid)
-                    self.logger.warning(f"🔴 Port {port} in use by {process.name()} (PID {conn.pid}). Terminating...")
-                    process.terminate()
-                    time.sleep(1)
-                    self.logger.info(f"✅ Port {port} is now free.")
-                except psutil.NoSuchProcess:
-                    self.logger.warning(f"⚠️ No process found on port {port}, skipping.")
-
-    def create_publisher(self, agent_name):
-        """Create and bind a publisher socket for a given agent."""
+        """Report processes holding the configured ports; terminate them if bus.kill_port_conflicts is set."""
+        import psutil
+
+        conflicts = self.find_port_conflicts(self.configured_ports())
+        kill = self.bus_config.get("kill_port_conflicts", False)
+        processes = {}
+
+        for port, pid in sorted(conflicts.items()):
+            try:
+                process = psutil.Process(pid) if pid else None
+                owner = f"{process.name()} (PID {pid})" if process else "an unknown process"
+            except psutil.NoSuchProcess:
+                continue  # ✅ Exited since the snapshot
+            except psutil.AccessDenied:
+                owner = f"an unknown process (PID {pid})"  # ✅ Owned by another user: report, never kill blindly
+                process = None
+
+            if not kill or process is None or pid == os.getpid():
+                self.logger.warning(f"⚠️ Port {port} is already in use by {owner}.")
+                continue
+            self.logger.warning(f"🔴 Port {port} in use by {owner}. Terminating...")
+            if pid not in processes:
+                process.terminate()
+                processes[pid] = process
+
+        # ✅ Wait for all terminated processes at once instead of sleeping per port
+        _, alive = psutil.wait_procs(list(processes.values()), timeout=3)
+        for process in alive:
+            self.logger.warning(f"🔴 PID {process.pid} ignored SIGTERM. Killing...")
+            process.kill()
+        if processes:
+            self.logger.info(f"✅ Terminated {len(processes)} process(es) holding configured ports.")
+
+    def endpoint(self, port, bind=False):
+        """Build the ZeroMQ endpoint for a logical port on the configured transport.
+
+        Ports stay the addressing scheme for every transport, so the same
+        config works whether agents share a process or not.
+        """
+        if self.transport == "inproc":
+            return f"inproc://ai_trading_bot-{port}"
+        if self.transport == "ipc":
+            return f"ipc://{os.path.join(self.ipc_dir, f'ai_trading_bot-{port}')}"
+        return f"tcp://*:{port}" if bind else f"tcp://{self.host}:{port}"
+
+    def hwm(self, agent_name):
+        """High-water marks for an agent's sockets: bus.hwm.default overridden by bus.hwm.<agent>."""
+        hwm = self.bus_config.get("hwm") or {}
+        return {**(hwm.get("default") or {}), **(hwm.get(agent_name) or {})}
+
+    def create_publisher(self, agent_name, key="publisher"):
+        """Create and bind a publisher socket for a given agent.
+
+        `key` picks another port of the agent, e.g. "subscriber" to publish
+        straight into that agent (as the journal replayer does).
+        """
         if agent_name not in self.config:
             self.logger.error(f"❌ No port assigned for {agent_name} in config.")
             return None
 
-        port = self.config[agent_name].get("publisher")
+        port = self.config[agent_name].get(key)
         if not port:
-            self.logger.error(f"❌ Publisher port missing for {agent_name}.")
+            self.logger.error(f"❌ {key.capitalize()} port missing for {agent_name}.")
             return None
 
         try:
             socket = self.context.socket(zmq.PUB)
-            socket.bind(f"tcp://*:{port}")
-            self.publishers[agent_name] = socket
-            self.logger.info(f"📡 {agent_name} Publisher bound on port {port}")
+            if "sndhwm" in self.hwm(agent_name):
+                socket.setsockopt(zmq.SNDHWM, self.hwm(agent_name)["sndhwm"])
+            socket.bind(self.endpoint(port, bind=True))
+            self.publishers[agent_name if key == "publisher" else f"{agent_name}/{key}"] = socket
+            self.socket_names[socket] = agent_name
+            self.logger.info(f"📡 {agent_name} Publisher bound on {self.endpoint(port, bind=True)}")
             return socket
         except zmq.ZMQError as e:
             self.logger.error(f"❌ Failed to bind publisher for {agent_name} on port {port}: {e}")
             return None
 
-    def create_subscriber(self, agent_name, topic=""):
-        """Create and connect a subscriber socket for a given agent."""
+    def create_publisher_into(self, agent_name, targets):
+        """Create a publisher for `agent_name` bound on the subscriber port of every agent in `targets`.
+
+        One send() then reaches all of them, e.g. StrategyAgent's signals for
+        RiskManagementAgent. Agents listen on their own subscriber port, so
+        this is how a message is addressed to them.
+        """
+        ports = {target: (self.config.get(target) or {}).get("subscriber") for target in targets}
+        missing = [target for target, port in ports.items() if not port]
+        if missing:
+            self.logger.error(f"❌ Subscriber port missing for {missing}.")
+            return None
+
+        socket = self.context.socket(zmq.PUB)
+        try:
+            if "sndhwm" in self.hwm(agent_name):
+                socket.setsockopt(zmq.SNDHWM, self.hwm(agent_name)["sndhwm"])
+            for port in ports.values():
+                socket.bind(self.endpoint(port, bind=True))
+        except zmq.ZMQError as e:
+            socket.close()
+            self.logger.error(f"❌ Failed to bind {agent_name} publisher into {list(ports)}: {e}")
+            return None
+        self.publishers[f"{agent_name}->{'+'.join(ports)}"] = socket
+        self.socket_names[socket] = agent_name
+        self.logger.info(f"📡 {agent_name} Publisher bound into {', '.join(ports)}")
+        return socket
+
+    def create_subscriber(self, agent_name, topic="", msg_types=None, tickers=None, legacy=False):
+        """Create and connect a subscriber socket for a given agent.
+
+        `msg_types`/`tickers` subscribe to "<msgtype>.<ticker>." topics so that
+        ZeroMQ filters messages before they reach Python; `topic` is a raw
+        prefix (the default "" receives everything). `legacy` also receives
+        single-frame `send_json` messages, which carry no topic.
+        """
         if agent_name not in self.config:
             self.logger.error(f"❌ No port assigned for {agent_name} in config.")
             return None
@@ -101,19 +241,223 @@ class CommFramework:
 
         try:
             socket = self.context.socket(zmq.SUB)
-            socket.connect(f"tcp://localhost:{port}")
-            socket.setsockopt_string(zmq.SUBSCRIBE, topic)
+            if "rcvhwm" in self.hwm(agent_name):
+                socket.setsockopt(zmq.RCVHWM, self.hwm(agent_name)["rcvhwm"])
+            socket.connect(self.endpoint(port))
+            if msg_types:
+                topics = self.subscribe(socket, msg_types, tickers)
+            else:
+                socket.setsockopt_string(zmq.SUBSCRIBE, topic)
+                topics = [topic]
+            if legacy and msg_types:
+                socket.setsockopt_string(zmq.SUBSCRIBE, LEGACY_JSON_TOPIC)
+                topics.append(LEGACY_JSON_TOPIC)
             self.subscribers[agent_name] = socket
-            self.logger.info(f"🔍 {agent_name} Subscriber connected to port {port} with topic '{topic}'")
+            self.socket_names[socket] = agent_name
+            self.logger.info(f"🔍 {agent_name} Subscriber connected to {self.endpoint(port)} with topics {topics}")
             return socket
         except zmq.ZMQError as e:
             self.logger.error(f"❌ Failed to connect subscriber for {agent_name} on port {port}: {e}")
             return None
 
+    def create_subscriber_from(self, agent_name, sources, msg_types, tickers=None):
+        """Create a subscriber for `agent_name` connected to the publisher port of every agent in `sources`.
+
+        For what other agents publish on their own port rather than into
+        `agent_name`, e.g. RiskManagementAgent's assessments that
+        ExecutionAgent acts on.
+        """
+        ports = {source: (self.config.get(source) or {}).get("publisher") for source in sources}
+        missing = [source for source, port in ports.items() if not port]
+        if missing:
+            self.logger.error(f"❌ Publisher port missing for {missing}.")
+            return None
+
+        try:
+            socket = self.context.socket(zmq.SUB)
+            if "rcvhwm" in self.hwm(agent_name):
+                socket.setsockopt(zmq.RCVHWM, self.hwm(agent_name)["rcvhwm"])
+            for port in ports.values():
+                socket.connect(self.endpoint(port))
+            topics = self.subscribe(socket, msg_types, tickers)
+            self.subscribers[f"{agent_name}<-{'+'.join(ports)}"] = socket
+            self.socket_names[socket] = agent_name
+            self.logger.info(f"🔍 {agent_name} Subscriber connected to {', '.join(ports)} with topics {topics}")
+            return socket
+        except zmq.ZMQError as e:
+            self.logger.error(f"❌ Failed to connect {agent_name} subscriber to {list(ports)}: {e}")
+            return None
+
+    def subscribe(self, socket, msg_types, tickers=None):
+        """Subscribe a SUB socket to message types, optionally restricted to some tickers."""
+        topics = [make_topic(msg_type, ticker) for msg_type in msg_types for ticker in (tickers or [None])]
+        for topic in topics:
+            socket.setsockopt_string(zmq.SUBSCRIBE, topic)
+        return topics
+
+    def unsubscribe(self, socket, msg_types, tickers=None):
+        """Remove subscriptions previously added with subscribe()."""
+        for msg_type in msg_types:
+            for ticker in tickers or [None]:
+                socket.setsockopt_string(zmq.UNSUBSCRIBE, make_topic(msg_type, ticker))
+
+    def create_replier(self, agent_name, key="snapshot"):
+        """Create and bind a REP socket that answers requests for a given agent."""
+        port = self.config.get(agent_name, {}).get(key)
+        if not port:
+            self.logger.error(f"❌ No '{key}' port assigned for {agent_name} in config.")
+            return None
+
+        try:
+            socket = self.context.socket(zmq.REP)
+            socket.bind(self.endpoint(port, bind=True))
+            self.repliers[agent_name] = socket
+            self.logger.info(f"📮 {agent_name} {key} replier bound on port {port}")
+            return socket
+        except zmq.ZMQError as e:
+            self.logger.error(f"❌ Failed to bind {key} replier for {agent_name} on port {port}: {e}")
+            return None
+
+    def request(self, agent_name, payload, key="snapshot", timeout=5000):
+        """Send one request to an agent's REP socket and wait for the reply.
+
+        Returns None if the agent does not answer within `timeout` ms.
+        """
+        port = self.config.get(agent_name, {}).get(key)
+        if not port:
+            self.logger.error(f"❌ No '{key}' port assigned for {agent_name} in config.")
+            return None
+
+        socket = self.context.socket(zmq.REQ)
+        socket.setsockopt(zmq.LINGER, 0)
+        try:
+            socket.connect(self.endpoint(port))
+            self.send(socket, payload)
+            if not socket.poll(timeout):
+                self.logger.warning(f"⚠️ No {key} reply from {agent_name} within {timeout} ms.")
+                return None
+            return self.recv(socket)
+        finally:
+            socket.close()
+
+    def request_snapshot(self, agent_name="MarketDataAgent", tickers=None, timeout=5000):
+        """Ask a publisher for the full history it has sent so far (for late subscribers)."""
+        return self.request(agent_name, {"type": "snapshot", "tickers": tickers}, timeout=timeout)
+
+    def stamp(self, socket, topic, agent=None):
+        """Return (agent, header fields) for the next message on `socket`: its sequence number and trace."""
+        agent = agent or self.socket_names.get(socket, "unknown")
+        self.sequences[(socket, topic)] += 1
+        header = {"seq": self.sequences[(socket, topic)]}
+        if self.tracer:
+            header["trace"] = self.tracer.outgoing(agent)
+        return agent, header
+
+    def unstamp(self, socket, topic, seq):
+        """Give back the sequence number of a message that was not sent, so subscribers see no gap.
+
+        Only the latest number can be given back; a failure counts as send_failed either way.
+        """
+        if self.sequences[(socket, topic)] == seq:
+            self.sequences[(socket, topic)] = seq - 1
+
+    def encode_outgoing(self, socket, payload, msg_type=None, ticker=None, serializer=None):
+        """Return (agent, topic, frames) for a message published on `socket`, with its sequence number and trace."""
+        serializer = get_serializer(serializer) if isinstance(serializer, str) else (serializer or self.serializer)
+        topic = make_topic(msg_type, ticker) if msg_type else ""
+        agent, header = self.stamp(socket, topic)
+        return agent, topic, encode_message(payload, serializer, topic, header)
+
+    def forward(self, socket, frames, agent=None, flags=0):
+        """Publish already encoded frames (e.g. replayed from a journal) without decoding the body.
+
+        The header gets a new sequence number and a trace starting at `agent`
+        (default: the socket's owner), so subscribers check and measure the
+        forwarded message like any other.
+        """
+        topic, header, body = split_frames(frames)
+        if header.get("fmt") == "legacy":
+            agent, out = agent or self.socket_names.get(socket, "unknown"), frames
+        else:
+            header.pop("trace", None)
+            agent, stamp = self.stamp(socket, topic, agent)
+            out = [frames[0], json.dumps({**header, **stamp}).encode(), *body]
+        try:
+            socket.send_multipart(out, flags=flags, copy=False)
+        except zmq.ZMQError:
+            if header.get("fmt") != "legacy":
+                self.unstamp(socket, topic, stamp["seq"])
+            self.metrics.inc("send_failed", agent, topic)
+            raise
+        self.metrics.inc("published", agent, topic)
+
+    def decode_incoming(self, socket, frames):
+        """Count a message received on `socket`, check its sequence number, continue its trace and decode it."""
+        topic, header, body = split_frames(frames)
+        agent = self.socket_names.get(socket, "unknown")
+        self.metrics.inc("received", agent, topic)
+        self.metrics.observe_sequence(agent, id(socket), topic, header.get("seq"))
+        if self.tracer:
+            self.tracer.incoming(agent, header.get("trace"))  # ✅ Messages sent next continue this trace
+        return decode_body(header, body)
+
+    def send(self, socket, payload, msg_type=None, ticker=None, serializer=None, flags=0):
+        """Serialize a payload and send it as one multipart message on the "<msg_type>.<ticker>." topic."""
+        agent, topic, frames = self.encode_outgoing(socket, payload, msg_type, ticker, serializer)
+        seq = self.sequences[(socket, topic)]
+        try:
+            socket.send_multipart(frames, flags=flags, copy=False)
+        except zmq.ZMQError:
+            self.unstamp(socket, topic, seq)  # ✅ Not sent: the next message reuses its number
+            self.metrics.inc("send_failed", agent, topic)
+            raise
+        self.metrics.inc("published", agent, topic)
+
+    def recv(self, socket, flags=0):
+        """Receive one message and decode it; array payloads are zero-copy views.
+
+        Its trace is recorded but not continued: the caller's current trace
+        (if any) is left as it was. Use handling() to continue it.
+        """
+        with self.trace_scope():
+            return self.decode_incoming(socket, socket.recv_multipart(flags=flags, copy=False))
+
+    @contextmanager
+    def handling(self, socket, flags=0):
+        """Receive one message for a `with` block; messages sent inside the block continue its trace."""
+        with self.trace_scope():
+            yield self.decode_incoming(socket, socket.recv_multipart(flags=flags, copy=False))
+
+    def trace_scope(self):
+        return self.tracer.scope() if self.tracer else nullcontext()
+
+    def get_metrics(self):
+        """Snapshot of the bus counters: {agent: {msg_type: {counter: value}}}."""
+        return self.metrics.snapshot()
+
+    def create_event_loop(self, agent_name, poll_timeout=1000):
+        """Create an event loop that dispatches messages for the sockets of a given agent."""
+        loop = EventLoop(agent_name, poll_timeout=poll_timeout, logger=self.logger,
+                         metrics=self.metrics, conflate_types=self.conflate_types, tracer=self.tracer)
+        if self.tracer and self.tracing.get("report_interval"):
+            loop.add_timer(self.tracing["report_interval"], lambda: self.log_latency(agent_name))
+        self.event_loops.append(loop)
+        return loop
+
+    def log_latency(self, agent_name):
+        """Log p50/p99/p999 of the hops that end at an agent."""
+        lines = self.tracer.report(agent_name) if self.tracer else []
+        if lines:
+            self.logger.info(f"⏱️ {agent_name} latency:\n" + "\n".join(lines))
+
     def cleanup(self):
         """Cleanup all ZeroMQ sockets on shutdown."""
         self.logger.info("🧹 Cleaning up ZeroMQ sockets...")
-        
+
+        # ✅ Wake every blocked event loop before its sockets are closed
+        for loop in self.event_loops:
+            loop.stop()
+
         for agent, socket in list(self.publishers.items()):
             try:
                 socket.close()
@@ -128,8 +472,229 @@ class CommFramework:
             except Exception as e:
                 self.logger.error(f"❌ Error closing subscriber socket for {agent}: {e}")
 
+        for agent, socket in list(self.repliers.items()):
+            try:
+                socket.close()
+                self.logger.info(f"🔌 Closed replier socket for {agent}")
+            except Exception as e:
+                self.logger.error(f"❌ Error closing replier socket for {agent}: {e}")
+
+        # ✅ Sockets replaced in the dicts above (e.g. LoggingMonitoringAgent subscribes under other
+        # agents' names) would otherwise keep context.term() waiting forever
+        for socket, agent in list(self.socket_names.items()):
+            if not socket.closed:
+                socket.close()
+                self.logger.info(f"🔌 Closed remaining socket for {agent}")
+
+        if self.tracer:
+            self.tracer.close()
+
         try:
             self.context.term()
             self.logger.info("✅ ZeroMQ context terminated.")
         except Exception as e:
             self.logger.error(f"❌ Error terminating ZeroMQ context: {e}")
+
+
+class Timer:
+    """Handle for a callback scheduled on an EventLoop."""
+
+    def __init__(self, deadline, interval, callback):
+        self.deadline = deadline
+        self.interval = interval  # None for one-shot timers
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        """Prevent the callback from running again."""
+        self.cancelled = True
+
+
+class EventLoop:
+    """Block on every socket an agent owns and drain messages as soon as they arrive.
+
+    Handlers are called once per decoded message (see agents.serializers) in
+    the thread running the loop. A socketpair is registered alongside the
+    ZeroMQ sockets so that stop() can wake the poller immediately from any
+    thread.
+
+    Messages whose type is in `conflate_types` (or every message on a socket
+    registered with conflate=True) are conflated: of the messages pending on
+    a topic only the latest is handled. This is done per topic, unlike
+    ZMQ_CONFLATE which keeps one message per socket and does not support
+    multipart messages.
+    """
+
+    def __init__(self, name, poll_timeout=1000, max_batch=1000, logger=None, metrics=None, conflate_types=(),
+                 tracer=None):
+        self.name = name
+        self.poll_timeout = poll_timeout  # ms, upper bound between `running` checks
+        self.max_batch = max_batch  # Messages drained per socket before serving the others
+        self.logger = logger or logging.getLogger(name)
+        self.poller = zmq.Poller()
+        self.handlers = {}
+        self.conflating = set()
+        self.raw = set()
+        self.metrics = metrics
+        self.conflate_types = set(conflate_types)
+        self.tracer = tracer
+        self.timers = []
+        self._timer_ids = itertools.count()
+        self._stopped = False
+
+        self._wake_recv, self._wake_send = stdlib_socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._wake_send.setblocking(False)
+        self.poller.register(self._wake_recv, zmq.POLLIN)
+
+    def register(self, socket, handler, conflate=False, raw=False):
+        """Dispatch every message received on `socket` to `handler(message)`.
+
+        With raw=True the handler gets the received frames as they are (no
+        decoding, metrics, conflation or tracing), e.g. to record them.
+        """
+        if socket is None:
+            self.logger.warning(f"⚠️ {self.name}: Cannot register a missing socket.")
+            return
+        self.handlers[socket] = handler
+        if conflate:
+            self.conflating.add(socket)
+        if raw:
+            self.raw.add(socket)
+        self.poller.register(socket, zmq.POLLIN)
+
+    def unregister(self, socket):
+        """Stop polling a socket."""
+        self.conflating.discard(socket)
+        self.raw.discard(socket)
+        if self.handlers.pop(socket, None) is not None:
+            self.poller.unregister(socket)
+
+    def add_timer(self, interval, callback):
+        """Run `callback()` every `interval` seconds."""
+        return self._schedule(Timer(time.monotonic() + interval, interval, callback))
+
+    def call_later(self, delay, callback):
+        """Run `callback()` once after `delay` seconds."""
+        return self._schedule(Timer(time.monotonic() + delay, None, callback))
+
+    def _schedule(self, timer):
+        heapq.heappush(self.timers, (timer.deadline, next(self._timer_ids), timer))
+        return timer
+
+    def _next_timeout(self):
+        """Milliseconds until the next timer is due, capped by poll_timeout."""
+        while self.timers and self.timers[0][2].cancelled:
+            heapq.heappop(self.timers)
+        if not self.timers:
+            return self.poll_timeout
+        remaining = max(0.0, self.timers[0][0] - time.monotonic()) * 1000
+        return min(self.poll_timeout, remaining)
+
+    def _run_due_timers(self):
+        now = time.monotonic()
+        while self.timers and self.timers[0][0] <= now:
+            _, _, timer = heapq.heappop(self.timers)
+            if timer.cancelled:
+                continue
+            try:
+                timer.callback()
+            except Exception as e:
+                self.logger.error(f"❌ {self.name}: Timer callback failed: {e}")
+            if timer.interval is not None and not timer.cancelled:
+                timer.deadline = max(timer.deadline + timer.interval, now)
+                self._schedule(timer)
+
+    def _drain(self, socket, handler):
+        """Receive and dispatch every pending message on a socket."""
+        latest = {}  # topic -> (header, body) for conflated topics
+        for _ in range(self.max_batch):
+            try:
+                frames = socket.recv_multipart(flags=zmq.NOBLOCK, copy=False)
+            except zmq.Again:
+                break
+            except zmq.ZMQError as e:
+                if e.errno == zmq.EFSM and socket.type == zmq.REP:
+                    # ✅ The last request was never answered: reply with an error so the socket accepts requests again
+                    self.logger.error(f"❌ {self.name}: Request left without a reply, answering with an error.")
+                    socket.send_json({"type": "error", "error": "request failed without a reply"})
+                    continue
+                self.logger.error(f"❌ {self.name}: Error receiving message: {e}")
+                break
+            try:
+                if socket in self.raw:
+                    handler(frames)
+                    continue
+                topic, header, body = split_frames(frames)
+                if self.metrics:
+                    self.metrics.inc("received", self.name, topic)
+                    self.metrics.observe_sequence(self.name, id(socket), topic, header.get("seq"))
+
+                if socket in self.conflating or msg_type_of(topic) in self.conflate_types:
+                    if topic in latest and self.metrics:
+                        self.metrics.inc("conflated", self.name, topic)
+                    latest[topic] = (header, body)  # ✅ Only decode the newest message per topic
+                    continue
+
+                self._dispatch(handler, header, body)
+            except Exception as e:
+                self.logger.error(f"❌ {self.name}: Error handling message: {e}")
+
+        for header, body in latest.values():
+            try:
+                self._dispatch(handler, header, body)
+            except Exception as e:
+                self.logger.error(f"❌ {self.name}: Error handling message: {e}")
+
+    def _dispatch(self, handler, header, body):
+        """Decode and handle one message; messages the handler publishes continue its trace."""
+        if self.tracer:
+            self.tracer.incoming(self.name, header.get("trace"))
+        try:
+            handler(decode_body(header, body))
+        finally:
+            if self.tracer:
+                self.tracer.clear()
+
+    def _clear_wakeups(self):
+        try:
+            while self._wake_recv.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def run(self, is_running=None):
+        """Dispatch messages and timers until stop() is called or `is_running()` is False."""
+        self.logger.info(f"🔁 {self.name} event loop running with {len(self.handlers)} socket(s).")
+
+        while not self._stopped and (is_running is None or is_running()):
+            try:
+                events = dict(self.poller.poll(self._next_timeout()))
+            except zmq.ZMQError as e:
+                if e.errno == zmq.ETERM:
+                    break  # ✅ Context terminated during shutdown
+                raise
+
+            if self._wake_recv in events:
+                self._clear_wakeups()
+
+            for socket, handler in list(self.handlers.items()):
+                if socket in events and not socket.closed:
+                    self._drain(socket, handler)
+
+            self._run_due_timers()
+
+        self.logger.info(f"🛑 {self.name} event loop stopped.")
+
+    def stop(self):
+        """Stop the loop and wake it immediately. Safe to call from any thread."""
+        self._stopped = True
+        try:
+            self._wake_send.send(b"\x00")
+        except (BlockingIOError, OSError):
+            pass  # ✅ Buffer full or already closed: loop is waking anyway
+
+    def close(self):
+        """Release the wakeup socketpair."""
+        self._wake_recv.close()
+        self._wake_send.close()
@@ -1,14 +1,10 @@
-import zmq
-import json
 import time
-import logging
 import sys
 import os
 
 # Ensure Python can find the parent directory
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from agents.comm_framework import CommFramework  
 from utils.logger import setup_logger
 
 
@@ -17,10 +13,13 @@ class ExecutionAgent:
         self.comm = comm_framework
         self.logger = setup_logger("ExecutionAgent", "logs/execution_agent.log")
         self.running = True  # ✅ Enables graceful shutdown
+        self.event_loop = self.comm.create_event_loop("ExecutionAgent")
 
         # ✅ Initialize communication sockets
         try:
-            self.trade_sub = self.comm.create_subscriber("ExecutionAgent")
+            # ✅ Trades come from RiskManagementAgent's assessments: signals never reach execution directly
+            self.trade_sub = self.comm.create_subscriber_from("ExecutionAgent", ["RiskManagementAgent"],
+                                                              msg_types=["risk"])
             self.execution_pub = self.comm.create_publisher("ExecutionAgent")
         except Exception as e:
             self.logger.error(f"❌ ExecutionAgent Init Error: {e}")
@@ -52,40 +51,42 @@ class ExecutionAgent:
 
         try:
             if self.execution_pub and not self.execution_pub.closed:
-                self.execution_pub.send_json(execution_feedback)
+                self.comm.send(self.execution_pub, execution_feedback, msg_type="execution", ticker=ticker)
                 self.logger.info(f"📤 Execution feedback sent: {execution_feedback}")
             else:
                 self.logger.warning("⚠️ Execution feedback not sent: Publisher socket is closed.")
         except Exception as e:
             self.logger.error(f"❌ Failed to send execution feedback: {e}")
 
+    def handle_risk_assessment(self, assessment):
+        """Execute the trade of a risk assessment received from the bus, if RiskManagementAgent approved it."""
+        self.logger.info(f"📥 Received risk assessment: {assessment}")
+        if assessment.get("risk_status") != "Approved":
+            self.logger.info(f"🚫 Not executing {assessment.get('signal')} on {assessment.get('ticker')}: "
+                             f"{assessment.get('risk_status')} ({assessment.get('details')})")
+            return
+        self.execute_trade(assessment)
+
     def run(self):
-        """Continuously receive trade signals and execute trades."""
+        """Continuously receive risk assessments and execute the approved trades."""
         self.logger.info("🚀 Execution Agent Started.")
 
         if not self.trade_sub:
             self.logger.error("❌ ExecutionAgent cannot start: No valid subscriber.")
             return
 
-        while self.running:
-            try:
-                message = None
-                try:
-                    message = self.trade_sub.recv_string(flags=zmq.NOBLOCK)  # ✅ Non-blocking receive
-                except zmq.Again:
-                    pass  # ✅ No message available, continue looping
-
-                if message:
-                    signal = json.loads(message)
-                    self.logger.info(f"📥 Received trade signal: {signal}")
-                    self.execute_trade(signal)
-
-            except Exception as e:
-                self.logger.error(f"❌ Error processing trade signal: {e}")
+        # ✅ Block until assessments arrive instead of polling once per second
+        self.event_loop.register(self.trade_sub, self.handle_risk_assessment)
+        self.event_loop.run(lambda: self.running)
 
-            time.sleep(1)  # ✅ Prevent CPU overuse
+    async def run_async(self, runtime):
+        """Same as run(), as a coroutine on the asyncio runtime (see agents/async_runtime.py)."""
+        self.logger.info("🚀 Execution Agent Started (asyncio).")
+        if self.trade_sub:
+            await runtime.consume(self.trade_sub, self.handle_risk_assessment)
 
     def stop(self):
         """Gracefully stops the ExecutionAgent."""
         self.logger.info("🛑 Stopping Execution Agent...")
         self.running = False  # ✅ Stops the loop properly
+        self.event_loop.stop()  # ✅ Wake the event loop immediately
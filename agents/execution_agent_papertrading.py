@@ -1,10 +1,17 @@
+import argparse
+import asyncio
+import os
+import sys
 import time
 import logging
-import zmq
-from ib_insync import IB, Order, Trade
+from ib_insync import IB, MarketOrder, Order, Stock, Trade
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.comm_framework import CommFramework
 
 class ExecutionAgent:
-    def __init__(self):
+    def __init__(self, comm_framework=None):
         #  Initialize Logging
         logging.basicConfig(
             level=logging.INFO,
@@ -17,11 +24,9 @@ class ExecutionAgent:
         self.ib.connect("127.0.0.1", 7497, clientId=2)
         logging.info(" Connected to IBKR API")
 
-        #  Initialize ZeroMQ
-        self.context = zmq.Context()
-        self.zmq_socket = self.context.socket(zmq.PULL)
-        self.zmq_socket.bind("tcp://127.0.0.1:5560")
-        logging.info(" ZeroMQ Bound to tcp://127.0.0.1:5556")
+        #  Receive "signal.<ticker>." messages from the CommFramework bus
+        self.comm = comm_framework or CommFramework(transport="tcp")
+        self.zmq_socket = self.comm.create_subscriber("ExecutionAgent", msg_types=["signal"], legacy=True)
 
         #  Initialize Portfolio & Open Orders
         self.portfolio = {}
@@ -123,7 +128,7 @@ class ExecutionAgent:
         while True:
             try:
                 if self.zmq_socket.poll(1000):  # Wait for message
-                    message = self.zmq_socket.recv_json()
+                    message = self.comm.recv(self.zmq_socket)
                     ticker, action = message["ticker"], message["signal"]
                     self.execute_trade(ticker, action)
 
@@ -134,6 +139,133 @@ class ExecutionAgent:
             except Exception as e:
                 logging.error(f" Execution Error: {e}")
 
+class AsyncExecutionAgent:
+    """IBKR execution on the asyncio runtime (agents/async_runtime.py).
+
+    Every IBKR request is awaited instead of blocking, and each trade signal
+    is handled in its own task, so up to `max_in_flight` orders are placed
+    and tracked concurrently on one thread.
+    """
+
+    def __init__(self, comm_framework, host="127.0.0.1", port=7497, client_id=2, max_in_flight=100,
+                 sync_interval=5):
+        self.comm = comm_framework
+        self.logger = logging.getLogger("AsyncExecutionAgent")
+        self.ib = IB()
+        self.host, self.port, self.client_id = host, port, client_id
+        self.max_in_flight = max_in_flight
+        self.sync_interval = sync_interval
+        self.running = True
+        self.runtime = None
+
+        self.portfolio = {}
+        self.open_orders = {}  # ticker -> Trade
+        self.pending = set()  # ✅ Tickers with an order being prepared (prevents duplicate orders)
+
+        # ✅ legacy: untyped send_json signals from producers not yet publishing with comm.send
+        self.trade_sub = self.comm.create_subscriber("ExecutionAgent", msg_types=["signal"], legacy=True)
+        self.execution_pub = self.comm.create_publisher("ExecutionAgent")
+
+    async def sync_portfolio(self):
+        """Sync portfolio positions from IBKR."""
+        await self.ib.reqPositionsAsync()
+        self.portfolio = {pos.contract.symbol: {"shares": pos.position, "avg_price": pos.avgCost}
+                          for pos in self.ib.positions()}
+        self.logger.info(f"📊 Portfolio Synced: {self.portfolio}")
+
+    async def sync_orders(self):
+        """Refresh open orders from IBKR (no fixed sleep: the request completes when IBKR has answered)."""
+        await self.ib.reqOpenOrdersAsync()
+        self.open_orders = {trade.contract.symbol: trade for trade in self.ib.openTrades()}
+
+    async def get_account_balance(self):
+        """Retrieve the account's net liquidation value from IBKR."""
+        summary = await self.ib.accountSummaryAsync()
+        return next((float(item.value) for item in summary if item.tag == "NetLiquidation"), 0.0)
+
+    async def get_price(self, contract, timeout=5.0):
+        """Wait for a market data snapshot instead of sleeping a fixed second."""
+        ticker = self.ib.reqMktData(contract, snapshot=True)
+        try:
+            await asyncio.wait_for(ticker.updateEvent, timeout)
+        except asyncio.TimeoutError:
+            pass
+        price = ticker.marketPrice()
+        return None if price != price else price  # NaN when IBKR sent nothing
+
+    async def execute_trade(self, ticker, action):
+        """Place a market order for a signal and wait for it to complete."""
+        if action not in ["BUY", "SELL"]:
+            self.logger.info(f"⏸️ {action} for {ticker}: no action needed.")
+            return
+        existing = self.open_orders.get(ticker)
+        if ticker in self.pending or (existing is not None and not existing.isDone()):
+            self.logger.warning(f"⚠️ Order for {ticker} already exists, skipping duplicate execution.")
+            return
+
+        self.pending.add(ticker)
+        try:
+            async with self.in_flight:
+                [contract] = await self.ib.qualifyContractsAsync(Stock(ticker, "SMART", "USD"))
+                cash_balance, stock_price = await asyncio.gather(self.get_account_balance(), self.get_price(contract))
+
+                if stock_price is None or cash_balance < stock_price * 10:
+                    self.logger.warning(f"⚠️ Not enough balance to trade {ticker}. Skipping order.")
+                    return
+                order_size = int(cash_balance / (stock_price * 10))
+
+                trade = self.ib.placeOrder(contract, MarketOrder(action, order_size))
+                self.open_orders[ticker] = trade
+                self.pending.discard(ticker)
+                self.logger.info(f"📤 Order placed: {ticker} - {action} {order_size} shares")
+
+                while not trade.isDone():
+                    await trade.statusEvent  # ✅ Wakes on IBKR status updates only
+        finally:
+            self.pending.discard(ticker)
+
+        feedback = {"ticker": ticker, "action": action, "status": trade.orderStatus.status,
+                    "filled": trade.orderStatus.filled, "avg_price": trade.orderStatus.avgFillPrice,
+                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")}
+        self.comm.send(self.execution_pub, feedback, msg_type="execution", ticker=ticker)
+        self.logger.info(f"✅ Order finished: {feedback}")
+
+    def handle_trade_signal(self, signal):
+        """Handle each signal in its own task so slow orders do not hold up the others."""
+        self.runtime.spawn(self.execute_trade(signal.get("ticker"), signal.get("signal")),
+                           name=f"order-{signal.get('ticker')}")
+
+    async def run_async(self, runtime):
+        """Connect to IBKR, keep orders in sync and execute signals until cancelled."""
+        self.runtime = runtime
+        self.in_flight = asyncio.Semaphore(self.max_in_flight)
+        await self.ib.connectAsync(self.host, self.port, clientId=self.client_id)
+        self.logger.info("✅ Connected to IBKR API")
+        try:
+            await asyncio.gather(self.sync_portfolio(), self.sync_orders())
+            runtime.every(self.sync_interval, self.sync_orders, name="ibkr-order-sync")
+            await runtime.consume(self.trade_sub, self.handle_trade_signal)
+        finally:
+            self.ib.disconnect()  # ✅ Runs on cancellation (shutdown)
+            self.logger.info("🔌 Disconnected from IBKR API")
+
+
 if __name__ == "__main__":
-    agent = ExecutionAgent()
-    agent.run()
+    parser = argparse.ArgumentParser(description="IBKR paper trading execution agent.")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run on the asyncio runtime and receive signals from the CommFramework bus")
+    parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                        help="Bus transport shared with the strategy process (inproc cannot cross processes)")
+    args = parser.parse_args()
+
+    comm = CommFramework(transport=args.transport)  # ✅ Not bus.transport: this process runs on its own
+    try:
+        if args.use_async:
+            from agents.async_runtime import AsyncRuntime
+
+            asyncio.run(AsyncRuntime(comm).run([AsyncExecutionAgent(comm)]))
+        else:
+            agent = ExecutionAgent(comm)
+            agent.run()
+    finally:
+        comm.cleanup()
@@ -0,0 +1,265 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+import zmq
+
+from agents.serializers import split_frames
+
+# A journal is an append-only file of bus messages exactly as they were sent:
+#   file header   8-byte magic
+#   record        uint32 length of the rest of the record
+#                 int64  receive time (ns since epoch)
+#                 uint16 publisher name length, uint16 frame count
+#                 publisher name (UTF-8)
+#                 per frame: uint32 length, frame bytes
+# All integers are little-endian. Records are only ever appended, so a
+# journal cut short by a crash loses at most its last record. Readers map
+# the file and hand out zero-copy memoryviews of the frames, which can be
+# sent again as they are. Messages published into an agent's subscriber
+# port (e.g. StrategyAgent's signals) are recorded as "<publisher>-><agent>"
+# and replayed into that port again.
+
+MAGIC = b"AITBJRN1"
+RECORD = struct.Struct("<IqHH")
+FRAME = struct.Struct("<I")
+
+
+def _buffer(frame):
+    return frame.buffer if hasattr(frame, "buffer") else memoryview(frame)
+
+
+def sender(frames, default="unknown"):
+    """Agent that published a message: the send hop ending its trace (`default` without tracing)."""
+    _, header, _ = split_frames(frames)
+    hops = (header.get("trace") or {}).get("hops")
+    return hops[-1][0] if hops else default
+
+
+class JournalWriter:
+    """Append bus messages to a journal file."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.records = 0
+
+    def append(self, publisher, frames, timestamp_ns=None):
+        """Append one message published by `publisher` (frames as received: zmq.Frame, bytes or buffers)."""
+        name = publisher.encode()
+        buffers = [_buffer(frame) for frame in frames]
+        length = RECORD.size - 4 + len(name) + sum(FRAME.size + buffer.nbytes for buffer in buffers)
+        timestamp_ns = time.time_ns() if timestamp_ns is None else timestamp_ns
+        self.file.write(RECORD.pack(length, timestamp_ns, len(name), len(buffers)))
+        self.file.write(name)
+        for buffer in buffers:
+            self.file.write(FRAME.pack(buffer.nbytes))
+            self.file.write(buffer)
+        self.records += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class JournalReader:
+    """Iterate over a journal as (timestamp_ns, publisher, frames), without copying the frames."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.view = memoryview(self.map) if self.map else memoryview(b"")
+        if size and bytes(self.view[:len(MAGIC)]) != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a bus journal.")
+        self.truncated = False  # True if the last record was cut short (e.g. the recorder crashed)
+
+    def __iter__(self):
+        view, offset = self.view, len(MAGIC)
+        while offset + RECORD.size <= len(view):
+            length, timestamp, name_length, frame_count = RECORD.unpack_from(view, offset)
+            end = offset + 4 + length
+            if end > len(view):
+                break
+            position = offset + RECORD.size
+            publisher = bytes(view[position:position + name_length]).decode()
+            position += name_length
+            frames = []
+            for _ in range(frame_count):
+                (size,) = FRAME.unpack_from(view, position)
+                position += FRAME.size
+                frames.append(view[position:position + size])
+                position += size
+            yield timestamp, publisher, frames
+            offset = end
+        self.truncated = offset != max(len(view), len(MAGIC))
+
+    def publishers(self):
+        """Names of the publishers found in the journal, in order of first appearance."""
+        names = {}
+        for _, publisher, _ in self:
+            names.setdefault(publisher)
+        return list(names)
+
+    def close(self):
+        try:
+            self.view.release()
+            if self.map is not None:
+                self.map.close()
+        except BufferError:
+            pass  # ✅ Frames still in use elsewhere (e.g. queued by ZeroMQ): the mapping is freed with them
+        self.file.close()
+
+
+class JournalRecorder:
+    """Tap every publisher on the bus and append what they send to a journal.
+
+    Connects one SUB socket (subscribed to everything, no high-water mark)
+    to each configured publisher and subscriber port and records the raw
+    frames in its own thread: with the publisher's name, or as
+    "<publisher>-><agent>" for what was published into an agent's subscriber
+    port (the publisher is read from the trace). `agents` limits the
+    recording to these publishers. With the inproc transport the recorder
+    must share the agents' CommFramework.
+    """
+
+    def __init__(self, comm, path, agents=None, flush_interval=1.0):
+        self.comm = comm
+        self.logger = comm.logger
+        self.writer = JournalWriter(path)
+        self.agents = agents
+        self.loop = comm.create_event_loop("JournalRecorder")
+        self.taps = []
+        self.thread = None
+
+        for agent, ports in comm.config.items():
+            for key in ("publisher", "subscriber"):
+                port = ports.get(key)
+                if not port or (key == "publisher" and agents and agent not in agents):
+                    continue
+                socket = comm.context.socket(zmq.SUB)
+                socket.setsockopt(zmq.RCVHWM, 0)  # ✅ A journal with gaps is useless for replay
+                socket.connect(comm.endpoint(port))
+                socket.setsockopt(zmq.SUBSCRIBE, b"")
+                comm.socket_names[socket] = "JournalRecorder"  # ✅ Closed by comm.cleanup() too
+                if key == "publisher":
+                    record = lambda frames, agent=agent: self.writer.append(agent, frames)
+                else:
+                    record = lambda frames, agent=agent: self.record_into(agent, frames)
+                self.loop.register(socket, record, raw=True)
+                self.taps.append(socket)
+        self.loop.add_timer(flush_interval, self.writer.flush)
+        self.logger.info(f"⏺️ Recording {len(self.taps)} port(s) to {path}")
+
+    def record_into(self, agent, frames):
+        """Record a message published into `agent`'s subscriber port under its publisher's name."""
+        publisher = sender(frames)
+        if not self.agents or publisher in self.agents:
+            self.writer.append(f"{publisher}->{agent}", frames)
+
+    def start(self):
+        """Record in a background thread until stop()."""
+        self.thread = threading.Thread(target=self.loop.run, name="JournalRecorder", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop recording and close the journal."""
+        self.loop.stop()
+        if self.thread:
+            self.thread.join(timeout=5)
+        for socket in self.taps:
+            socket.close()
+        self.writer.close()
+        self.logger.info(f"⏹️ Recorded {self.writer.records} message(s) to {self.writer.path}")
+
+
+class JournalReplayer:
+    """Publish the messages of a journal again, as their original publishers.
+
+    `speed` scales the recorded gaps between messages (1 = as recorded,
+    10 = ten times faster); None or 0 sends them back to back. `agents`
+    limits the replay to messages from these publishers. Messages recorded
+    on an agent's subscriber port go into that port again, the others on
+    their publisher's own port. With `into`, every message is published on
+    the subscriber ports of those agents instead, to drive them directly.
+    Messages keep their topic and body; each gets a new sequence number and
+    trace, so subscribers and the latency report treat it as live traffic.
+    """
+
+    def __init__(self, comm, path, speed=1.0, agents=None, into=None):
+        self.comm = comm
+        self.logger = comm.logger
+        self.path = path
+        self.speed = speed or None
+        self.agents = agents
+        self.into = into
+        self.routes = {}  # publisher name -> sockets its messages are sent on
+
+    def bind(self, warmup=0.5):
+        """Bind the replay sockets, then give subscribers `warmup` seconds to connect."""
+        reader = JournalReader(self.path)
+        try:
+            names = [name for name in reader.publishers()
+                     if not self.agents or name.partition("->")[0] in self.agents]
+        finally:
+            reader.close()
+
+        if self.into:
+            sockets = [self.comm.create_publisher(agent, key="subscriber") for agent in self.into]
+            if None in sockets:
+                raise RuntimeError(f"Cannot replay into {self.into}: a subscriber port is not available.")
+            self.routes = {name: sockets for name in names}
+        else:
+            into = {}  # agent -> socket bound on its subscriber port, shared by everything sent into it
+            for name in names:
+                publisher, _, target = name.partition("->")
+                if target:
+                    socket = into.get(target) or self.comm.create_publisher(target, key="subscriber")
+                    into[target] = socket
+                else:
+                    socket = self.comm.create_publisher(name)
+                if socket is None:
+                    raise RuntimeError(f"Cannot replay {name}: its port is not available.")
+                self.routes[name] = [socket]
+        time.sleep(warmup)  # ✅ PUB drops messages sent before subscribers connect
+        return names
+
+    def run(self, is_running=None):
+        """Replay the journal once; return (messages replayed, elapsed seconds)."""
+        if not self.routes:
+            self.bind()
+        reader = JournalReader(self.path)
+        sent, first, started = 0, None, time.perf_counter()
+        try:
+            for timestamp, publisher, frames in reader:
+                if is_running is not None and not is_running():
+                    break
+                sockets = self.routes.get(publisher)
+                if not sockets:
+                    continue
+                if self.speed:
+                    first = timestamp if first is None else first
+                    delay = (timestamp - first) / 1e9 / self.speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                for socket in sockets:
+                    self.comm.forward(socket, frames, agent=publisher.partition("->")[0])
+                sent += 1
+            if reader.truncated:
+                self.logger.warning(f"⚠️ {self.path} ends with an incomplete record (ignored).")
+        finally:
+            reader.close()
+        elapsed = time.perf_counter() - started
+        self.logger.info(f"⏩ Replayed {sent} message(s) from {self.path} in {elapsed:.3f}s")
+        return sent, elapsed
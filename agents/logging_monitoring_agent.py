@@ -1,14 +1,11 @@
-import zmq
-import logging
+import asyncio
 import os
 import sys
-import time
 
 # Ensure Python can find the parent directory
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from utils.logger import setup_logger
-from agents.comm_framework import CommFramework
 
 class LoggingMonitoringAgent:
     def __init__(self, comm_framework):
@@ -16,6 +13,7 @@ class LoggingMonitoringAgent:
         self.comm = comm_framework
         self.logger = setup_logger("LoggingMonitoringAgent", "logs/logging_monitoring_agent.log")
         self.running = True  # ✅ Enables graceful shutdown
+        self.event_loop = self.comm.create_event_loop("LoggingMonitoringAgent")
 
         self.logger.info("📊 Logging Monitoring Agent Started and ready to receive logs.")
 
@@ -26,39 +24,37 @@ class LoggingMonitoringAgent:
         # ✅ Subscribe to logs from all agents
         for agent in self.agents:
             try:
-                self.subscribers[agent] = self.comm.create_subscriber(agent, topic="LOG")
+                self.subscribers[agent] = self.comm.create_subscriber(agent, msg_types=["log"])
                 self.logger.info(f"✅ Subscribed to logs from {agent}")
             except Exception as e:
                 self.logger.error(f"❌ Failed to subscribe to logs from {agent}: {e}")
                 self.subscribers[agent] = None  # Mark as failed
 
+    def handle_log(self, agent, message):
+        """Record a log line received from another agent."""
+        self.logger.info(f"📝 {agent} Log: {message}")
+
     def run(self):
         """Continuously listen for logs from all agents."""
         self.logger.info("📊 Logging Monitoring Agent Running...")
 
-        while self.running:
-            for agent, subscriber in self.subscribers.items():
-                if not subscriber:
-                    continue  # ✅ Skip if subscription failed
-
-                try:
-                    message = None
-                    try:
-                        message = subscriber.recv_string(flags=zmq.NOBLOCK)  # ✅ Non-blocking receive
-                    except zmq.Again:
-                        pass  # ✅ No new messages, continue looping
-
-                    if message:
-                        self.logger.info(f"📝 {agent} Log: {message}")
+        for agent, subscriber in self.subscribers.items():
+            if not subscriber:
+                continue  # ✅ Skip if subscription failed
+            self.event_loop.register(subscriber, lambda message, agent=agent: self.handle_log(agent, message))
 
-                except zmq.ZMQError as e:
-                    self.logger.error(f"❌ ZMQ Error receiving log from {agent}: {e}")
-                except Exception as e:
-                    self.logger.error(f"❌ Unexpected error in LoggingMonitoringAgent for {agent}: {e}")
+        # ✅ One poller covers every agent's log stream
+        self.event_loop.run(lambda: self.running)
 
-            time.sleep(1)  # ✅ Prevent CPU overuse
+    async def run_async(self, runtime):
+        """Same as run(), as a coroutine on the asyncio runtime (see agents/async_runtime.py)."""
+        self.logger.info("📊 Logging Monitoring Agent Running (asyncio)...")
+        consumers = [runtime.consume(subscriber, lambda message, agent=agent: self.handle_log(agent, message))
+                     for agent, subscriber in self.subscribers.items() if subscriber]
+        await asyncio.gather(*consumers)
 
     def stop(self):
         """Gracefully stops the LoggingMonitoringAgent."""
         self.logger.info("🛑 Stopping Logging Monitoring Agent...")
         self.running = False  # ✅ Stops the loop properly
+        self.event_loop.stop()  # ✅ Wake the event loop immediately
@@ -2,7 +2,6 @@ import zmq
 import json
 import time
 import os
-import yfinance as yf
 import pandas as pd
 import sys
 
@@ -10,6 +9,9 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from utils.logger import get_logger
 from agents.comm_framework import CommFramework
+from agents.shm_bars import SharedBarStore
+from agents.bar_aggregator import BarAggregator, bar_frames
+from utils.data_providers import get_histories, get_history
 
 class MarketDataAgent:
     def __init__(self, comm_framework=None):
@@ -17,47 +19,96 @@ class MarketDataAgent:
         self.logger = get_logger("trading")
         self.tickers = ["QQQ", "SOXX", "SPY", "VGT", "ARKK"]
         self.running = True  
+        self.publisher = self.comm.create_publisher("MarketDataAgent") if self.comm else None
+        self.snapshot_server = self.comm.create_replier("MarketDataAgent") if self.comm else None
+        self.event_loop = self.comm.create_event_loop("MarketDataAgent") if self.comm else None
 
-    def fetch_data(self, ticker):
-        """Fetch real-time market data from Yahoo Finance."""
-        try:
-            if not self.running:
-                return None  
-
-            self.logger.log("info", f"Fetching data for {ticker}...")
-            data = yf.download(ticker, period="1y", interval="1d")
+        self.cycle_interval = 3600  # Seconds between refresh cycles
+        self.history = {}  # ✅ Latest full history per ticker, served as snapshots
+        self.last_published = {}  # ✅ Last published bar date per ticker
 
-            if data.empty:
-                self.logger.log("warning", f"No data found for {ticker}.")
-                return None
+        # ✅ Bars go to shared memory; the bus only carries "ticker X advanced to bar N"
+        store_config = (self.comm.settings.get("bar_store") or {}) if self.comm else {}
+        self.bar_store = None
+        if store_config.get("enabled"):
+            try:
+                self.bar_store = SharedBarStore.create(store_config.get("name", "ai_trading_bot_bars"), self.tickers,
+                                                       capacity=store_config.get("capacity", 1024))
+            except (OSError, ValueError) as e:
+                self.logger.log("error", f"Shared bar store unavailable, publishing bars on the bus: {e}")
 
-            self.logger.log("info", f"Data fetched for {ticker}, Shape: {data.shape}")
+        # ✅ Faster bars built from "tick" messages on the subscriber port, published as "bars_<spec>"
+        aggregator_config = (self.comm.settings.get("bar_aggregator") or {}) if self.comm else {}
+        self.aggregator = None
+        self.tick_subscriber = None
+        if aggregator_config.get("enabled"):
+            self.aggregator = BarAggregator(aggregator_config.get("bars", ["5s", "1m"]),
+                                            lateness=aggregator_config.get("lateness", 2.0))
+            self.publish_interval = aggregator_config.get("publish_interval", 0.1)
+            self.tick_subscriber = self.comm.create_subscriber("MarketDataAgent", msg_types=["tick"])
 
-            data.reset_index(inplace=True)
-            if "Date" not in data.columns:
-                if "index" in data.columns:
-                    data.rename(columns={"index": "Date"}, inplace=True)
-                else:
-                    self.logger.log("error", f"Missing 'Date' column for {ticker}. Columns: {list(data.columns)}")
-                    return None
+    def fetch_data(self, ticker):
+        """Fetch market data from the configured provider (see utils/data_providers.py)."""
+        return self.fetch_all([ticker]).get(ticker)
 
-            data["Date"] = data["Date"].astype(str)
-            data.columns = [str(col) for col in data.columns]  
+    def fetch_all(self, tickers=None):
+        """Fetch every ticker in one batch (concurrent, rate-limited downloads); return {ticker: bars}."""
+        tickers = tickers or self.tickers
+        if not self.running:
+            return {}
 
-            return data
+        self.logger.log("info", f"Fetching data for {', '.join(tickers)}...")
+        try:
+            histories = get_histories(tickers, period="1y", interval="1d", auto_adjust=True)
         except IOError as io_err:
-            self.logger.log("error", f"I/O Error fetching {ticker}: {io_err}")
-            return None
+            self.logger.log("error", f"I/O Error fetching {tickers}: {io_err}")
+            return {}
         except Exception as e:
-            self.logger.log("error", f"Unexpected error fetching {ticker}: {e}")
+            self.logger.log("error", f"Unexpected error fetching {tickers}: {e}")
+            return {}
+
+        fetched = {}
+        for ticker, data in histories.items():
+            try:
+                data = self.prepare(ticker, data)
+            except Exception as e:
+                self.logger.log("error", f"Unexpected error preparing {ticker}: {e}")
+                continue
+            if data is not None:
+                fetched[ticker] = data
+        return fetched
+
+    def prepare(self, ticker, data):
+        """Bars with a string 'Date' column, as published; None when there are none."""
+        if data.empty:
+            self.logger.log("warning", f"No data found for {ticker}.")
             return None
 
+        self.logger.log("info", f"Data fetched for {ticker}, Shape: {data.shape}")
+
+        # If data has a Multi-Index (ticker level), keep only the price type
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+
+        data = data.reset_index()
+        if "Date" not in data.columns:
+            if "index" in data.columns:
+                data.rename(columns={"index": "Date"}, inplace=True)
+            else:
+                self.logger.log("error", f"Missing 'Date' column for {ticker}. Columns: {list(data.columns)}")
+                return None
+
+        data["Date"] = data["Date"].astype(str)
+        data.columns = [str(col) for col in data.columns]
+
+        return data
+
     def get_historical_data(self, symbol, start_date, end_date):
         """Fetch historical market data from Yahoo Finance and fix Multi-Index column structure."""
         try:
             self.logger.log("info", f"Downloading historical data for {symbol} from {start_date} to {end_date}...")
 
-            data = yf.download(symbol, start=start_date, end=end_date, interval="1d", auto_adjust=False)
+            data = get_history(symbol, start=start_date, end=end_date, interval="1d", auto_adjust=False)
 
             if data.empty:
                 self.logger.log("warning", f"No historical data found for {symbol}.")
@@ -87,37 +138,130 @@ class MarketDataAgent:
             self.logger.log("error", f"Error retrieving historical data for {symbol}: {e}")
             return None
 
+    def compute_delta(self, ticker, data):
+        """Return the bars that are new or revised since the last publish for a ticker."""
+        previous = self.history.get(ticker)
+        last_date = self.last_published.get(ticker)
+        if previous is None or last_date is None:
+            return data  # ✅ First publish carries the full history
+
+        new_rows = data["Date"] > last_date
+
+        # ✅ A bar is revised when any of its values changed (e.g. today's partial bar)
+        current = data.set_index("Date")
+        before = previous.set_index("Date").reindex(current.index)
+        columns = current.columns.intersection(before.columns)
+        changed = (current[columns] != before[columns]) & ~(current[columns].isna() & before[columns].isna())
+        revised = changed.any(axis=1).to_numpy() & data["Date"].isin(previous["Date"]).to_numpy()
+
+        return data[new_rows.to_numpy() | revised]
+
+    def publish_bars(self, ticker, data):
+        """Publish only new or revised bars for a ticker and remember the full history."""
+        delta = self.compute_delta(ticker, data)
+        self.history[ticker] = data
+
+        if delta.empty:
+            self.logger.log("info", f"No new bars for {ticker}, nothing to publish.")
+            return
+
+        if self.publisher and not self.publisher.closed:
+            if self.bar_store:
+                bar = self.write_to_store(ticker, delta)
+                message = {"type": "bar_advanced", "ticker": ticker, "bar": bar, "updated": len(delta)}
+            else:
+                message = {"type": "delta", "ticker": ticker, "bars": delta}
+            self.comm.send(self.publisher, message, msg_type="bars", ticker=ticker)
+            self.last_published[ticker] = data["Date"].max()
+            self.logger.log("info", f"Published {len(delta)} new/revised bars for {ticker}.")
+        else:
+            self.logger.log("warning", f"Cannot publish {ticker} data: Publisher socket closed.")
+
+    def write_to_store(self, ticker, bars):
+        """Write new/revised bars to the shared bar store; return the ticker's bar count."""
+        timestamps = pd.to_datetime(bars["Date"], utc=True).dt.as_unit("ns").astype("int64").to_numpy()
+        columns = {column: bars[column].to_numpy() for column in self.bar_store.columns if column in bars}
+        return self.bar_store.write(ticker, timestamps, columns)
+
+    def handle_ticks(self, message):
+        """Feed ticks to the bar aggregator: one tick {"ticker", "time", "price", "size"} or a batch of
+        equal-length sequences {"tickers", "times", "prices", "sizes"} (times in ns since the epoch, UTC)."""
+        if "prices" in message:
+            self.aggregator.on_ticks(message["tickers"], message["times"], message["prices"], message.get("sizes"))
+        else:
+            self.aggregator.on_tick(message["ticker"], message["time"], message["price"], message.get("size", 0.0))
+
+    def publish_aggregated_bars(self):
+        """Finish due time bars and publish everything finished or revised since the last call."""
+        self.aggregator.flush()
+        for (ticker, spec), bars in bar_frames(self.aggregator.drain()).items():
+            message = {"type": "delta", "ticker": ticker, "interval": spec, "bars": bars}
+            try:
+                self.comm.send(self.publisher, message, msg_type=f"bars_{spec}", ticker=ticker)
+            except zmq.error.ZMQError as zmq_err:
+                self.logger.log("error", f"ZeroMQ Error while publishing {spec} bars for {ticker}: {zmq_err}")
+
+    def handle_snapshot_request(self, request):
+        """Reply with the full history for the requested tickers (all tickers by default).
+
+        Every request gets a reply, {"type": "error", "error": ...} when it is
+        malformed: a REP socket cannot receive again until it has answered.
+        """
+        reply = {"type": "error", "error": "snapshot failed"}
+        try:
+            request = {} if request is None else request
+            if not isinstance(request, dict) or request.get("type", "snapshot") != "snapshot":
+                raise ValueError(f"unsupported snapshot request {request!r}")
+            tickers = request.get("tickers") or list(self.history)
+            if isinstance(tickers, str):
+                tickers = [tickers]
+            if not isinstance(tickers, (list, tuple)) or not all(isinstance(ticker, str) for ticker in tickers):
+                raise ValueError(f"'tickers' must be a list of symbols, got {tickers!r}")
+            snapshot = {ticker: self.history[ticker] for ticker in tickers if ticker in self.history}
+            reply = {"type": "snapshot", "tickers": list(snapshot), **snapshot}
+            self.logger.log("info", f"Served snapshot for {len(snapshot)} ticker(s).")
+        except Exception as e:
+            reply = {"type": "error", "error": str(e)}
+            self.logger.log("warning", f"Rejected snapshot request: {e}")
+        finally:
+            self.comm.send(self.snapshot_server, reply)
+
+    def refresh_all(self):
+        """Fetch all tickers in one batch, publish them, then schedule the next cycle."""
+        for ticker, data in self.fetch_all().items():
+            try:
+                self.publish_bars(ticker, data)
+            except zmq.error.ZMQError as zmq_err:
+                self.logger.log("error", f"ZeroMQ Error while publishing {ticker}: {zmq_err}")
+            except Exception as e:
+                self.logger.log("error", f"Serialization Error for {ticker}: {e}")
+
+        self.logger.log("info", "Waiting 1 hour before next data fetch...")
+        self.event_loop.call_later(self.cycle_interval, self.refresh_all)
+
     def run(self):
-        """Fetch and publish market data continuously."""
+        """Fetch and publish market data continuously, answering snapshot requests in between."""
         self.logger.log("info", "Market Data Agent started.")
 
-        while self.running:  
-            for ticker in self.tickers:
-                if not self.running:
-                    break  
-                
-                data = self.fetch_data(ticker)
-                if data is not None:
-                    try:
-                        market_data_json = data.to_dict(orient="records")
-                        json_message = json.dumps(market_data_json)
-
-                        if self.publisher and not self.publisher.closed:
-                            self.publisher.send_string(json_message)
-                            self.logger.log("info", f"Published {ticker} data successfully.")
-                        else:
-                            self.logger.log("warning", f"Cannot publish {ticker} data: Publisher socket closed.")
-                    except zmq.error.ZMQError as zmq_err:
-                        self.logger.log("error", f"ZeroMQ Error while publishing {ticker}: {zmq_err}")
-                    except Exception as e:
-                        self.logger.log("error", f"JSON Serialization Error for {ticker}: {e}")
-
-                time.sleep(60)  
-
-            self.logger.log("info", "Waiting 1 hour before next data fetch...")
-            time.sleep(3600)  
+        if not self.event_loop:
+            self.logger.log("error", "Market Data Agent cannot run without a CommFramework.")
+            return
+
+        if self.snapshot_server:
+            self.event_loop.register(self.snapshot_server, self.handle_snapshot_request)
+        if self.tick_subscriber:
+            self.event_loop.register(self.tick_subscriber, self.handle_ticks)
+            self.event_loop.add_timer(self.publish_interval, self.publish_aggregated_bars)
+        self.event_loop.call_later(0, self.refresh_all)
+        self.event_loop.run(lambda: self.running)
+
+        if self.bar_store:
+            self.bar_store.close()  # ✅ Removes the segment; attached readers keep their mapping
+            self.bar_store = None
 
     def stop(self):
         """Gracefully stop the agent."""
         self.logger.log("info", "Stopping Market Data Agent...")
         self.running = False  
+        if self.event_loop:
+            self.event_loop.stop()  # ✅ Wake the event loop immediately
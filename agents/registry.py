@@ -0,0 +1,31 @@
+import importlib
+
+# Agents are registered as "module:Class" strings and only imported when they
+# start, so a process running RiskManagementAgent never imports yfinance,
+# pandas or torch for agents it does not run.
+AGENTS = {
+    "MarketDataAgent": "agents.market_data_agent:MarketDataAgent",
+    "SentimentAgent": "agents.sentiment_agent:SentimentAgent",
+    "StrategyAgent": "agents.strategy_agent:StrategyAgent",
+    "RiskManagementAgent": "agents.risk_agent:RiskManagementAgent",
+    "ExecutionAgent": "agents.execution_agent:ExecutionAgent",
+    "LoggingMonitoringAgent": "agents.logging_monitoring_agent:LoggingMonitoringAgent",
+}
+
+
+def load_agent(spec):
+    """Import and return the agent class for a "module:Class" spec (classes are returned as is)."""
+    if not isinstance(spec, str):
+        return spec
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def select_agents(names=None):
+    """Subset of AGENTS for the given names (all agents when `names` is empty)."""
+    if not names:
+        return dict(AGENTS)
+    unknown = [name for name in names if name not in AGENTS]
+    if unknown:
+        raise ValueError(f"Unknown agent(s) {unknown}. Available: {list(AGENTS)}")
+    return {name: AGENTS[name] for name in names}
@@ -1,7 +1,3 @@
-import zmq
-import json
-import time
-import logging
 import os
 import sys
 
@@ -9,7 +5,6 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from utils.logger import setup_logger
-from agents.comm_framework import CommFramework
 
 class RiskManagementAgent:
     def __init__(self, comm_framework):
@@ -17,9 +12,11 @@ class RiskManagementAgent:
         self.comm = comm_framework
         self.logger = setup_logger("RiskManagementAgent", "logs/risk_management.log")
         self.running = True  # ✅ Allows graceful shutdown
+        self.event_loop = self.comm.create_event_loop("RiskManagementAgent")
 
         try:
-            self.subscriber = self.comm.create_subscriber("RiskManagementAgent")
+            # ✅ legacy: untyped send_json signals from producers not yet publishing with comm.send
+            self.subscriber = self.comm.create_subscriber("RiskManagementAgent", msg_types=["signal"], legacy=True)
             self.publisher = self.comm.create_publisher("RiskManagementAgent")
         except Exception as e:
             self.subscriber = None
@@ -51,6 +48,27 @@ class RiskManagementAgent:
 
         return {"status": risk_status, "details": details}
 
+    def handle_trade_signal(self, trade_signal):
+        """Evaluate a trade signal from the bus and publish the risk assessment."""
+        self.logger.info(f"📥 Received Trade Signal: {trade_signal}")
+
+        # ✅ Evaluate the risk of the trade
+        risk_result = self.evaluate_risk(trade_signal)
+
+        # ✅ Send the risk assessment result
+        response = {
+            "ticker": trade_signal.get("ticker", "Unknown"),
+            "signal": trade_signal.get("signal", "Unknown"),
+            "risk_status": risk_result["status"],
+            "details": risk_result["details"],
+        }
+
+        if self.publisher and not self.publisher.closed:
+            self.comm.send(self.publisher, response, msg_type="risk", ticker=response["ticker"])
+            self.logger.info(f"🛡️ Risk Evaluation Sent: {response}")
+        else:
+            self.logger.warning("⚠️ Cannot send risk evaluation: Publisher socket closed.")
+
     def run(self):
         """Continuously listen for trade signals and process risk assessment."""
         self.logger.info("🛡️ Risk Management Agent Started.")
@@ -59,41 +77,18 @@ class RiskManagementAgent:
             self.logger.error("❌ RiskManagementAgent failed to initialize communication sockets.")
             return
 
-        while self.running:
-            try:
-                message = None
-                try:
-                    message = self.subscriber.recv_string(flags=zmq.NOBLOCK)  # ✅ Non-blocking receive
-                except zmq.Again:
-                    pass  # ✅ No message available, continue looping
-
-                if message:
-                    trade_signal = json.loads(message)
-                    self.logger.info(f"📥 Received Trade Signal: {trade_signal}")
-
-                    # ✅ Evaluate the risk of the trade
-                    risk_result = self.evaluate_risk(trade_signal)
-
-                    # ✅ Send the risk assessment result
-                    response = json.dumps({
-                        "ticker": trade_signal.get("ticker", "Unknown"),
-                        "signal": trade_signal.get("signal", "Unknown"),
-                        "risk_status": risk_result["status"],
-                        "details": risk_result["details"],
-                    })
-
-                    if self.publisher and not self.publisher.closed:
-                        self.publisher.send_string(response)
-                        self.logger.info(f"🛡️ Risk Evaluation Sent: {response}")
-                    else:
-                        self.logger.warning("⚠️ Cannot send risk evaluation: Publisher socket closed.")
-
-            except Exception as e:
-                self.logger.error(f"❌ Error in RiskManagementAgent: {e}")
+        # ✅ Block until signals arrive instead of polling once per second
+        self.event_loop.register(self.subscriber, self.handle_trade_signal)
+        self.event_loop.run(lambda: self.running)
 
-            time.sleep(1)  # ✅ Prevent CPU overuse
+    async def run_async(self, runtime):
+        """Same as run(), as a coroutine on the asyncio runtime (see agents/async_runtime.py)."""
+        self.logger.info("🛡️ Risk Management Agent Started (asyncio).")
+        if self.subscriber and self.publisher:
+            await runtime.consume(self.subscriber, self.handle_trade_signal)
 
     def stop(self):
         """Gracefully stops the RiskManagementAgent."""
         self.logger.info("🛑 Stopping Risk Management Agent...")
         self.running = False  # ✅ Stops the loop properly
+        self.event_loop.stop()  # ✅ Wake the event loop immediately
@@ -1,54 +1,54 @@
-import zmq
-import json
-import time
-import logging
 import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from utils.logger import setup_logger
-from agents.comm_framework import CommFramework
 
 class SentimentAgent:
     def __init__(self, comm_framework):
         self.comm = comm_framework
         self.publisher = self.comm.create_publisher("SentimentAgent")
-        self.subscriber = self.comm.create_subscriber("SentimentAgent", topic="NEWS")
+        self.subscriber = self.comm.create_subscriber("SentimentAgent", msg_types=["news"])
         self.logger = setup_logger("SentimentAgent", "logs/sentiment_agent.log")
         self.running = True  # ✅ Allows graceful shutdown
+        self.event_loop = self.comm.create_event_loop("SentimentAgent")
 
-    def run(self):
-        """Continuously processes news sentiment until stopped."""
-        self.logger.info("🚀 Sentiment Agent Started.")
+    def handle_news(self, message):
+        """Score a news message and publish the resulting sentiment."""
+        self.logger.info(f"📥 Received News Data: {message}")
+
+        # Process sentiment analysis (Placeholder logic)
+        sentiment = "Positive"  # Dummy sentiment
 
-        while self.running:
-            try:
-                if self.subscriber:
-                    message = self.subscriber.recv_string(flags=zmq.NOBLOCK)  # ✅ Non-blocking receive
-                    self.logger.info(f"📥 Received News Data: {message}")
+        sentiment_data = {"sentiment": sentiment}
 
-                    # Process sentiment analysis (Placeholder logic)
-                    sentiment = "Positive"  # Dummy sentiment
+        # ✅ Ensure publisher is available before sending
+        if self.publisher and not self.publisher.closed:
+            self.comm.send(self.publisher, sentiment_data, msg_type="sentiment")
+            self.logger.info(f"📤 Sentiment Sent: {sentiment_data}")
+        else:
+            self.logger.warning("⚠️ Cannot send sentiment data: Publisher socket closed.")
 
-                    sentiment_data = json.dumps({"sentiment": sentiment})
+    def run(self):
+        """Continuously processes news sentiment until stopped."""
+        self.logger.info("🚀 Sentiment Agent Started.")
 
-                    # ✅ Ensure publisher is available before sending
-                    if self.publisher and not self.publisher.closed:
-                        self.publisher.send_string(sentiment_data)
-                        self.logger.info(f"📤 Sentiment Sent: {sentiment_data}")
-                    else:
-                        self.logger.warning("⚠️ Cannot send sentiment data: Publisher socket closed.")
-                else:
-                    self.logger.warning("⚠️ No subscriber available for SentimentAgent.")
+        if not self.subscriber:
+            self.logger.warning("⚠️ No subscriber available for SentimentAgent.")
+            return
 
-            except zmq.Again:
-                pass  # ✅ No message available, continue looping
-            except Exception as e:
-                self.logger.error(f"❌ Error in SentimentAgent loop: {e}")
+        # ✅ Process news as soon as it arrives instead of once a minute
+        self.event_loop.register(self.subscriber, self.handle_news)
+        self.event_loop.run(lambda: self.running)
 
-            time.sleep(60)  # ✅ Controlled delay to avoid infinite loop issues
+    async def run_async(self, runtime):
+        """Same as run(), as a coroutine on the asyncio runtime (see agents/async_runtime.py)."""
+        self.logger.info("🚀 Sentiment Agent Started (asyncio).")
+        if self.subscriber:
+            await runtime.consume(self.subscriber, self.handle_news)
 
     def stop(self):
         """Gracefully stops the SentimentAgent."""
         self.logger.info("🛑 Stopping Sentiment Agent...")
         self.running = False  # ✅ Signal loop to exit
+        self.event_loop.stop()  # ✅ Wake the event loop immediately
@@ -0,0 +1,209 @@
+import json
+import sys
+
+# Every message on the bus is a multipart ZeroMQ message:
+#   frame 0     topic ("<msgtype>.<ticker>." or b"", see make_topic)
+#   frame 1     JSON header ({"fmt": ..., plus format specific metadata})
+#   frame 2..n  body frames, interpreted according to the header
+# A single-frame message is a legacy `send_string`/`send_json` payload.
+# SUB sockets filter on the topic frame, so unwanted messages are dropped by
+# ZeroMQ before Python decodes anything.
+
+
+def make_topic(msg_type, ticker=None):
+    """Build a topic such as "bars.SPY." (or "bars." to match every ticker).
+
+    Each segment ends with a dot so ZeroMQ prefix matching is exact per
+    segment: "bars.SPY." does not match "bars.SPYX.".
+    """
+    return f"{msg_type}.{ticker}." if ticker else f"{msg_type}."
+
+
+def _is_frame(value):
+    """Duck-typed DataFrame check (avoids importing pandas on the hot path)."""
+    return hasattr(value, "columns") and hasattr(value, "to_numpy") and hasattr(value, "iloc")
+
+
+def _np():
+    """NumPy, imported on first use: agents that only exchange plain dicts never load it."""
+    import numpy
+    return numpy
+
+
+def _is_array(value):
+    """ndarray check that does not import NumPy (nothing can be an ndarray before it is imported)."""
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def _buffer(frame):
+    """Return a zero-copy buffer for a zmq.Frame, bytes or memoryview."""
+    return frame.buffer if hasattr(frame, "buffer") else memoryview(frame)
+
+
+def _column_array(column):
+    """Convert a DataFrame column into a contiguous little-endian array."""
+    np = _np()
+    array = column.to_numpy()
+    if array.dtype == object:
+        array = array.astype(str)
+    if array.dtype.byteorder == ">":
+        array = array.astype(array.dtype.newbyteorder("<"))
+    return np.ascontiguousarray(array)
+
+
+def _sendable(array):
+    """Buffer ZeroMQ can send: datetime64/timedelta64 do not export one, so send their int64 view.
+
+    The header keeps the real dtype, so the receiver's np.frombuffer restores it.
+    """
+    return array.view("<i8") if array.dtype.kind in "mM" else array
+
+
+def _json_default(value):
+    """Fallback for NumPy scalars and arrays inside JSON payloads."""
+    if _is_array(value):
+        return value.tolist()
+    if hasattr(value, "item") and hasattr(value, "dtype"):  # NumPy scalar
+        return value.item()
+    return str(value)
+
+
+class JsonSerializer:
+    """Human-readable format, used for debugging and for small control messages.
+
+    DataFrames are sent column-oriented and decoded back into a dict of NumPy
+    arrays, so subscribers see the same structure as with NumpySerializer.
+    """
+
+    name = "json"
+
+    def encode(self, payload, header=None):
+        tables = []
+        if isinstance(payload, dict):
+            body = {}
+            for key, value in payload.items():
+                if _is_frame(value):
+                    tables.append(key)
+                    value = {str(col): _column_array(value[col]).tolist() for col in value.columns}
+                body[key] = value
+        else:
+            body = payload
+
+        header = {**(header or {}), "fmt": self.name}
+        if tables:
+            header["tables"] = tables
+        return [json.dumps(header).encode(), json.dumps(body, default=_json_default).encode()]
+
+    def decode(self, header, frames):
+        payload = json.loads(bytes(_buffer(frames[0])))
+        for key in header.get("tables", []):
+            payload[key] = {col: _np().asarray(values) for col, values in payload[key].items()}
+        return payload
+
+
+class NumpySerializer:
+    """Compact binary format for columnar data.
+
+    DataFrames and NumPy arrays at the top level of a dict payload are sent as
+    raw little-endian column buffers, one frame each. Everything else goes in
+    the JSON header. Decoding wraps the received frames with np.frombuffer, so
+    the arrays are zero-copy, read-only views of the message.
+    """
+
+    name = "numpy"
+
+    def encode(self, payload, header=None):
+        if not isinstance(payload, dict):
+            return JsonSerializer().encode(payload, header)
+
+        data, tables, arrays, frames = {}, {}, {}, []
+        for key, value in payload.items():
+            if _is_frame(value):
+                layout = []
+                for col in value.columns:
+                    array = _column_array(value[col])
+                    layout.append([str(col), array.dtype.str])
+                    frames.append(_sendable(array))
+                tables[key] = layout
+            elif _is_array(value):
+                array = _np().ascontiguousarray(value)
+                if array.dtype.byteorder == ">":
+                    array = array.astype(array.dtype.newbyteorder("<"))
+                arrays[key] = [array.dtype.str, list(array.shape)]
+                frames.append(_sendable(array))
+            else:
+                data[key] = value
+
+        if not frames:
+            return JsonSerializer().encode(payload, header)
+
+        header = {**(header or {}), "fmt": self.name, "data": data, "tables": tables, "arrays": arrays}
+        return [json.dumps(header, default=_json_default).encode()] + frames
+
+    def decode(self, header, frames):
+        np = _np()
+        payload = dict(header.get("data", {}))
+        index = 0
+        for key, layout in header.get("tables", {}).items():
+            columns = {}
+            for col, dtype in layout:
+                columns[col] = np.frombuffer(_buffer(frames[index]), dtype=np.dtype(dtype))
+                index += 1
+            payload[key] = columns
+        for key, (dtype, shape) in header.get("arrays", {}).items():
+            payload[key] = np.frombuffer(_buffer(frames[index]), dtype=np.dtype(dtype)).reshape(shape)
+            index += 1
+        return payload
+
+
+SERIALIZERS = {
+    JsonSerializer.name: JsonSerializer(),
+    NumpySerializer.name: NumpySerializer(),
+}
+
+
+def get_serializer(name):
+    """Look up a serializer by name."""
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer '{name}'. Available: {sorted(SERIALIZERS)}")
+    return SERIALIZERS[name]
+
+
+def encode_message(payload, serializer, topic="", header=None):
+    """Encode a payload into a list of frames for `send_multipart`.
+
+    `header` adds envelope fields (e.g. sequence numbers) next to the format
+    metadata; they are returned by split_frames() without decoding the body.
+    """
+    return [topic.encode()] + serializer.encode(payload, header)
+
+
+def split_frames(frames):
+    """Return (topic, header, body frames) without decoding the body."""
+    if len(frames) == 1:
+        return "", {"fmt": "legacy"}, frames
+    return bytes(_buffer(frames[0])).decode(), json.loads(bytes(_buffer(frames[1]))), frames[2:]
+
+
+def decode_body(header, body):
+    """Decode the body frames of a message using the format named in its header."""
+    if header.get("fmt") == "legacy":
+        # Legacy single-frame message (send_string / send_json)
+        text = bytes(_buffer(body[0])).decode("utf-8")
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+    return get_serializer(header.get("fmt", JsonSerializer.name)).decode(header, body)
+
+
+def decode_envelope(frames):
+    """Decode frames received with `recv_multipart` into (topic, payload)."""
+    topic, header, body = split_frames(frames)
+    return topic, decode_body(header, body)
+
+
+def decode_message(frames):
+    """Decode frames received with `recv_multipart` into the payload only."""
+    return decode_envelope(frames)[1]
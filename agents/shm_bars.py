@@ -0,0 +1,245 @@
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# One shared-memory segment holds fixed-width bar columns for every ticker:
+#   header    int64[8]                               magic, version, tickers, capacity, columns, generation,
+#                                                    retired
+#   names     16-byte ASCII per ticker, then per column
+#   control   int64[tickers, 2]                      seqlock sequence, bars written so far
+#   times     int64[tickers, 2 * capacity]           bar timestamps (ns since epoch, UTC)
+#   values    float64[tickers, columns, 2 * capacity]
+# Bar N lives at ring index N % capacity and is written twice (at i and
+# i + capacity), so the last `capacity` bars are always one contiguous slice
+# and readers get zero-copy views without handling the wrap-around.
+#
+# MarketDataAgent is the only writer. It makes the sequence odd while it
+# writes a ticker and even again when done (seqlock); readers retry when the
+# sequence was odd or changed while they read.
+#
+# A restarted MarketDataAgent creates a new segment under the same name.
+# Readers keep the old mapping, so the writer marks the old segment retired
+# (when it closes it, or when create() replaces a stale one) and every
+# segment carries its creation time as `generation`: readers compare it with
+# the segment currently under the name and re-attach when it changed.
+
+MAGIC = 0x42415253  # "BARS"
+VERSION = 2
+NAME_BYTES = 16
+COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+_created = set()  # Segments created by this process (the resource tracker owns their cleanup)
+
+
+def _layout(n_tickers, n_columns, capacity):
+    """Byte offsets of each region and the total segment size."""
+    names = 8 * 8
+    control = names + NAME_BYTES * (n_tickers + n_columns)
+    control += -control % 8
+    times = control + 8 * 2 * n_tickers
+    values = times + 8 * n_tickers * 2 * capacity
+    size = values + 8 * n_tickers * n_columns * 2 * capacity
+    return names, control, times, values, size
+
+
+def _open(name):
+    shm = shared_memory.SharedMemory(name=name)
+    if shm._name not in _created:
+        # ✅ Only the writer may unlink the segment when its process exits
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _retire(shm):
+    """Mark a segment as replaced so that attached readers move to its successor."""
+    header = np.ndarray(8, dtype=np.int64, buffer=shm.buf) if shm.size >= 64 else None
+    if header is not None and header[0] == MAGIC:
+        header[6] = 1
+    del header
+
+
+class SharedBarStore:
+    """Ring buffer of OHLCV bars per ticker in multiprocessing.shared_memory.
+
+    Use SharedBarStore.create() in the writer and SharedBarStore.attach() in
+    readers (any process on the host).
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        header = np.ndarray(8, dtype=np.int64, buffer=shm.buf)
+        if header[0] != MAGIC or header[1] != VERSION:
+            raise ValueError(f"Shared memory '{shm.name}' is not a version {VERSION} bar store.")
+        n_tickers, self.capacity, n_columns, self.generation = (int(value) for value in header[2:6])
+        self.header = header
+
+        names, control, times, values, _ = _layout(n_tickers, n_columns, self.capacity)
+        raw = bytes(shm.buf[names:names + NAME_BYTES * (n_tickers + n_columns)])
+        labels = [raw[i:i + NAME_BYTES].rstrip(b"\0").decode() for i in range(0, len(raw), NAME_BYTES)]
+        self.tickers, self.columns = labels[:n_tickers], labels[n_tickers:]
+        self.index = {ticker: slot for slot, ticker in enumerate(self.tickers)}
+
+        self.control = np.ndarray((n_tickers, 2), dtype=np.int64, buffer=shm.buf, offset=control)
+        self.times = np.ndarray((n_tickers, 2 * self.capacity), dtype=np.int64, buffer=shm.buf, offset=times)
+        self.values = np.ndarray((n_tickers, n_columns, 2 * self.capacity), dtype=np.float64,
+                                 buffer=shm.buf, offset=values)
+        if not owner:
+            self.times.flags.writeable = False
+            self.values.flags.writeable = False
+
+    @classmethod
+    def create(cls, name, tickers, columns=COLUMNS, capacity=1024):
+        """Create the segment (replacing a stale one left by a crashed writer)."""
+        names, _, _, _, size = _layout(len(tickers), len(columns), capacity)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            _retire(stale)  # ✅ Readers still attached to it re-attach to the new segment
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created.add(shm._name)
+
+        shm.buf[:size] = bytes(size)
+        np.ndarray(8, dtype=np.int64, buffer=shm.buf)[:7] = [MAGIC, VERSION, len(tickers), capacity, len(columns),
+                                                             time.time_ns(), 0]
+        for i, label in enumerate(list(tickers) + list(columns)):
+            encoded = label.encode()[:NAME_BYTES]
+            shm.buf[names + i * NAME_BYTES:names + i * NAME_BYTES + len(encoded)] = encoded
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Open an existing store read-only. Raises FileNotFoundError until the writer has created it."""
+        return cls(_open(name), owner=False)
+
+    @staticmethod
+    def generation_of(name):
+        """Generation of the store currently under `name` (None when there is none)."""
+        try:
+            shm = _open(name)
+        except FileNotFoundError:
+            return None
+        try:
+            header = np.ndarray(8, dtype=np.int64, buffer=shm.buf)
+            generation = int(header[5]) if header[0] == MAGIC else None
+            del header
+            return generation
+        finally:
+            shm.close()
+
+    @property
+    def retired(self):
+        """True once the writer closed or replaced this segment: its data will not change any more."""
+        return bool(self.header[6])
+
+    def replaced(self):
+        """True when the segment under this store's name is no longer the one attached (re-attach to follow it).
+
+        Opens the segment by name unless it is marked retired, so callers check it every few seconds only.
+        """
+        return self.retired or self.generation_of(self.shm.name) != self.generation
+
+    def write(self, ticker, timestamps, columns):
+        """Append new bars and overwrite revised ones; return the ticker's bar count.
+
+        `timestamps` are ns since epoch in ascending order; bars at or before
+        the last stored timestamp replace the stored bar with that timestamp.
+        `columns` maps column names to arrays; missing columns are NaN.
+        """
+        slot = self.index[ticker]
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        values = np.full((len(self.columns), len(timestamps)), np.nan)
+        for j, column in enumerate(self.columns):
+            if column in columns:
+                values[j] = np.asarray(columns[column], dtype=np.float64)
+
+        count = int(self.control[slot, 1])
+        kept = min(count, self.capacity)
+        start = (count - kept) % self.capacity
+        stored = self.times[slot, start:start + kept]
+        last = stored[-1] if kept else np.iinfo(np.int64).min
+
+        new = timestamps > last
+        revised = np.flatnonzero(~new)
+        found = np.searchsorted(stored, timestamps[revised])
+        matched = (found < kept) & (stored[np.minimum(found, max(kept - 1, 0))] == timestamps[revised])
+        added = int(new.sum())
+        appended = np.flatnonzero(new)[-self.capacity:]  # ✅ Older bars would be overwritten anyway
+
+        positions = np.concatenate([count - kept + found[matched],
+                                    count + added - len(appended) + np.arange(len(appended))])
+        source = np.concatenate([revised[matched], appended])
+
+        self.control[slot, 0] += 1  # ✅ Odd: write in progress
+        ring = positions % self.capacity
+        for offset in (ring, ring + self.capacity):
+            self.times[slot, offset] = timestamps[source]
+            self.values[slot][:, offset] = values[:, source]
+        self.control[slot, 1] = count + added
+        self.control[slot, 0] += 1  # ✅ Even: consistent again
+        return count + added
+
+    def _views(self, slot, count, bars):
+        kept = min(count, self.capacity)
+        bars = kept if bars is None else min(bars, kept)
+        start = (count - bars) % self.capacity
+        views = {"Date": self.times[slot, start:start + bars].view("datetime64[ns]")}
+        for j, column in enumerate(self.columns):
+            views[column] = self.values[slot, j, start:start + bars]
+        return views
+
+    def view(self, ticker, bars=None):
+        """Return (sequence, bar count, zero-copy views of the last `bars` bars).
+
+        The views alias shared memory: a later revision or wrap-around changes
+        them in place. Check unchanged(ticker, sequence) after using them, or
+        use read() for a private copy.
+        """
+        slot = self.index[ticker]
+        while True:
+            sequence = int(self.control[slot, 0])
+            if sequence % 2:
+                time.sleep(0)
+                continue
+            count = int(self.control[slot, 1])
+            views = self._views(slot, count, bars)
+            if int(self.control[slot, 0]) == sequence:
+                return sequence, count, views
+
+    def read(self, ticker, bars=None):
+        """Return (bar count, copies of the last `bars` bars), consistent under concurrent writes."""
+        slot = self.index[ticker]
+        while True:
+            sequence, count, views = self.view(ticker, bars)
+            copies = {column: array.copy() for column, array in views.items()}
+            if int(self.control[slot, 0]) == sequence:
+                return count, copies
+
+    def unchanged(self, ticker, sequence):
+        """True if nothing was written for `ticker` since view() returned `sequence`."""
+        return int(self.control[self.index[ticker], 0]) == sequence
+
+    def bar_count(self, ticker):
+        return int(self.control[self.index[ticker], 1])
+
+    def close(self, unlink=None):
+        """Release the mapping; the writer also removes the segment by default."""
+        if unlink is None:
+            unlink = self.owner
+        if unlink and self.header is not None:
+            _retire(self.shm)
+        self.control = self.times = self.values = self.header = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # ✅ Views still in use elsewhere: the mapping is freed with them
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            _created.discard(self.shm._name)
@@ -1,15 +1,47 @@
-import os
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from stable_baselines3 import PPO
 import logging
+import time
+
+from utils.batch_indicators import compute_indicators
+from utils.history_store import period_start
+from utils.indicator_engine import IndicatorEngine, bar_times
+from utils.market_data_cache import MarketDataCache
+from utils.model_registry import shared_registry
+
+SIGNAL_CONSUMERS = ["RiskManagementAgent"]  # ✅ ExecutionAgent only acts on what risk approves
 
 class StrategyAgent:
-    def __init__(self):
+    def __init__(self, comm_framework=None):
         """Initialize StrategyAgent with logging and trade tracking."""
+        self.comm = comm_framework
+        self.tickers = ["QQQ", "SOXX", "SPY", "VGT", "ARKK"]
+        self.running = True
+        self.signal_interval = 60  # Seconds between signal evaluations
         self.last_trade_day = {}  # ✅ Track last trade date per ticker
-        self.market_data_cache = {}  # ✅ Cache fetched market data
+        self.history_period = "60d"  # Bars the strategy evaluates, whichever source provides them
+        # ✅ Bars expire at bar close; LRU within a memory budget, refreshed in the background
+        cache_config = ((self.comm.settings.get("market_data") or {}).get("cache") or {}) if self.comm else {}
+        self.market_data_cache = MarketDataCache.from_settings(cache_config, name="StrategyAgent")
+
+        # ✅ Indicators updated per new bar instead of recomputed over the whole frame
+        indicator_config = (self.comm.settings.get("indicators") or {}) if self.comm else {}
+        self.indicator_checkpoint = indicator_config.get("checkpoint")
+        full_history = bool(indicator_config.get("full_history", False))
+        if self.indicator_checkpoint:
+            self.indicators = IndicatorEngine.restore(self.indicator_checkpoint, full_history)
+        else:
+            self.indicators = IndicatorEngine(full_history)
+
+        # ✅ PPO models loaded once per process (shared with every StrategyAgent), reloaded when retrained
+        self.models = shared_registry((self.comm.settings.get("models") or {}) if self.comm else None)
+
+        # ✅ Bars written by MarketDataAgent in shared memory (attached on first use)
+        store_config = (self.comm.settings.get("bar_store") or {}) if self.comm else {}
+        self.bar_store_name = store_config.get("name", "ai_trading_bot_bars") if store_config.get("enabled") else None
+        self.bar_store = None
+        self.bar_store_check_interval = 5.0  # Seconds between checks that MarketDataAgent did not recreate it
+        self.bar_store_checked = 0.0
 
         # ✅ Initialize logger properly
         self.logger = logging.getLogger("StrategyAgent")
@@ -18,42 +50,78 @@ class StrategyAgent:
         console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
         self.logger.addHandler(console_handler)
 
+        # ✅ Signals are published into the agents that act on them
+        self.publisher = self.comm.create_publisher_into("StrategyAgent", SIGNAL_CONSUMERS) if self.comm else None
+        self.event_loop = self.comm.create_event_loop("StrategyAgent") if self.comm else None
+
+        if self.comm:
+            self.models.preload()  # ✅ Configured tickers loaded in parallel before the first signal
+
     def load_ppo_model(self, ticker):
-        """Load PPO model for a specific ticker."""
-        model_path = f"models/{ticker}_ppo.zip"
-        if not os.path.exists(model_path):
-            self.logger.error(f"❌ Model not found: {model_path}")
+        """PPO model for a specific ticker (None if missing or unloadable), from the shared registry."""
+        return self.models.get(ticker)
+
+    def get_bar_store(self):
+        """Attach to MarketDataAgent's shared bar store once it exists, and again whenever it is recreated."""
+        if not self.bar_store_name:
             return None
-        try:
-            model = PPO.load(model_path)
-            self.logger.info(f"📥 Loaded Model: {model_path}")
-            return model
-        except Exception as e:
-            self.logger.error(f"❌ Model Load Error: {e}")
+        now = time.monotonic()
+        if self.bar_store is not None and (self.bar_store.retired or
+                                           now - self.bar_store_checked >= self.bar_store_check_interval):
+            self.bar_store_checked = now
+            if self.bar_store.replaced():  # ✅ MarketDataAgent restarted: its old segment is no longer written
+                self.logger.info(f"🔄 Shared bar store '{self.bar_store_name}' was recreated, re-attaching")
+                self.bar_store.close()
+                self.bar_store = None
+        if self.bar_store is None:
+            try:
+                from agents.shm_bars import SharedBarStore
+                self.bar_store = SharedBarStore.attach(self.bar_store_name)
+                self.bar_store_checked = now
+                self.logger.info(f"🔗 Attached to shared bar store '{self.bar_store_name}'")
+            except FileNotFoundError:
+                pass  # MarketDataAgent has not created it yet
+        return self.bar_store
+
+    def read_bar_store(self, ticker):
+        """Bars for a ticker from shared memory as a DataFrame (None if unavailable).
+
+        The columns are copied under the store's seqlock: views would alias
+        shared memory that MarketDataAgent revises in place.
+        """
+        store = self.get_bar_store()
+        if store is None or ticker not in store.index or not store.bar_count(ticker):
             return None
+        _, bars = store.read(ticker)
+        dates = pd.DatetimeIndex(bars.pop("Date"), name="Date")
+        return pd.DataFrame(bars, index=dates, copy=False)
 
     def fetch_market_data(self, ticker):
         """Fetch the latest market data for analysis and cache it."""
-        if ticker in self.market_data_cache:
-            return self.market_data_cache[ticker]  # ✅ Use cached data
+        data = self.read_bar_store(ticker)
+        if data is not None:
+            # ✅ Always current (MarketDataAgent updates it in place), but it holds a year: same window as below
+            window = data[data.index >= period_start(self.history_period, pd.Timestamp.now().floor("s"))]
+            if not window.empty:
+                return window
 
         try:
-            data = yf.download(ticker, period="60d", interval="1d")
+            data = self.market_data_cache.get(ticker, period=self.history_period, interval="1d", auto_adjust=True)
             if data.empty or "Close" not in data.columns:
                 self.logger.warning(f"⚠️ No valid market data for {ticker}.")
                 return None
-            self.market_data_cache[ticker] = data  # ✅ Cache the data
             return data
         except Exception as e:
             self.logger.error(f"❌ Market Data Fetch Error: {e}")
             return None
 
     def calculate_indicators(self, data):
-        """Calculate trend, momentum, and volatility indicators."""
+        """Calculate trend, momentum, and volatility indicators over the whole frame (returns a copy)."""
         if data is None or data.empty or "Close" not in data.columns:
             self.logger.error("❌ Indicator Calculation Failed: No Market Data")
             return None
 
+        data = data.copy()  # ✅ The frame may be shared with the market data cache or the bar store
         data["SMA_50"] = data["Close"].rolling(window=50).mean()
         data["SMA_200"] = data["Close"].rolling(window=200).mean()
         data["RSI"] = self.calculate_rsi(data["Close"])
@@ -93,11 +161,11 @@ class StrategyAgent:
         signal_line = macd.ewm(span=signal, adjust=False).mean()
         return macd, signal_line
 
-    def market_regime(self, data):
-        """Detect if the market is bullish, bearish, or sideways."""
-        if data["SMA_50"].iloc[-1] > data["SMA_200"].iloc[-1]:  
+    def market_regime(self, indicators):
+        """Detect if the market is bullish, bearish, or sideways from the latest indicator values."""
+        if indicators["SMA_50"] > indicators["SMA_200"]:
             return "BULLISH"
-        elif data["SMA_50"].iloc[-1] < data["SMA_200"].iloc[-1]:  
+        elif indicators["SMA_50"] < indicators["SMA_200"]:
             return "BEARISH"
         return "SIDEWAYS"
 
@@ -109,14 +177,15 @@ class StrategyAgent:
         if model is None or data is None:
             return "HOLD"
 
-        data = self.calculate_indicators(data)
-        if data is None:
+        if data.empty or not {"High", "Low", "Close"}.issubset(data.columns):
+            self.logger.error("❌ Indicator Calculation Failed: No Market Data")
             return "HOLD"
+        indicators = self.indicators.sync(ticker, data)  # ✅ Same values as calculate_indicators(data)
 
-        market_condition = self.market_regime(data)
-        latest_rsi = data["RSI"].iloc[-1]
-        latest_macd = data["MACD"].iloc[-1]
-        latest_macd_signal = data["MACD_signal"].iloc[-1]
+        market_condition = self.market_regime(indicators)
+        latest_rsi = indicators["RSI"]
+        latest_macd = indicators["MACD"]
+        latest_macd_signal = indicators["MACD_signal"]
 
         self.logger.info(f"📊 Market Regime for {ticker}: {market_condition}")
         self.logger.info(f"🔹 RSI: {latest_rsi:.2f}, MACD: {latest_macd:.2f}, MACD Signal: {latest_macd_signal:.2f}")
@@ -140,3 +209,83 @@ class StrategyAgent:
 
         self.logger.info(f"⏳ Trade Signal: HOLD for {ticker}")
         return "HOLD"
+
+    def trade_signals(self, ticker, data, cooldown_days=10):
+        """predict_trade_signal's rules for every row of a bar frame at once, each row seeing only the bars
+        up to it (the backtest's history, not the live window). Returns an array of "BUY"/"SELL"/"HOLD"."""
+        signals = np.full(len(data), "HOLD", dtype=object)
+        if self.load_ppo_model(ticker) is None or data is None or data.empty:
+            return signals
+        if not {"High", "Low", "Close"}.issubset(data.columns):
+            self.logger.error("❌ Indicator Calculation Failed: No Market Data")
+            return signals
+
+        # ✅ Same values as calculate_indicators, computed on one (rows x 1) matrix without pandas overhead;
+        # causal windows: row i only uses rows <= i
+        high, low, close = (data[column].to_numpy(dtype=np.float64)[:, None] for column in ("High", "Low", "Close"))
+        indicators = compute_indicators(high, low, close)
+        tradeable = ~(indicators["SMA_50"][:, 0] < indicators["SMA_200"][:, 0])  # BULLISH or SIDEWAYS
+        rsi = indicators["RSI"][:, 0]
+        candidates = np.flatnonzero(tradeable & ((rsi < 30) | (rsi > 65)))
+
+        # ✅ Cooldown: after a trade, skip straight to the first candidate at least `cooldown_days` later
+        times = bar_times(data)
+        cooldown = pd.Timedelta(days=cooldown_days).value
+        last_trade_date = self.last_trade_day.get(ticker)
+        allowed_from = pd.Timestamp(last_trade_date).value + cooldown if last_trade_date is not None else times[0]
+        trades = []
+        while True:
+            k = np.searchsorted(candidates, np.searchsorted(times, allowed_from, side="left"))
+            if k == len(candidates):
+                break
+            trades.append(candidates[k])
+            allowed_from = times[candidates[k]] + cooldown
+
+        trades = np.asarray(trades, dtype=np.intp)
+        signals[trades] = np.where(rsi[trades] < 30, "BUY", "SELL")
+        if len(trades):
+            dates = data.index if isinstance(data.index, pd.DatetimeIndex) else pd.DatetimeIndex(data["Date"])
+            self.last_trade_day[ticker] = dates[trades[-1]]
+        self.logger.info(f"📊 {ticker}: {int((signals == 'BUY').sum())} BUY / {int((signals == 'SELL').sum())} SELL "
+                         f"signals over {len(data)} bars")
+        return signals
+
+    def publish_signal(self, ticker, signal):
+        """Publish a trade signal on the "signal.<ticker>." topic."""
+        message = {"ticker": ticker, "signal": signal}
+        if self.publisher is None or self.publisher.closed:
+            self.logger.warning(f"⚠️ Cannot send trade signal {message}: Publisher socket closed.")
+            return
+        self.comm.send(self.publisher, message, msg_type="signal", ticker=ticker)
+        self.logger.info(f"📤 Trade Signal Sent: {message}")
+
+    def publish_signals(self):
+        """Evaluate every ticker and publish its BUY/SELL signal (HOLD needs no action downstream)."""
+        for ticker in self.tickers:
+            try:
+                signal = self.predict_trade_signal(ticker)
+                if signal in ("BUY", "SELL"):
+                    self.publish_signal(ticker, signal)
+            except Exception as e:
+                self.logger.error(f"❌ Signal Error for {ticker}: {e}")
+
+    def run(self):
+        """Evaluate the tickers every `signal_interval` seconds and publish their trade signals."""
+        self.logger.info("🧠 Strategy Agent Started.")
+        if not self.event_loop or not self.publisher:
+            self.logger.error("❌ StrategyAgent cannot run without a signal publisher.")
+            return
+
+        self.event_loop.call_later(0, self.publish_signals)
+        self.event_loop.add_timer(self.signal_interval, self.publish_signals)
+        self.event_loop.run(lambda: self.running)
+
+    def stop(self):
+        """Stop the loop and save the indicator state so a restart resumes without recomputing history."""
+        self.running = False
+        if self.event_loop:
+            self.event_loop.stop()  # ✅ Wake the event loop immediately
+        if self.indicator_checkpoint:
+            self.indicators.checkpoint(self.indicator_checkpoint)
+            self.logger.info(f"💾 Indicator state saved to {self.indicator_checkpoint}")
+        self.market_data_cache.close()
@@ -1,17 +1,19 @@
+import argparse
 import os
 import sys
 import time
 import logging
 import numpy as np
 import pandas as pd
-import zmq
-import yfinance as yf
-from stable_baselines3 import PPO
+import yaml
 
 # Ensure utils module is found
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from utils.data_utils import preprocess_data
+from agents.comm_framework import CommFramework
+from utils.market_data_cache import MarketDataCache
+from utils.batched_inference import ACTION_SIGNALS, BatchedInference
+from utils.model_registry import shared_registry
 # ✅ Configure logging with UTF-8 support for Windows compatibility
 logging.basicConfig(
     level=logging.INFO,
@@ -22,35 +24,46 @@ logging.basicConfig(
     ],
 )
 class StrategyAgent:
-    def __init__(self):
-        """Initialize the strategy agent, set up logging, and load models."""
+    def __init__(self, comm_framework=None):
+        """Initialize the strategy agent, set up logging, and load models.
+
+        Signals are published on the CommFramework bus (a tcp one when run
+        as a script), where RiskManagementAgent and ExecutionAgent receive
+        them.
+        """
         self.logger = logging.getLogger(__name__)
         logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
         self.tickers = ["QQQ", "VGT", "SOXX", "ARKK", "SPY"]
-        self.models = {}
+        with open("config/config.yml", "r") as file:
+            settings = yaml.safe_load(file) or {}
+
+        # ✅ Same process-wide registry as StrategyAgent: each model is loaded once, reloaded when retrained
+        self.models = shared_registry(settings.get("models"))
         self.load_models()
+        self.inference = BatchedInference(self.logger)
 
-        # ZeroMQ Setup
-        self.context = zmq.Context()
-        self.socket = self.context.socket(zmq.PUB)
-        self.socket.bind("tcp://127.0.0.1:5556")
-        logging.info(" ZeroMQ Bound to tcp://127.0.0.1:5560")
+        # ✅ Hourly bars are downloaded once per bar, not on every evaluation
+        self.market_data_cache = MarketDataCache.from_settings((settings.get("market_data") or {}).get("cache"),
+                                                               name="PaperStrategyAgent")
+
+        # ✅ Signals go into the paper ExecutionAgent (this pair runs without the main pipeline's risk agent),
+        # as "signal.<ticker>." messages
+        self.comm = comm_framework or CommFramework(transport="tcp")
+        self.publisher = self.comm.create_publisher_into("StrategyAgent", ["ExecutionAgent"])
+        self.running = True
 
     def load_models(self):
-        """Load trained PPO models for each ETF."""
-        for ticker in self.tickers:
-            try:
-                self.models[ticker] = PPO.load(f"models/{ticker}_ppo.zip")
-                self.logger.info(f"✅ Loaded PPO model for {ticker}.")
-            except Exception as e:
-                self.logger.error(f" Could not load PPO model for {ticker}: {e}")
+        """Load trained PPO models for each ETF (in parallel, into the shared registry)."""
+        for ticker, model in self.models.preload(self.tickers).items():
+            if model is None:
+                self.logger.error(f" Could not load PPO model for {ticker}.")
 
     def get_market_data(self, ticker):
         """Fetch market data, ensure correct preprocessing, and reshape for PPO input."""
         try:
-            df = yf.download(ticker, period="60d", interval="1h", auto_adjust=False)  # Fix for YF update
-            df.dropna(inplace=True)
+            df = self.market_data_cache.get(ticker, period="60d", interval="1h", auto_adjust=False)  # Fix for YF update
+            df = df.dropna()  # ✅ Not in place: the frame is shared with the cache
 
             # Ensure correct feature selection for PPO model (modify if needed)
             features = ["Open", "High", "Low"]
@@ -72,32 +85,45 @@ class StrategyAgent:
 
     def predict_trade_signal(self, ticker):
         """Use the trained PPO model to predict a trade signal based on market data."""
-        try:
-            obs = self.get_market_data(ticker)
+        return self.predict_trade_signals([ticker])[0]
 
+    def predict_trade_signals(self, tickers=None):
+        """Trade signals for many tickers, with one forward pass per model or group of same-shape policies."""
+        tickers = tickers or self.tickers
+        observations, models = {}, {}
+        for ticker in tickers:
+            obs = self.get_market_data(ticker)
             if isinstance(obs, np.ndarray) and obs.shape == (50, 3):
-                action, _ = self.models[ticker].predict(obs, deterministic=True)
-                action_map = {0: "BUY", 1: "SELL", 2: "HOLD"}
-                return {"ticker": ticker, "signal": action_map.get(int(action), "HOLD")}
+                observations[ticker] = obs
             else:
                 self.logger.error(f" Observation shape {obs.shape} is invalid for PPO. Expected (50,3).")
-                return {"ticker": ticker, "signal": "HOLD"}
+            models[ticker] = self.models.get(ticker)
 
+        try:
+            actions = self.inference.predict(models, observations)
         except Exception as e:
-            self.logger.error(f" Error predicting trade signal for {ticker}: {e}")
-            return {"ticker": ticker, "signal": "HOLD"}
+            self.logger.error(f" Error predicting trade signals for {', '.join(tickers)}: {e}")
+            actions = {}
+        return [{"ticker": ticker, "signal": ACTION_SIGNALS.get(actions.get(ticker), "HOLD")} for ticker in tickers]
 
     def run(self):
         """Main loop to fetch market data, generate trade signals, and publish them via ZeroMQ."""
         self.logger.info(" Strategy Agent Initialized and Running...")
-        while True:
-            for ticker in self.tickers:
-                signal = self.predict_trade_signal(ticker)
+        while self.running:
+            for signal in self.predict_trade_signals():  # ✅ All tickers in one batched inference
+                self.comm.send(self.publisher, signal, msg_type="signal", ticker=signal["ticker"])
                 self.logger.info(f" Trade Signal Sent: {signal}")
-                self.socket.send_json(signal)
 
             time.sleep(60)  # Evaluate market every minute
 
 if __name__ == "__main__":
-    agent = StrategyAgent()
-    agent.run()
+    parser = argparse.ArgumentParser(description="PPO paper trading strategy agent.")
+    parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                        help="Bus transport shared with the execution process (inproc cannot cross processes)")
+    args = parser.parse_args()
+
+    agent = StrategyAgent(CommFramework(transport=args.transport))
+    try:
+        agent.run()
+    finally:
+        agent.comm.cleanup()
@@ -0,0 +1,219 @@
+import multiprocessing as mp
+import os
+import signal
+import sys
+import threading
+import time
+
+import psutil
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.logger import setup_logger
+
+
+def run_agent_group(group_name, agent_specs, config_path, transport, heartbeat, stop_event,
+                    heartbeat_interval=1.0, cpus=None):
+    """Process entry point: run a group of agents as threads sharing one CommFramework.
+
+    `agent_specs` maps agent names to "module:Class" specs (see
+    agents/registry.py), so each process only imports the agents it runs.
+
+    Follows the same contract as main.start_agent (`agent_class(comm)`, the
+    `running` flag, `stop()`), beats `heartbeat` while every agent is alive and
+    exits non-zero as soon as one of them dies so the supervisor restarts it.
+    """
+    from agents.comm_framework import CommFramework
+    from agents.registry import load_agent
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # ✅ Shutdown is coordinated by the supervisor
+    logger = setup_logger(f"AgentGroup.{group_name}", "logs/supervisor.log")
+
+    if cpus:
+        try:
+            psutil.Process().cpu_affinity(list(cpus))
+            logger.info(f"📌 {group_name} pinned to CPUs {list(cpus)}")
+        except (AttributeError, ValueError, psutil.Error) as e:
+            logger.warning(f"⚠️ CPU pinning not available for {group_name}: {e}")
+
+    comm = CommFramework(config_path, transport=transport)
+    agents, threads = [], []
+
+    def start(agent):
+        try:
+            agent.run()
+        except Exception as e:
+            logger.error(f"❌ {agent.__class__.__name__} crashed: {e}")
+
+    for name, agent_spec in agent_specs.items():
+        try:
+            started = time.perf_counter()
+            agent = load_agent(agent_spec)(comm)
+            agent.running = True
+        except Exception as e:
+            logger.error(f"❌ Failed to start {name}: {e}")
+            comm.cleanup()
+            sys.exit(1)
+        thread = threading.Thread(target=start, args=(agent,), name=name, daemon=True)
+        thread.start()
+        agents.append(agent)
+        threads.append(thread)
+        logger.info(f"✅ {name} started in process {os.getpid()} ({time.perf_counter() - started:.2f}s).")
+
+    exit_code = 0
+    while not stop_event.is_set():
+        if not all(thread.is_alive() for thread in threads):
+            dead = [thread.name for thread in threads if not thread.is_alive()]
+            logger.error(f"❌ {group_name}: agent(s) {dead} stopped unexpectedly.")
+            exit_code = 1
+            break
+        heartbeat.value = time.time()
+        stop_event.wait(heartbeat_interval)
+
+    for agent in agents:
+        agent.running = False
+        if hasattr(agent, "stop"):
+            agent.stop()
+    for thread in threads:
+        thread.join(timeout=5)
+    comm.cleanup()
+    sys.exit(exit_code)
+
+
+class AgentGroup:
+    """Supervisor-side state for one agent process."""
+
+    def __init__(self, name, agent_names, cpus=None):
+        self.name = name
+        self.agent_names = agent_names
+        self.cpus = cpus
+        self.process = None
+        self.heartbeat = None
+        self.stop_event = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.restart_at = None  # ✅ Pending restart time (backoff)
+
+
+class AgentSupervisor:
+    """Run each agent group in its own OS process, restart crashed groups with backoff.
+
+    `agents` maps names to "module:Class" specs, as in agents/registry.py.
+    """
+
+    def __init__(self, agents, config_path="config/config.yml", settings=None):
+        self.agents = agents
+        self.config_path = config_path
+        self.settings = settings or {}
+        self.logger = setup_logger("AgentSupervisor", "logs/supervisor.log")
+        self.context = mp.get_context("spawn")  # ✅ Fresh interpreters: no inherited sockets or locks
+
+        transport = self.settings.get("transport", "ipc")
+        if transport == "inproc":
+            self.logger.warning("⚠️ inproc cannot cross process boundaries, using ipc instead.")
+            transport = "ipc"
+        self.transport = transport
+        self.heartbeat_interval = self.settings.get("heartbeat_interval", 1.0)
+        self.heartbeat_timeout = self.settings.get("heartbeat_timeout", 10.0)
+        self.startup_timeout = self.settings.get("startup_timeout", 60.0)  # Imports (torch, pandas) are slow
+        backoff = self.settings.get("restart_backoff") or {}
+        self.initial_backoff = backoff.get("initial", 1.0)
+        self.max_backoff = backoff.get("max", 60.0)
+        self.stable_after = backoff.get("reset_after", 60.0)  # Uptime that resets the backoff
+        self.groups = self.build_groups(self.settings.get("groups") or {}, self.settings.get("pin_cpus"))
+        self.running = False
+
+    def build_groups(self, group_config, pin_cpus=None):
+        """Create process groups from config; agents not listed get a process of their own."""
+        groups, assigned = [], set()
+        for name, spec in group_config.items():
+            names = [agent for agent in spec.get("agents", []) if agent in self.agents]
+            if names:
+                groups.append(AgentGroup(name, names, spec.get("cpus")))
+                assigned.update(names)
+        for agent in self.agents:
+            if agent not in assigned:
+                groups.append(AgentGroup(agent, [agent]))
+
+        # ✅ "auto" pins groups without explicit CPUs round-robin over the available cores
+        if pin_cpus == "auto":
+            cores = psutil.cpu_count() or 1
+            for index, group in enumerate(groups):
+                if group.cpus is None:
+                    group.cpus = [index % cores]
+        return groups
+
+    def start_group(self, group):
+        group.heartbeat = self.context.Value("d", 0.0)  # ✅ 0 until the process has started up
+        group.stop_event = self.context.Event()
+        agent_specs = {name: self.agents[name] for name in group.agent_names}
+        group.process = self.context.Process(
+            target=run_agent_group,
+            args=(group.name, agent_specs, self.config_path, self.transport, group.heartbeat,
+                  group.stop_event, self.heartbeat_interval, group.cpus),
+            name=f"agents-{group.name}",
+        )
+        group.process.start()
+        group.started_at = time.time()
+        group.restart_at = None
+        self.logger.info(f"🚀 Started {group.name} {group.agent_names} as PID {group.process.pid}")
+
+    def check_group(self, group):
+        """Restart a group whose process died or stopped sending heartbeats."""
+        now = time.time()
+        if group.restart_at is not None:
+            if now >= group.restart_at:
+                self.start_group(group)
+            return
+
+        if group.process.is_alive():
+            last_beat = group.heartbeat.value
+            silent_for = now - (last_beat or group.started_at)
+            if silent_for <= (self.heartbeat_timeout if last_beat else self.startup_timeout):
+                return
+            self.logger.error(f"💔 {group.name} missed heartbeats for {silent_for:.1f}s. Terminating...")
+            group.process.terminate()
+            group.process.join(5)
+
+        if now - group.started_at >= self.stable_after:
+            group.restarts = 0
+        delay = min(self.initial_backoff * (2 ** group.restarts), self.max_backoff)
+        group.restarts += 1
+        group.restart_at = now + delay
+        self.logger.warning(f"🔁 {group.name} exited (code {group.process.exitcode}). "
+                            f"Restart #{group.restarts} in {delay:.1f}s.")
+
+    def run(self):
+        """Start every group and supervise until stop() is called."""
+        self.running = True
+        for group in self.groups:
+            self.start_group(group)
+
+        while self.running:
+            for group in self.groups:
+                self.check_group(group)
+            time.sleep(self.heartbeat_interval)
+
+        self.shutdown()
+
+    def stop(self, signum=None, frame=None):
+        """Request a coordinated shutdown (usable as a signal handler)."""
+        self.logger.info(f"🚨 Supervisor received stop request ({signum}).")
+        self.running = False
+
+    def shutdown(self, timeout=10.0):
+        """Ask every group to stop, then terminate whatever is still running after `timeout`."""
+        self.logger.info("🛑 Stopping all agent processes...")
+        for group in self.groups:
+            if group.process is not None and group.process.is_alive():
+                group.stop_event.set()
+
+        deadline = time.time() + timeout
+        for group in self.groups:
+            if group.process is not None:
+                group.process.join(max(0.0, deadline - time.time()))
+                if group.process.is_alive():
+                    self.logger.warning(f"⚠️ {group.name} did not stop in time. Terminating...")
+                    group.process.terminate()
+                    group.process.join(5)
+        self.logger.info("✅ All agent processes stopped.")
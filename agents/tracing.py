@@ -0,0 +1,166 @@
+import contextlib
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+# Every traced bus message carries a trace in its header:
+#   {"id": "<trace id>", "hops": [[agent, "send" | "recv", monotonic_ns], ...]}
+# A trace starts when an agent publishes outside of a message handler (e.g. a
+# MarketDataAgent timer). Messages published while a traced message is being
+# handled continue that trace, so bar -> signal -> risk -> execution share one
+# ID. time.monotonic_ns() is one system-wide clock, so timestamps taken in
+# different agent processes on the same host can be compared.
+
+
+class LatencyHistogram:
+    """HDR-style latency histogram (nanoseconds).
+
+    Values are bucketed on their `significant_bits` most significant bits, so
+    the relative error is below 2 ** (1 - significant_bits) (under 1% with the
+    default) at every magnitude and memory only grows with the buckets used.
+    """
+
+    def __init__(self, significant_bits=8):
+        self.significant_bits = significant_bits
+        self.counts = defaultdict(int)
+        self.count = 0
+        self.max = 0
+
+    def _shift(self, value):
+        return max(0, value.bit_length() - self.significant_bits)
+
+    def record(self, value):
+        value = max(0, int(value))
+        shift = self._shift(value)
+        self.counts[(value >> shift) << shift] += 1
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        """Highest value equivalent to the given percentile (0-100)."""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(bucket + (1 << self._shift(bucket)) - 1, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max,
+        }
+
+
+def segments(hops, start=1):
+    """Yield (owner agent, segment name, nanoseconds) for hops[start:].
+
+    A "recv" hop yields the bus transit from the previous hop and the end to
+    end latency since the trace started; a "send" hop yields the time the
+    agent spent handling the message it had received.
+    """
+    origin = hops[0]
+    for index in range(max(1, start), len(hops)):
+        prev_agent, _, prev_time = hops[index - 1]
+        agent, event, timestamp = hops[index]
+        if event == "recv":
+            yield agent, f"{prev_agent} -> {agent}", timestamp - prev_time
+            yield agent, f"end_to_end {origin[0]} -> {agent}", timestamp - origin[2]
+        elif prev_agent == agent:
+            yield agent, f"{agent} processing", timestamp - prev_time
+
+
+def format_report(histograms):
+    """Render {segment name: LatencyHistogram} as a table in microseconds."""
+    lines = [f"{'segment':<52} {'count':>8} {'p50 us':>10} {'p99 us':>10} {'p999 us':>10} {'max us':>10}"]
+    for name in sorted(histograms, key=lambda n: (n.startswith("end_to_end"), n)):
+        stats = histograms[name].summary()
+        lines.append(f"{name:<52} {stats['count']:>8} {stats['p50'] / 1e3:>10.1f} {stats['p99'] / 1e3:>10.1f} "
+                     f"{stats['p999'] / 1e3:>10.1f} {stats['max'] / 1e3:>10.1f}")
+    return lines
+
+
+class Tracer:
+    """Adds traces to outgoing messages and records hop latencies of incoming ones.
+
+    The trace of the message being handled is kept in a context variable, so
+    each agent thread (and each asyncio task) continues its own trace. With
+    `record_path`, every received trace is appended as a JSON line for
+    scripts/latency_report.py.
+    """
+
+    def __init__(self, record_path=None):
+        self.histograms = defaultdict(LatencyHistogram)
+        self.owners = {}
+        self.lock = threading.Lock()
+        self.current_trace = contextvars.ContextVar(f"trace-{id(self)}", default=None)
+        self.record_file = None
+        if record_path:
+            os.makedirs(os.path.dirname(record_path) or ".", exist_ok=True)
+            self.record_file = open(record_path, "a", encoding="utf-8", buffering=1)
+
+    def current(self):
+        return self.current_trace.get()
+
+    def clear(self):
+        self.current_trace.set(None)
+
+    @contextlib.contextmanager
+    def scope(self):
+        """Restore the current trace when the block exits, whatever was received inside it."""
+        token = self.current_trace.set(self.current())
+        try:
+            yield
+        finally:
+            self.current_trace.reset(token)
+
+    def _record(self, hops, start):
+        with self.lock:
+            for owner, name, value in segments(hops, start):
+                self.owners[name] = owner
+                self.histograms[name].record(value)
+
+    def outgoing(self, agent):
+        """Trace for a message `agent` publishes: the current trace plus a send hop, or a new trace."""
+        hop = [agent, "send", time.monotonic_ns()]
+        trace = self.current()
+        if trace is None:
+            return {"id": uuid.uuid4().hex, "hops": [hop]}
+        hops = trace["hops"] + [hop]
+        self._record(hops, len(hops) - 1)
+        return {"id": trace["id"], "hops": hops}
+
+    def incoming(self, agent, trace):
+        """Add the receive hop to a message's trace, record it and make it the current trace."""
+        if not trace:
+            self.clear()
+            return
+        trace = {"id": trace["id"], "hops": trace["hops"] + [[agent, "recv", time.monotonic_ns()]]}
+        self._record(trace["hops"], len(trace["hops"]) - 1)
+        self.current_trace.set(trace)
+        if self.record_file:
+            with self.lock:
+                self.record_file.write(json.dumps(trace) + "\n")
+
+    def report(self, agent=None):
+        """Latency table for every segment (or only the segments owned by `agent`)."""
+        with self.lock:
+            histograms = {name: hist for name, hist in self.histograms.items()
+                          if agent is None or self.owners[name] == agent}
+            return format_report(histograms) if histograms else []
+
+    def close(self):
+        if self.record_file:
+            self.record_file.close()
+            self.record_file = None
@@ -6,7 +6,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
 from datetime import datetime
-from agents.market_data_agent import MarketDataAgent
+from utils.data_providers import get_history
 from backtesting.performance_metrics import PerformanceMetrics
 from utils.logger import backtest_logger
 
@@ -20,9 +20,11 @@ class BacktestEngine:
         self.data = None
 
     def load_data(self, symbol, start_date, end_date):
-        """Load historical data and ensure correct format"""
-        market_data = MarketDataAgent(comm_framework=None)
-        self.data = market_data.get_historical_data(symbol, start_date, end_date)
+        """Load historical data from the configured market data provider and ensure correct format"""
+        self.data = get_history(symbol, start=start_date, end=end_date, interval="1d", auto_adjust=False)
+        if self.data is not None and not self.data.empty:
+            self.data = self.data.reset_index()
+            self.data["Date"] = self.data["Date"].astype(str)
 
         if self.data is None or self.data.empty:
             backtest_logger.log("error", f"Failed to load data for {symbol}. Exiting backtest.")
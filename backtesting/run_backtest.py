@@ -5,12 +5,12 @@ import time
 import logging
 import os
 import sys
-import yfinance as yf
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from backtesting.strategy_tester import StrategyTester
 from backtesting.backtest_engine import BacktestEngine
+from utils.data_providers import get_history
 
 # ✅ Initialize standard logger (removing `get_logger`)
 logger = logging.getLogger("backtesting")
@@ -37,8 +37,8 @@ def main():
     backtest = BacktestEngine(INITIAL_CAPITAL)
 
     # ✅ Fetch and process data
-    logger.info(f"📥 Downloading historical data for {SYMBOL} from {START_DATE} to {END_DATE}...")
-    market_data = yf.download(SYMBOL, start=START_DATE, end=END_DATE)
+    logger.info(f"📥 Loading historical data for {SYMBOL} from {START_DATE} to {END_DATE}...")
+    market_data = get_history(SYMBOL, start=START_DATE, end=END_DATE, auto_adjust=True)
 
     if market_data.empty:
         logger.error(f"❌ No market data found for {SYMBOL}. Exiting backtest.")
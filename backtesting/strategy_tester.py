@@ -1,9 +1,13 @@
+import numpy as np
 import pandas as pd
 from agents.strategy_agent import StrategyAgent
+from utils.batched_inference import ACTION_SIGNALS, window_actions
 
 class StrategyTester:
-    def __init__(self):
+    def __init__(self, batch=True, policy=False):
         self.strategy_agent = StrategyAgent()  # ✅ No CommFramework
+        self.batch = batch  # ✅ One vectorized pass over the backtest frame instead of one evaluation per row
+        self.policy = policy  # Also add the PPO policy's action per row ("Policy_Signal", batch mode only)
 
     def generate_signal(self, ticker, close_price):
         """Generate trade signals using StrategyAgent."""
@@ -15,20 +19,34 @@ class StrategyTester:
 
         return signal
 
+    def policy_signals(self, ticker, data, lookback=50, features=("Open", "High", "Low")):
+        """PPO signal for every row from its trailing `lookback` bars, in one batched model call."""
+        model = self.strategy_agent.load_ppo_model(ticker)
+        if model is None or not set(features).issubset(data.columns):
+            return np.full(len(data), "HOLD", dtype=object)
+        actions = window_actions(model, data[list(features)].to_numpy(dtype=np.float64), lookback)
+        return np.array([ACTION_SIGNALS.get(action, "HOLD") for action in actions.tolist()], dtype=object)
+
     def apply_strategy(self, ticker, data):
         """Apply the trading strategy to the dataset."""
         
         # ✅ Debugging: Print data before applying strategy
         print(f"\nMarket Data BEFORE strategy applied:\n{data.head()}")  
 
-        signals = []
+        if self.batch:
+            # ✅ Indicators, regime/RSI rules and cooldown over the whole frame at once
+            data["Trade_Signal"] = self.strategy_agent.trade_signals(ticker, data)
+            if self.policy:
+                data["Policy_Signal"] = self.policy_signals(ticker, data)
+        else:
+            signals = []
 
-        for index, row in data.iterrows():
-            signal = self.generate_signal(ticker, row["Close"])  # ✅ Pass close price for prediction
-            signals.append(signal)
+            for index, row in data.iterrows():
+                signal = self.generate_signal(ticker, row["Close"])  # ✅ Pass close price for prediction
+                signals.append(signal)
 
-        # ✅ Add the 'Trade_Signal' column to the data
-        data["Trade_Signal"] = signals
+            # ✅ Add the 'Trade_Signal' column to the data
+            data["Trade_Signal"] = signals
 
         # ✅ Debugging: Print data after adding 'Trade_Signal'
         print(f"\nMarket Data AFTER strategy applied:\n{data[['Close', 'Trade_Signal']].head()}")  
@@ -1,10 +1,14 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import logging
 import os
+import sys
 from sklearn.preprocessing import MinMaxScaler
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.data_providers import get_histories
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -23,8 +27,9 @@ class DataPreprocessor:
         logging.info("Fetching historical market data...")
         data = {}
 
-        for ticker in self.tickers:
-            df = yf.download(ticker, period=self.period, auto_adjust=False)  # ✅ Fix: Disable auto-adjustment
+        # ✅ One batch for all tickers: concurrent, rate-limited downloads
+        histories = get_histories(self.tickers, period=self.period, auto_adjust=False)  # ✅ Fix: Disable auto-adjustment
+        for ticker, df in histories.items():
             if df.empty:
                 logging.warning(f"No data found for {ticker}")
                 continue
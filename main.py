@@ -5,32 +5,30 @@ import os
 import signal
 import atexit
 import time
+import argparse
+import asyncio
+import yaml
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from agents.comm_framework import CommFramework
-from agents.market_data_agent import MarketDataAgent
-from agents.sentiment_agent import SentimentAgent
-from agents.strategy_agent import StrategyAgent
-from agents.risk_agent import RiskManagementAgent
-from agents.execution_agent import ExecutionAgent
-from agents.logging_monitoring_agent import LoggingMonitoringAgent
+from agents.registry import load_agent, select_agents
+from agents.supervisor import AgentSupervisor
 
 # Configure logging (Global Logger)
 logging.basicConfig(level=logging.INFO)
 
-# Initialize communication framework
-comm_framework = CommFramework()
+CONFIG_PATH = "config/config.yml"
 
-# Dictionary of agent names and their classes
-AGENTS = {
-    "MarketDataAgent": MarketDataAgent,
-    "SentimentAgent": SentimentAgent,
-    "StrategyAgent": StrategyAgent,
-    "RiskManagementAgent": RiskManagementAgent,
-    "ExecutionAgent": ExecutionAgent,
-    "LoggingMonitoringAgent": LoggingMonitoringAgent
-}
+# Communication framework (created by run_threads; each supervised process creates its own)
+comm_framework = None
+
+# Bus journal path (--record) and the recorder writing it
+RECORD_PATH = None
+recorder = None
+
+# Agent names and their "module:Class" specs (see agents/registry.py), narrowed by --agents
+AGENTS = select_agents()
 
 # Track running agent threads
 threads = []
@@ -49,11 +47,16 @@ def shutdown(signum=None, frame=None):
         try:
             logging.info(f"🛑 Stopping {agent.__class__.__name__}...")
             agent.running = False  # Signal agents to stop their loops
+            if hasattr(agent, "stop"):
+                agent.stop()  # Wake blocked event loops immediately
         except Exception as e:
             logging.error(f"❌ Error stopping {agent.__class__.__name__}: {e}")
 
     time.sleep(2)  # Give agents time to clean up
 
+    if recorder:
+        recorder.stop()
+
     # Cleanup ZeroMQ sockets properly
     try:
         comm_framework.cleanup()
@@ -67,14 +70,17 @@ def shutdown(signum=None, frame=None):
     # Exit safely
     sys.exit(0)
 
-# Ensure cleanup on exit
-atexit.register(shutdown)
-signal.signal(signal.SIGINT, shutdown)
-signal.signal(signal.SIGTERM, shutdown)
+def start_recorder(comm):
+    """Record every publisher to RECORD_PATH (see agents/journal.py) when --record is given."""
+    from agents.journal import JournalRecorder
+    return JournalRecorder(comm, RECORD_PATH).start() if RECORD_PATH else None
 
-def start_agent(agent_class, name):
+def start_agent(agent_spec, name):
     """Starts an agent and adds it to the running agents list."""
     try:
+        started = time.perf_counter()
+        agent_class = load_agent(agent_spec)  # ✅ Imports the agent module (and its dependencies) only now
+        logging.info(f"📦 {name} loaded in {time.perf_counter() - started:.2f}s.")
         agent = agent_class(comm_framework)
         agent.running = True  # Ensure each agent has a running flag
         running_agents.append(agent)
@@ -83,12 +89,22 @@ def start_agent(agent_class, name):
     except Exception as e:
         logging.error(f"❌ Failed to start {name}: {e}")
 
-if __name__ == "__main__":
+def run_threads():
+    """Run every agent as a thread of this process, sharing one CommFramework."""
+    global comm_framework, recorder
+    comm_framework = CommFramework(CONFIG_PATH)
+    recorder = start_recorder(comm_framework)
+
+    # Ensure cleanup on exit
+    atexit.register(shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
     logging.info("🚀 Starting all agents...")
 
     # Start all agents in separate threads
-    for agent_name, agent_class in AGENTS.items():
-        thread = threading.Thread(target=start_agent, args=(agent_class, agent_name), daemon=True)
+    for agent_name, agent_spec in AGENTS.items():
+        thread = threading.Thread(target=start_agent, args=(agent_spec, agent_name), daemon=True)
         thread.start()
         threads.append(thread)
 
@@ -99,3 +115,57 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         logging.info("🛑 Manual interruption detected.")
         shutdown()
+
+def run_supervisor():
+    """Run agents in separate OS processes (see the `supervisor` section of config.yml)."""
+    with open(CONFIG_PATH, "r") as file:
+        settings = (yaml.safe_load(file) or {}).get("supervisor") or {}
+
+    supervisor = AgentSupervisor(AGENTS, CONFIG_PATH, settings)
+    signal.signal(signal.SIGINT, supervisor.stop)
+    signal.signal(signal.SIGTERM, supervisor.stop)
+    logging.info("🚀 Starting all agents under the process supervisor...")
+    supervisor.run()
+
+def run_asyncio():
+    """Run agents as coroutines on one asyncio loop (blocking agents get a worker thread)."""
+    from agents.async_runtime import AsyncRuntime
+
+    comm = CommFramework(CONFIG_PATH)
+    recorder = start_recorder(comm)
+    agents = []
+    for agent_name, agent_spec in AGENTS.items():
+        try:
+            agents.append(load_agent(agent_spec)(comm))
+        except Exception as e:
+            logging.error(f"❌ Failed to start {agent_name}: {e}")
+
+    logging.info("🚀 Starting all agents on the asyncio runtime...")
+    try:
+        asyncio.run(AsyncRuntime(comm).run(agents))
+    finally:
+        if recorder:
+            recorder.stop()
+        comm.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start the AI Trading Bot agents.")
+    parser.add_argument("--mode", choices=["thread", "process", "async"], default="thread",
+                        help="thread: all agents in this process; process: supervised agent processes; "
+                             "async: agents as coroutines on one asyncio loop")
+    parser.add_argument("--agents", nargs="+", metavar="AGENT", choices=list(AGENTS),
+                        help="Only run these agents (default: all)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="Record all bus traffic to a journal (replay it with scripts/replay_bus.py)")
+    args = parser.parse_args()
+    AGENTS = select_agents(args.agents)
+    RECORD_PATH = args.record
+
+    if args.mode == "process":
+        if RECORD_PATH:
+            logging.warning("⚠️ --record needs a shared bus: run scripts/record_bus.py next to the supervisor.")
+        run_supervisor()
+    elif args.mode == "async":
+        run_asyncio()
+    else:
+        run_threads()
@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.bar_aggregator import BarAggregator, bar_frames
+
+# Tick throughput of BarAggregator: synthetic trades for N tickers over one
+# minute of market time (a share of them late), aggregated into several bar
+# specs at once, then turned into the per-ticker DataFrames MarketDataAgent
+# publishes.
+#
+#   python scripts/benchmark_bar_aggregator.py --ticks 1000000 --tickers 5 500
+
+
+def make_ticks(count, tickers, seconds=60, late_share=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"T{i:04d}" for i in range(tickers)])[rng.integers(0, tickers, count)].tolist()
+    times = 1_700_000_000 * 10 ** 9 + np.sort(rng.integers(0, seconds * 10 ** 9, count))
+    times -= rng.integers(0, 10 ** 9, count) * (rng.random(count) < late_share)  # ✅ Up to 1s late
+    prices = 100 + np.cumsum(rng.normal(0, 0.01, count))
+    sizes = rng.integers(1, 500, count).astype(float)
+    return names, times, prices, sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tick-to-bar aggregation throughput.")
+    parser.add_argument("--ticks", type=int, default=1_000_000)
+    parser.add_argument("--tickers", nargs="+", type=int, default=[5, 500])
+    parser.add_argument("--bars", nargs="+", default=["1s", "5s", "1m", "100t", "10000v"])
+    parser.add_argument("--lateness", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'tickers':>8} {'specs':>6} {'ticks/s':>12} {'bars':>9} {'dropped':>8} {'frames ms':>10}")
+    for count in args.tickers:
+        names, times, prices, sizes = make_ticks(args.ticks, count)
+        aggregator = BarAggregator(args.bars, lateness=args.lateness)
+        started = time.perf_counter()
+        aggregator.on_ticks(names, times, prices, sizes)
+        aggregator.flush(int(times.max()) + 3600 * 10 ** 9)
+        elapsed = time.perf_counter() - started
+
+        rows = aggregator.drain()
+        started = time.perf_counter()
+        bar_frames(rows)
+        framing = time.perf_counter() - started
+        print(f"{count:>8} {len(args.bars):>6} {args.ticks / elapsed:>12,.0f} {len(rows):>9,} "
+              f"{aggregator.dropped:>8} {framing * 1000:>10.1f}")
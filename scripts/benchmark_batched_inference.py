@@ -0,0 +1,70 @@
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.batched_inference import BatchedInference
+from utils.model_registry import ModelRegistry
+
+# Signals per second for N tickers: one model.predict() per ticker (the old
+# paper-trading loop) against BatchedInference (one vmapped forward pass for
+# all same-shape policies). Every ticker gets its own policy: copies of the
+# trained models in models/ with perturbed weights.
+#
+#   python scripts/benchmark_batched_inference.py --tickers 5 50 500
+
+
+def make_models(count, root):
+    import torch as th
+
+    trained = [model for model in ModelRegistry(root=root).preload(
+        ["QQQ", "VGT", "SOXX", "ARKK", "SPY"]).values() if model is not None]
+    if not trained:
+        raise SystemExit(f"No trained models in {root}/")
+    models = {}
+    for i in range(count):
+        model = copy.deepcopy(trained[i % len(trained)])
+        with th.no_grad():
+            for parameter in model.policy.parameters():
+                parameter.add_(th.randn_like(parameter) * 0.01)
+        models[f"T{i:04d}"] = model
+    return models
+
+
+def best_of(repeat, function):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-ticker vs batched PPO inference.")
+    parser.add_argument("--tickers", nargs="+", type=int, default=[5, 50, 500])
+    parser.add_argument("--root", default="models")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'tickers':>8} {'per-ticker signals/s':>21} {'batched signals/s':>18} {'speedup':>8}")
+    for count in args.tickers:
+        models = make_models(count, args.root)
+        observations = {ticker: rng.normal(100, 5, (50, 3)) for ticker in models}
+        inference = BatchedInference()
+        batched = inference.predict(models, observations)  # ✅ Stacks the parameters once
+        looped = {ticker: int(model.predict(observations[ticker], deterministic=True)[0])
+                  for ticker, model in models.items()}
+        assert batched == looped, "batched actions differ from model.predict"
+
+        per_ticker = best_of(args.repeat, lambda: [models[ticker].predict(observations[ticker], deterministic=True)
+                                                   for ticker in models])
+        vectorized = best_of(args.repeat, lambda: inference.predict(models, observations))
+        print(f"{count:>8} {count / per_ticker:>21,.0f} {count / vectorized:>18,.0f} "
+              f"{per_ticker / vectorized:>7.1f}x")
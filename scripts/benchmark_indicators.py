@@ -0,0 +1,60 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.strategy_agent import StrategyAgent
+from utils.batch_indicators import BatchIndicators, align
+
+# Indicators for a whole universe: the per-ticker path
+# (StrategyAgent.calculate_indicators on one DataFrame per ticker) against
+# one vectorized pass over aligned (time x ticker) matrices. Both get the
+# same synthetic daily bars. Alignment into matrices is timed separately,
+# since a live universe would keep its matrices up to date instead.
+#
+#   python scripts/benchmark_indicators.py --tickers 5 50 500 2000 --rows 252
+
+
+def make_frames(count, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=rows, name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (rows, count)), axis=0))
+    spread = close * rng.uniform(0, 0.02, (rows, count))
+    return {f"T{i:04d}": pd.DataFrame({"High": close[:, i] + spread[:, i], "Low": close[:, i] - spread[:, i],
+                                       "Close": close[:, i]}, index=dates) for i in range(count)}
+
+
+def best_of(repeat, function):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-ticker vs vectorized indicator computation.")
+    parser.add_argument("--tickers", nargs="+", type=int, default=[5, 50, 500, 2000])
+    parser.add_argument("--rows", type=int, default=252, help="Bars per ticker")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    agent = StrategyAgent()
+    agent.logger.setLevel(logging.ERROR)
+    print(f"{'tickers':>8} {'per-ticker ms':>14} {'align ms':>10} {'batch ms':>10} {'us/ticker':>10} {'speedup':>8}")
+    for count in args.tickers:
+        frames = make_frames(count, args.rows)
+        per_ticker = best_of(args.repeat, lambda: [agent.calculate_indicators(frame) for frame in frames.values()])
+        aligning = best_of(args.repeat, lambda: align(frames))
+        _, _, matrices = align(frames)
+        batch = BatchIndicators(args.rows, count)  # ✅ Allocated once, reused on every bar
+        vectorized = best_of(args.repeat, lambda: batch.compute(matrices["High"], matrices["Low"], matrices["Close"]))
+        print(f"{count:>8} {per_ticker * 1000:>14.1f} {aligning * 1000:>10.1f} {vectorized * 1000:>10.2f} "
+              f"{vectorized / count * 1e6:>10.1f} {per_ticker / vectorized:>7.0f}x")
@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import zmq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.serializers import decode_message, encode_message, get_serializer, make_topic
+
+# Compares the legacy MarketDataAgent path (to_dict(orient="records") + json.dumps
+# over send_string) with the CommFramework serializers, over an inproc PAIR so
+# the numbers include ZeroMQ framing but not the kernel network stack.
+
+
+def make_bars(ticker, rows=252, seed=0):
+    """One year of synthetic daily OHLCV bars shaped like MarketDataAgent.fetch_data output."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    return pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=rows, freq="B").astype(str),
+        "Close": close,
+        "High": close + rng.random(rows),
+        "Low": close - rng.random(rows),
+        "Open": close + rng.normal(0, 0.5, rows),
+        "Volume": rng.integers(1_000_000, 5_000_000, rows),
+    })
+
+
+def run_legacy(sender, receiver, frames_by_ticker):
+    sent_bytes = 0
+    for ticker, bars in frames_by_ticker.items():
+        message = json.dumps(bars.to_dict(orient="records"))
+        sent_bytes += len(message)
+        sender.send_string(message)
+        records = json.loads(receiver.recv_string())
+        assert len(records) == len(bars)
+    return sent_bytes
+
+
+def run_serializer(sender, receiver, frames_by_ticker, serializer):
+    sent_bytes = 0
+    for ticker, bars in frames_by_ticker.items():
+        frames = encode_message({"ticker": ticker, "bars": bars}, serializer, topic=make_topic("bars", ticker))
+        sent_bytes += sum(memoryview(frame).nbytes for frame in frames)
+        sender.send_multipart(frames, copy=False)
+        payload = decode_message(receiver.recv_multipart(copy=False))
+        assert len(payload["bars"]["Close"]) == len(bars)
+    return sent_bytes
+
+
+def benchmark(ticker_counts, rows, repeat):
+    context = zmq.Context()
+    sender = context.socket(zmq.PAIR)
+    receiver = context.socket(zmq.PAIR)
+    sender.bind("inproc://benchmark-serialization")
+    receiver.connect("inproc://benchmark-serialization")
+
+    paths = {
+        "legacy json (records)": lambda frames: run_legacy(sender, receiver, frames),
+        "json serializer": lambda frames: run_serializer(sender, receiver, frames, get_serializer("json")),
+        "numpy serializer": lambda frames: run_serializer(sender, receiver, frames, get_serializer("numpy")),
+    }
+
+    print(f"{'tickers':>8} {'path':<24} {'total ms':>10} {'us/ticker':>10} {'KB/ticker':>10} {'speedup':>8}")
+    for count in ticker_counts:
+        frames_by_ticker = {f"T{i:04d}": make_bars(f"T{i:04d}", rows, seed=i) for i in range(count)}
+        baseline = None
+        for name, path in paths.items():
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                sent_bytes = path(frames_by_ticker)
+                best = min(best, time.perf_counter() - started)
+            baseline = baseline or best
+            print(f"{count:>8} {name:<24} {best * 1000:>10.2f} {best / count * 1e6:>10.1f} "
+                  f"{sent_bytes / count / 1024:>10.1f} {baseline / best:>7.1f}x")
+
+    sender.close()
+    receiver.close()
+    context.term()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark market data wire formats on the CommFramework bus.")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--rows", type=int, default=252, help="Bars per ticker (252 = one year of daily bars)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    benchmark(args.tickers, args.rows, args.repeat)
@@ -0,0 +1,101 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import yaml
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.comm_framework import CommFramework
+
+# Latency: one-way time of a PUB/SUB hop, measured as half of a ping/pong round
+# trip through two CommFramework publisher/subscriber pairs.
+# Throughput: messages/s delivered through one pair with the receiver draining,
+# plus the fraction the publisher dropped at its high-water mark.
+
+BENCH_PORTS = {
+    "Ping": {"publisher": 15655, "subscriber": 15656},
+    "Pong": {"publisher": 15656, "subscriber": 15655},
+}
+
+
+def make_comm(transport):
+    with tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False) as handle:
+        yaml.safe_dump({"ports": BENCH_PORTS, "bus": {"serializer": "json"}}, handle)
+    comm = CommFramework(handle.name, transport=transport)
+    os.remove(handle.name)
+    return comm
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure_latency(comm, messages):
+    ping_pub, ping_sub = comm.create_publisher("Ping"), comm.create_subscriber("Ping")
+    pong_pub, pong_sub = comm.create_publisher("Pong"), comm.create_subscriber("Pong")
+    time.sleep(0.3)  # Let subscriptions propagate
+
+    def echo():
+        for _ in range(messages):
+            pong_pub.send(pong_sub.recv())
+
+    thread = threading.Thread(target=echo, daemon=True)
+    thread.start()
+
+    payload = b"x" * 128
+    samples = []
+    for _ in range(messages):
+        started = time.perf_counter()
+        ping_pub.send(payload)
+        ping_sub.recv()
+        samples.append((time.perf_counter() - started) / 2)
+    thread.join()
+    return samples
+
+
+def measure_throughput(comm, messages, size):
+    """Return (delivered msg/s, loss fraction); PUB drops messages once the HWM is reached."""
+    publisher, subscriber = comm.publishers["Ping"], comm.subscribers["Pong"]
+    payload = b"x" * size
+    received = [0]
+
+    def drain():
+        while subscriber.poll(500):
+            subscriber.recv()
+            received[0] += 1
+
+    # Reuse the ping/pong pair: Ping publishes on the port Pong subscribes to
+    thread = threading.Thread(target=drain, daemon=True)
+    thread.start()
+    started = time.perf_counter()
+    for _ in range(messages):
+        publisher.send(payload)
+    thread.join()
+    elapsed = time.perf_counter() - started - 0.5  # Minus the final idle poll
+    return received[0] / elapsed, 1 - received[0] / messages
+
+
+def benchmark(transports, messages, size):
+    print(f"{'transport':<10} {'p50 us':>9} {'p99 us':>9} {'msg/s':>12} {'MB/s':>9} {'loss':>7}")
+    for transport in transports:
+        comm = make_comm(transport)
+        samples = measure_latency(comm, messages)
+        rate, loss = measure_throughput(comm, messages * 10, size)
+        print(f"{transport:<10} {percentile(samples, 0.5) * 1e6:>9.1f} {percentile(samples, 0.99) * 1e6:>9.1f} "
+              f"{rate:>12,.0f} {rate * size / 1e6:>9.1f} {loss:>7.1%}")
+        comm.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare CommFramework latency and throughput across transports.")
+    parser.add_argument("--transports", nargs="+", default=list(CommFramework.TRANSPORTS))
+    parser.add_argument("--messages", type=int, default=5000, help="Ping/pong round trips (throughput uses 10x)")
+    parser.add_argument("--size", type=int, default=512, help="Payload bytes for the throughput test")
+    args = parser.parse_args()
+
+    benchmark(args.transports, args.messages, args.size)
@@ -1,6 +1,10 @@
-import yfinance as yf
 import pandas as pd
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.data_providers import get_histories
 
 # Define ETF tickers
 etfs = ["QQQ", "VGT", "SOXX", "ARKK", "SPY"]
@@ -16,10 +20,10 @@ os.makedirs(os.path.dirname(output_csv_path), exist_ok=True)
 # Download and clean data
 all_data = []
 
-for etf in etfs:
-    print(f"📥 Downloading data for {etf}...")
-    df = yf.download(etf, start=start_date, end=end_date, auto_adjust=False)
+print(f"📥 Loading data for {', '.join(etfs)} (only missing dates are downloaded, concurrently)...")
+histories = get_histories(etfs, start=start_date, end=end_date, auto_adjust=False)
 
+for etf, df in histories.items():
     if df.empty:
         print(f"⚠️ No data found for {etf}, skipping...")
         continue
@@ -47,6 +51,8 @@ for etf in etfs:
 
     # Rename only existing columns
     df.rename(columns={col: expected_cols[col] for col in expected_cols if col in df.columns}, inplace=True)
+    if "Adj Close" in df.columns:
+        df["Close"] = df.pop("Adj Close")  # Use Adjusted Close if available (flat columns from the store)
 
     # Keep only relevant columns
     df = df[["Date", "Open", "High", "Low", "Close", "Volume", "Ticker"]]
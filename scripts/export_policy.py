@@ -0,0 +1,61 @@
+import argparse
+import importlib.util
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.numpy_policy import export_policy
+
+# Converts trained PPO models (models/{ticker}_ppo.zip) into NumPy policies
+# (models/{ticker}_ppo.npz) for `models.format: numpy` in config.yml. The
+# export itself needs neither torch nor stable_baselines3. With --verify
+# (which does need them) every exported policy is checked against
+# PPO.predict(..., deterministic=True) on random observations.
+#
+#   python scripts/export_policy.py --tickers QQQ VGT SOXX ARKK SPY --verify 10000
+
+
+def verify(source, policy, samples, seed=0):
+    """Number of observations on which the exported policy's action differs from PPO.predict."""
+    from stable_baselines3 import PPO
+
+    model = PPO.load(source, device="cpu")
+    rng = np.random.default_rng(seed)
+    scale = rng.choice([1.0, 10.0, 100.0, 1000.0], size=(samples, 1, 1))
+    observations = rng.normal(0, 1, (samples,) + policy.obs_shape) * scale + scale
+    expected, _ = model.predict(observations, deterministic=True)
+    actions, _ = policy.predict(observations)
+    single = [int(policy.predict(observation)[0]) for observation in observations[:100]]
+    return int((actions != expected).sum()) + sum(a != b for a, b in zip(single, expected[:100].tolist()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export PPO policies to torch-free NumPy weights.")
+    parser.add_argument("--tickers", nargs="+", default=["QQQ", "VGT", "SOXX", "ARKK", "SPY"])
+    parser.add_argument("--root", default="models")
+    parser.add_argument("--verify", type=int, default=0, metavar="SAMPLES",
+                        help="Compare with PPO.predict on this many observations (needs stable_baselines3)")
+    args = parser.parse_args()
+    if args.verify and importlib.util.find_spec("stable_baselines3") is None:
+        parser.error("--verify needs stable_baselines3 (and torch)")
+
+    failed = False
+    for ticker in args.tickers:
+        source = os.path.join(args.root, f"{ticker}_ppo.zip")
+        target = os.path.join(args.root, f"{ticker}_ppo.npz")
+        try:
+            policy = export_policy(source, target)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"❌ {source}: {e}")
+            failed = True
+            continue
+        layers = " -> ".join(str(weight.shape[1]) for weight in policy.weights) + f" -> {policy.weights[-1].shape[0]}"
+        print(f"✅ {target}: {layers} ({policy.activation}), {os.path.getsize(target)} bytes")
+        if args.verify:
+            mismatches = verify(source, policy, args.verify)
+            print(f"   {'✅' if not mismatches else '❌'} {mismatches} of {args.verify + 100} actions differ from PPO")
+            failed |= bool(mismatches)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,74 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from agents.registry import AGENTS
+
+# Cold-start import cost per agent, from `python -X importtime` run in a fresh
+# interpreter (the way the supervisor spawns agent processes). Each stderr
+# line is "import time: <self us> | <cumulative us> | <indented module>".
+
+
+def parse_importtime(text):
+    """Return [(module, depth, self_us, cumulative_us)] from -X importtime output."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip())) // 2
+            rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue  # Header line ("self [us] | cumulative | imported package")
+    return rows
+
+
+def profile_module(module):
+    """Import `module` in a fresh interpreter; return (wall seconds, importtime rows)."""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise ImportError(error)
+    return elapsed, parse_importtime(result.stderr)
+
+
+def print_report(name, elapsed, rows, top):
+    total = sum(row[2] for row in rows) / 1e6
+    print(f"\n{name}: {elapsed:.2f}s wall, {total:.2f}s importing {len(rows)} modules")
+    # ✅ The imported module itself and its heaviest direct imports
+    heaviest = sorted((row for row in rows if row[1] <= 1), key=lambda row: row[3], reverse=True)[:top]
+    for module, _, _, cumulative_us in heaviest:
+        print(f"  {cumulative_us / 1e3:>9.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time profile of each agent (cold start).")
+    parser.add_argument("--agents", nargs="+", choices=list(AGENTS), default=list(AGENTS))
+    parser.add_argument("--module", action="append", default=[], help="Also profile this module (e.g. main)")
+    parser.add_argument("--file", help="Report on saved `python -X importtime` output instead")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports to list")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as handle:
+            print_report(args.file, 0.0, parse_importtime(handle.read()), args.top)
+        sys.exit(0)
+
+    targets = {name: AGENTS[name].partition(":")[0] for name in args.agents}
+    targets.update({module: module for module in args.module})
+    for name, module in targets.items():
+        try:
+            elapsed, rows = profile_module(module)
+        except ImportError as e:
+            print(f"\n{name}: ❌ import failed ({e})")
+            continue
+        print_report(name, elapsed, rows, args.top)
@@ -0,0 +1,50 @@
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.tracing import LatencyHistogram, format_report, segments
+
+# Reads the traces recorded by the agents (bus.tracing.record in config.yml,
+# one JSON line per received message) and prints p50/p99/p999 per hop and
+# end to end. A trace fanned out to several subscribers is recorded once per
+# receiver, so shared hops are only counted once.
+
+
+def load_histograms(path, agent=None):
+    histograms = defaultdict(LatencyHistogram)
+    seen = set()
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                trace = json.loads(line)
+            except ValueError:
+                continue  # ✅ Skip a line cut short by a crash
+            hops = trace["hops"]
+            for index in range(1, len(hops)):
+                key = (trace["id"], index, hops[index][0], hops[index][1])
+                if key in seen:
+                    continue
+                seen.add(key)
+                for owner, name, value in segments(hops[:index + 1], index):
+                    if agent is None or owner == agent:
+                        histograms[name].record(value)
+    return histograms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency report for a recorded agent session.")
+    parser.add_argument("path", nargs="?", default="logs/traces.jsonl", help="Recorded traces (JSON lines)")
+    parser.add_argument("--agent", help="Only show the hops that end at this agent")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        sys.exit(f"❌ No recorded traces at {args.path} (enable bus.tracing.record in config/config.yml)")
+
+    histograms = load_histograms(args.path, args.agent)
+    if not histograms:
+        sys.exit("⚠️ No traced hops found.")
+    print("\n".join(format_report(histograms)))
@@ -0,0 +1,224 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import yaml
+import zmq
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from agents.comm_framework import CommFramework
+
+# Load test for the agent bus, offline. A generator stands in for
+# MarketDataAgent ("bars" deltas, as DataFrames) and for the news feed that
+# SentimentAgent subscribes to ("news" headlines), for N synthetic tickers at
+# a target rate. A sink subscribed to both measures delivered rate, loss
+# (sequence gaps and messages that never arrived) and bus latency (from the
+# message traces). Serializer and high-water marks come from config.yml, so
+# the numbers are those of the current design.
+#
+# Topologies: inproc = generator and sink threads sharing one CommFramework
+# (main.py --mode thread/async); ipc and tcp = sink in its own process
+# (main.py --mode process, split deployments).
+#
+#   python scripts/load_test.py --tickers 5 500 5000 --rate 0 --duration 5
+
+LOAD_PORTS = {
+    "MarketDataAgent": {"publisher": 16555},
+    "SentimentAgent": {"subscriber": 16558},
+}
+HEADLINES = [
+    "beats earnings expectations", "misses revenue estimates", "announces share buyback",
+    "cut to neutral by analysts", "faces regulatory probe", "raises full-year guidance",
+]
+
+
+def make_config(config_path):
+    """Temporary config: the bus settings of `config_path` on dedicated ports, traced, without metrics server."""
+    with open(config_path, "r") as file:
+        bus = (yaml.safe_load(file) or {}).get("bus") or {}
+    bus.update(tracing={"enabled": True, "record": None, "report_interval": 0}, metrics_port=None)
+    with tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False) as handle:
+        yaml.safe_dump({"ports": LOAD_PORTS, "bus": bus}, handle)
+    return handle.name
+
+
+def synthetic_tickers(count):
+    return [f"T{i:04d}" for i in range(count)]
+
+
+def synthetic_bars(tickers, rows, seed=0):
+    """One small OHLCV DataFrame per ticker (random walk), reused for every message."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-02", periods=rows, freq="D")
+    frames = {}
+    for ticker in tickers:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+        frames[ticker] = pd.DataFrame({"Date": dates, "Open": close, "High": close * 1.01, "Low": close * 0.99,
+                                       "Close": close, "Volume": rng.integers(1e5, 1e6, rows).astype(float)})
+    return frames
+
+
+def generate(comm, tickers, rate, duration, news_ratio, rows, warmup=0.5):
+    """Publish bars and headlines round-robin over `tickers` at `rate` msg/s (0 = as fast as possible).
+
+    Returns {msg_type: messages sent}.
+    """
+    bars_pub = comm.create_publisher("MarketDataAgent")
+    news_pub = comm.create_publisher("SentimentAgent", key="subscriber")  # ✅ Where SentimentAgent listens
+    comm.socket_names[bars_pub] = comm.socket_names[news_pub] = "LoadGenerator"
+    frames = synthetic_bars(tickers, rows)
+    headlines = random.Random(0)
+    time.sleep(warmup)  # ✅ Let the sink connect and subscribe
+
+    sent = {"bars": 0, "news": 0}
+    news_every = round(1 / news_ratio) if news_ratio else 0
+    started = time.perf_counter()
+    index = 0
+    while True:
+        elapsed = time.perf_counter() - started
+        if elapsed >= duration:
+            break
+        # ✅ Send what is due by now in one burst, then yield until the next millisecond
+        due = int(elapsed * rate) + 1 - index if rate else 100
+        for _ in range(max(due, 0)):
+            ticker = tickers[index % len(tickers)]
+            if news_every and index % news_every == 0:
+                headline = f"{ticker} {headlines.choice(HEADLINES)}"
+                comm.send(news_pub, {"ticker": ticker, "headline": headline, "source": "synthetic"},
+                          msg_type="news", ticker=ticker)
+                sent["news"] += 1
+            else:
+                comm.send(bars_pub, {"type": "delta", "ticker": ticker, "bars": frames[ticker]},
+                          msg_type="bars", ticker=ticker)
+                sent["bars"] += 1
+            index += 1
+        if rate:
+            time.sleep(0.001)
+    return sent
+
+
+def sink(comm, idle_timeout, ready=None):
+    """Receive bars and headlines until idle for `idle_timeout` seconds; return counts, metrics and latency."""
+    socket = comm.context.socket(zmq.SUB)
+    if "rcvhwm" in comm.hwm("LoadSink"):
+        socket.setsockopt(zmq.RCVHWM, comm.hwm("LoadSink")["rcvhwm"])
+    for ports in LOAD_PORTS.values():
+        socket.connect(comm.endpoint(next(iter(ports.values()))))
+    comm.subscribe(socket, ["bars", "news"])
+    comm.socket_names[socket] = "LoadSink"
+
+    loop = comm.create_event_loop("LoadSink", poll_timeout=100)
+    stats = {"received": 0, "first": None, "last": None}
+
+    def handle(message):
+        now = time.perf_counter()
+        stats["received"] += 1
+        stats["first"] = stats["first"] or now
+        stats["last"] = now
+
+    started = time.perf_counter()
+
+    def check_idle():
+        now = time.perf_counter()
+        if (stats["last"] and now - stats["last"] > idle_timeout) or (not stats["last"] and now - started > 60):
+            loop.stop()
+
+    loop.register(socket, handle)
+    loop.add_timer(0.1, check_idle)
+    if ready is not None:
+        ready.set()
+    loop.run()
+    socket.close()
+
+    transit = comm.tracer.histograms.get("LoadGenerator -> LoadSink")
+    metrics = comm.get_metrics().get("LoadSink", {})
+    return {
+        "received": stats["received"],
+        "busy": (stats["last"] - stats["first"]) if stats["first"] else 0.0,
+        "gaps": sum(counters.get("dropped", 0) for counters in metrics.values()),
+        "latency": transit.summary() if transit else None,
+    }
+
+
+def sink_process(config_path, transport, idle_timeout, ready, results):
+    comm = CommFramework(config_path, transport=transport)
+    try:
+        results.put(sink(comm, idle_timeout, ready))
+    finally:
+        comm.cleanup()
+
+
+def run_topology(config_path, transport, tickers, rate, duration, news_ratio, rows, idle_timeout):
+    """Run generator and sink on one topology; return (sent, sink results)."""
+    if transport == "inproc":
+        comm = CommFramework(config_path, transport="inproc")
+        ready, result = threading.Event(), {}
+        thread = threading.Thread(target=lambda: result.update(sink(comm, idle_timeout, ready)))
+        thread.start()
+        ready.wait()
+        sent = generate(comm, tickers, rate, duration, news_ratio, rows)
+        thread.join()
+        comm.cleanup()
+        return sent, result
+
+    context = multiprocessing.get_context("spawn")  # ✅ A fresh interpreter, like supervised agents
+    ready, results = context.Event(), context.Queue()
+    process = context.Process(target=sink_process, args=(config_path, transport, idle_timeout, ready, results))
+    process.start()
+    ready.wait(60)
+    comm = CommFramework(config_path, transport=transport)
+    try:
+        sent = generate(comm, tickers, rate, duration, news_ratio, rows)
+        result = results.get(timeout=duration + idle_timeout + 60)
+    finally:
+        comm.cleanup()
+        process.join(10)
+    return sent, result
+
+
+def report_line(transport, tickers, rate, duration, sent, result):
+    total = sum(sent.values())
+    received = result.get("received", 0)
+    latency = result.get("latency") or {}
+    delivered = received / result["busy"] if result.get("busy") else 0.0
+    offered = f"{rate:,.0f}" if rate else "max"
+    return (f"{transport:<8} {tickers:>7} {offered:>10} {total / duration:>11,.0f} {delivered:>11,.0f} "
+            f"{1 - received / max(total, 1):>7.2%} {result.get('gaps', 0):>7} "
+            f"{latency.get('p50', 0) / 1e3:>9.1f} {latency.get('p99', 0) / 1e3:>9.1f} "
+            f"{latency.get('max', 0) / 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic bars/news load test of the agent bus.")
+    parser.add_argument("--config", default=os.path.join(ROOT, "config", "config.yml"),
+                        help="Bus settings (serializer, hwm) to test")
+    parser.add_argument("--topologies", nargs="+", choices=list(CommFramework.TRANSPORTS),
+                        default=list(CommFramework.TRANSPORTS))
+    parser.add_argument("--tickers", nargs="+", type=int, default=[5, 500, 5000])
+    parser.add_argument("--rate", type=float, default=0, help="Target msg/s (0 = as fast as possible)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of load per run")
+    parser.add_argument("--news-ratio", type=float, default=0.1, help="Fraction of messages that are headlines")
+    parser.add_argument("--rows", type=int, default=1, help="Bars per bars message")
+    parser.add_argument("--idle-timeout", type=float, default=1.0, help="Sink stops after this long without data")
+    args = parser.parse_args()
+
+    config_path = make_config(args.config)
+    print(f"{'topology':<8} {'tickers':>7} {'target/s':>10} {'sent/s':>11} {'recv/s':>11} {'loss':>7} "
+          f"{'gaps':>7} {'p50 us':>9} {'p99 us':>9} {'max us':>10}")
+    try:
+        for transport in args.topologies:
+            for count in args.tickers:
+                sent, result = run_topology(config_path, transport, synthetic_tickers(count), args.rate,
+                                            args.duration, args.news_ratio, args.rows, args.idle_timeout)
+                print(report_line(transport, count, args.rate, args.duration, sent, result), flush=True)
+    finally:
+        os.remove(config_path)
@@ -0,0 +1,37 @@
+import argparse
+import os
+import signal
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.comm_framework import CommFramework
+from agents.journal import JournalRecorder
+
+# Records the bus of agents running in other processes (main.py --mode
+# process, or split tcp deployments) to a journal for scripts/replay_bus.py.
+# Agents sharing one process are recorded with `python main.py --record PATH`.
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record every publisher on the bus to a journal file.")
+    parser.add_argument("path", nargs="?", default="logs/bus.journal", help="Journal file (appended to)")
+    parser.add_argument("--config", default="config/config.yml")
+    parser.add_argument("--transport", choices=["ipc", "tcp"], default="ipc",
+                        help="Transport the agents use (the supervisor runs them on ipc)")
+    parser.add_argument("--agents", nargs="+", metavar="AGENT", help="Only record these publishers")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds (default: Ctrl-C)")
+    args = parser.parse_args()
+
+    comm = CommFramework(args.config, transport=args.transport)
+    recorder = JournalRecorder(comm, args.path, agents=args.agents).start()
+    stopped = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    print(f"⏺️ Recording to {args.path} ({f'{args.duration}s' if args.duration else 'Ctrl-C to stop'})")
+
+    stopped.wait(args.duration)
+    recorder.stop()
+    comm.cleanup()
+    print(f"⏹️ {recorder.writer.records} message(s) recorded.")
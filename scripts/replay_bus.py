@@ -0,0 +1,114 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+import zmq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.comm_framework import CommFramework
+from agents.journal import JournalReplayer
+from agents.registry import AGENTS, load_agent
+from agents.tracing import Tracer
+
+# Replays a bus journal (see agents/journal.py) into agents running in this
+# process and measures what comes out of them. At --speed max this is a
+# throughput benchmark, and the per-agent latency tables allow offline
+# regression checks, e.g. of the agents receiving StrategyAgent's signals:
+#
+#   python scripts/replay_bus.py logs/bus.journal --speed max --only StrategyAgent \
+#       --run RiskManagementAgent ExecutionAgent
+#
+# Replayed messages are published on the subscriber ports of every --run
+# agent at once (as StrategyAgent publishes its signals into
+# RiskManagementAgent), and each agent's table shows replay -> agent and its
+# processing time. Agents that consume each other's output are chained as in
+# a live run: ExecutionAgent only acts on RiskManagementAgent's approved
+# assessments, so its table also has the Risk -> Execution hop. Their output
+# is counted on their publisher ports. Signals are recorded on
+# RiskManagementAgent's subscriber port (main.py --record taps it).
+
+
+def start_agents(comm, names):
+    agents = []
+    for name in names:
+        agent = load_agent(AGENTS[name])(comm)
+        agent.running = True
+        threading.Thread(target=agent.run, name=name, daemon=True).start()
+        agents.append(agent)
+    return agents
+
+
+def create_sink(comm, names):
+    """SUB socket on the publisher ports of `names`; its hops are reported as "ReplaySink"."""
+    sink = comm.context.socket(zmq.SUB)
+    sink.setsockopt(zmq.RCVHWM, 0)
+    for name in names:
+        port = comm.config.get(name, {}).get("publisher")
+        if port:
+            sink.connect(comm.endpoint(port))
+    sink.setsockopt(zmq.SUBSCRIBE, b"")
+    comm.socket_names[sink] = "ReplaySink"
+    return sink
+
+
+def drain(comm, sink, idle_timeout, replaying, result):
+    """Receive until the replay is over and the sink was idle for `idle_timeout` seconds; count arrivals."""
+    while sink.poll(idle_timeout * 1000) or replaying.is_set():
+        while True:
+            try:
+                comm.recv(sink, flags=zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            result["received"] += 1
+            result["last"] = time.perf_counter()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a bus journal into agents; report throughput and latency.")
+    parser.add_argument("path", help="Journal recorded by main.py --record or scripts/record_bus.py")
+    parser.add_argument("--config", default="config/config.yml")
+    parser.add_argument("--speed", default="1", help="1 = as recorded, N = N times faster, max = no pacing")
+    parser.add_argument("--only", nargs="+", metavar="AGENT", help="Only replay messages from these publishers")
+    parser.add_argument("--run", nargs="+", metavar="AGENT", choices=list(AGENTS), default=[],
+                        help="Agents to run here and replay into (default: replay on the original ports)")
+    parser.add_argument("--idle-timeout", type=float, default=1.0,
+                        help="Seconds without output after which the agents are considered done")
+    args = parser.parse_args()
+    speed = 0 if args.speed == "max" else float(args.speed)
+
+    comm = CommFramework(args.config, transport="inproc")
+    if comm.tracer is None:
+        comm.tracer = Tracer()  # ✅ Latency needs traces even if the config disables them
+    agents = start_agents(comm, args.run)
+    sink = create_sink(comm, args.run)
+    replayer = JournalReplayer(comm, args.path, speed=speed, agents=args.only, into=args.run or None)
+    replayer.bind()
+
+    result, replaying = {"received": 0, "last": None}, threading.Event()
+    replaying.set()
+    draining = threading.Thread(target=drain, args=(comm, sink, args.idle_timeout, replaying, result))
+    started = time.perf_counter()
+    draining.start()
+    sent, elapsed = replayer.run()
+    replaying.clear()
+    draining.join()
+
+    print(f"\n⏩ Replayed {sent} message(s) in {elapsed:.3f}s ({sent / max(elapsed, 1e-9):,.0f} msg/s)")
+    if args.run:
+        busy = result["last"] - started if result["last"] else 0.0
+        print(f"📥 {result['received']} message(s) out of {', '.join(args.run)} "
+              f"({result['received'] / max(busy, 1e-9):,.0f} msg/s until the last one)")
+    for name in [*args.run, "ReplaySink"] if args.run else [None]:  # ✅ Agents are measured independently
+        lines = comm.tracer.report(name)
+        if lines:
+            print(f"\n⏱️ {name or 'All segments'}\n" + "\n".join(lines))
+
+    for agent in agents:
+        agent.running = False
+        if hasattr(agent, "stop"):
+            agent.stop()
+    sink.close()
+    comm.cleanup()
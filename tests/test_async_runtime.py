@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+import yaml
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.async_runtime import AsyncRuntime
+from agents.comm_framework import CommFramework
+
+
+class EchoAgent:
+    """Async agent: answers every ping with a pong."""
+
+    def __init__(self, comm):
+        self.comm = comm
+        self.subscriber = comm.create_subscriber("Echo", msg_types=["ping"])
+        self.cleaned_up = False
+
+    async def run_async(self, runtime):
+        publisher = runtime.publisher("Echo")
+        try:
+            await runtime.consume(self.subscriber, lambda message: publisher.send(message, msg_type="pong"))
+        finally:
+            self.cleaned_up = True
+
+
+class BlockingAgent:
+    """Thread-based agent with the usual running flag and stop()."""
+
+    def __init__(self):
+        self.running = True
+        self.stopped = threading.Event()
+
+    def run(self):
+        self.stopped.wait()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class TestAsyncRuntime(unittest.TestCase):
+    def setUp(self):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False)
+        yaml.safe_dump({"ports": {"Echo": {"publisher": 15856, "subscriber": 15855},
+                                  "Client": {"publisher": 15855, "subscriber": 15856}},
+                        "bus": {"transport": "inproc"}}, handle)
+        handle.close()
+        self.config_path = handle.name
+        self.comm = CommFramework(self.config_path)
+
+    def tearDown(self):
+        self.comm.cleanup()
+        os.remove(self.config_path)
+
+    def test_agents_run_as_coroutines_and_stop_by_cancellation(self):
+        runtime = AsyncRuntime(self.comm)
+        echo, blocking = EchoAgent(self.comm), BlockingAgent()
+        pongs, ticks = [], []
+
+        async def scenario():
+            client = runtime.publisher("Client")
+            runtime.subscribe("Client", pongs.append, msg_types=["pong"])
+            runtime.every(0.01, lambda: ticks.append(1))
+            await asyncio.sleep(0.1)  # Let subscriptions propagate
+            for i in range(100):
+                await client.send({"i": i}, msg_type="ping")
+            while len(pongs) < 100:
+                await asyncio.sleep(0.01)
+            runtime.stop()
+
+        async def main():
+            asyncio.get_running_loop().create_task(scenario())
+            await asyncio.wait_for(runtime.run([echo, blocking]), 5)
+
+        asyncio.run(main())
+        self.assertEqual(pongs, [{"i": i} for i in range(100)])
+        self.assertGreater(len(ticks), 5)
+        self.assertTrue(echo.cleaned_up)
+        self.assertTrue(blocking.stopped.is_set())
+        self.assertFalse(runtime.tasks)
+
+
+if __name__ == "__main__":
+    unittest.main()
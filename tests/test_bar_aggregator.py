@@ -0,0 +1,107 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+import yaml
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.bar_aggregator import BarAggregator, bar_frames, parse_bar_spec
+from agents.comm_framework import CommFramework
+
+SECOND = 10 ** 9
+T0 = 1_700_000_000 * SECOND
+
+
+def random_ticks(count, seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    times = T0 + np.sort(rng.integers(0, seconds * SECOND, count))
+    prices = 100 + np.cumsum(rng.normal(0, 0.1, count))
+    sizes = rng.integers(1, 100, count).astype(float)
+    return times, prices, sizes
+
+
+class TestBarAggregator(unittest.TestCase):
+    def test_time_bars_match_pandas_resample_despite_reordering(self):
+        times, prices, sizes = random_ticks(5000, 60)
+        # ✅ Swap neighbours: every tick arrives out of order, well within the lateness
+        order = np.arange(len(times)).reshape(-1, 2)[:, ::-1].ravel()
+        aggregator = BarAggregator(["5s", "1m"], lateness=1.0)
+        aggregator.on_ticks("SPY", times[order], prices[order], sizes[order])
+        aggregator.flush(T0 + 3600 * SECOND)
+        frames = bar_frames(aggregator.drain())
+
+        ticks = pd.DataFrame({"price": prices, "size": sizes}, index=pd.to_datetime(times, unit="ns"))
+        expected = ticks.resample("5s").agg({"price": ["first", "max", "min", "last"], "size": ["sum", "count"]})
+        expected = expected[expected[("size", "count")] > 0]
+        bars = frames[("SPY", "5s")]
+        np.testing.assert_array_equal(bars["Date"].to_numpy(), expected.index.to_numpy())
+        for column, (field, how) in {"Open": ("price", "first"), "High": ("price", "max"), "Low": ("price", "min"),
+                                     "Close": ("price", "last"), "Volume": ("size", "sum"),
+                                     "Ticks": ("size", "count")}.items():
+            np.testing.assert_allclose(bars[column].to_numpy(), expected[(field, how)].to_numpy(), err_msg=column)
+        self.assertEqual(frames[("SPY", "1m")]["Volume"].sum(), sizes.sum())
+
+    def test_late_ticks_revise_the_last_bar_or_are_dropped(self):
+        aggregator = BarAggregator(["1s"], lateness=2.0)
+        aggregator.on_tick("SPY", T0 + 100, 10.0, 1)
+        aggregator.on_tick("SPY", T0 + SECOND + 100, 11.0, 1)  # Finishes the first bar
+        aggregator.on_tick("SPY", T0 + 500, 12.0, 1)  # Late but within 2s: revises it
+        aggregator.on_tick("SPY", T0 - 5 * SECOND, 13.0, 1)  # Too late: dropped
+        rows = aggregator.drain()
+        self.assertEqual([(row[4], row[5], row[7], row[9], row[10]) for row in rows],
+                         [(10.0, 10.0, 10.0, 1, False), (10.0, 12.0, 12.0, 2, True)])
+        self.assertEqual(aggregator.dropped, 1)
+
+        bars = bar_frames(rows)[("SPY", "1s")]
+        self.assertEqual(len(bars), 1)  # ✅ The revision replaces the bar
+        self.assertEqual(bars["High"].iloc[0], 12.0)
+
+    def test_tick_and_volume_bars(self):
+        times, prices, sizes = random_ticks(1000, 10, seed=1)
+        aggregator = BarAggregator(["100t", "5000v"])
+        aggregator.on_ticks(["QQQ"] * len(times), times, prices, sizes)
+        frames = bar_frames(aggregator.drain())
+        self.assertEqual(frames[("QQQ", "100t")]["Ticks"].tolist(), [100] * 10)
+        volume_bars = frames[("QQQ", "5000v")]
+        self.assertTrue((volume_bars["Volume"] >= 5000).all())
+        self.assertTrue((volume_bars["Volume"] - 5000 < 100).all())  # Closed by the tick that crossed 5000
+        with self.assertRaises(ValueError):
+            parse_bar_spec("5 minutes")
+
+
+class TestBarPublishing(unittest.TestCase):
+    def test_market_data_agent_publishes_finished_bars(self):
+        from agents.market_data_agent import MarketDataAgent
+
+        handle = tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False)
+        yaml.safe_dump({"ports": {"MarketDataAgent": {"publisher": 15960, "subscriber": 15961},
+                                  "Consumer": {"subscriber": 15960}},
+                        "bar_aggregator": {"enabled": True, "bars": ["1s"], "lateness": 0.5}}, handle)
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        comm = CommFramework(handle.name)
+        self.addCleanup(comm.cleanup)
+
+        agent = MarketDataAgent(comm)
+        consumer = comm.create_subscriber("Consumer", msg_types=["bars_1s"], tickers=["SPY"])
+        time.sleep(0.2)
+
+        now = time.time_ns()
+        agent.handle_ticks({"tickers": ["SPY", "SPY", "QQQ"], "times": [now - 3 * SECOND, now - 2 * SECOND, now],
+                            "prices": [1.0, 2.0, 3.0], "sizes": [10.0, 20.0, 30.0]})
+        agent.publish_aggregated_bars()
+
+        self.assertTrue(consumer.poll(2000))
+        message = comm.recv(consumer)
+        self.assertEqual((message["ticker"], message["interval"]), ("SPY", "1s"))
+        self.assertEqual(list(message["bars"]["Close"]), [1.0, 2.0])
+        self.assertFalse(consumer.poll(200))  # QQQ's bar is not finished, and not subscribed anyway
+
+
+if __name__ == "__main__":
+    unittest.main()
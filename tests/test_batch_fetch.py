@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.batch_fetch import RateLimiter, ThrottledFetcher, fetch_many
+from utils.history_store import HistoryStore
+from tests.test_history_store import FakeYahoo
+
+
+class SlowYahoo(FakeYahoo):
+    """FakeYahoo with a round trip time; tracks how many requests are in flight."""
+
+    def __init__(self, delay, failures=0):
+        super().__init__()
+        self.delay = delay
+        self.failures = failures  # First requests that fail, like a flaky connection
+        self.in_flight = self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, ticker, start, end, interval):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            failing = self.failures > 0
+            self.failures -= failing
+        try:
+            time.sleep(self.delay)
+            if failing:
+                raise ConnectionError("connection reset")
+            return super().__call__(ticker, start, end, interval)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_then_rate(self):
+        limiter = RateLimiter(rate=20, burst=5)
+        started = time.monotonic()
+        for _ in range(15):
+            limiter.acquire()
+        elapsed = time.monotonic() - started
+        self.assertGreaterEqual(elapsed, 10 / 20 * 0.9)  # 5 immediately, 10 more at 20/s
+        self.assertLess(elapsed, 1.5)
+
+
+class TestThrottledFetcher(unittest.TestCase):
+    def test_retries_with_backoff(self):
+        yahoo = SlowYahoo(0, failures=2)
+        fetcher = ThrottledFetcher(yahoo, host="test-retries", rate=1000, burst=10, retries=2, backoff=0.01)
+        bars = fetcher("SPY", pd.Timestamp("2023-01-02"), pd.Timestamp("2023-01-07"), "1d")
+        self.assertEqual(len(bars), 5)
+
+        yahoo.failures = 3
+        with self.assertRaises(ConnectionError):
+            fetcher("SPY", pd.Timestamp("2023-01-02"), pd.Timestamp("2023-01-07"), "1d")
+
+    def test_fetchers_of_one_host_share_the_limit(self):
+        first = ThrottledFetcher(FakeYahoo(), host="test-shared", rate=5, burst=1)
+        second = ThrottledFetcher(FakeYahoo(), host="test-shared", rate=5, burst=1)
+        self.assertIs(first.limiter, second.limiter)
+
+
+class TestBatchedHistory(unittest.TestCase):
+    def test_refresh_time_follows_the_rate_not_the_ticker_count(self):
+        yahoo = SlowYahoo(0.05)
+        fetcher = ThrottledFetcher(yahoo, host="test-batch", rate=100, burst=10)
+        store = HistoryStore(root=tempfile.mkdtemp(), fetcher=fetcher, max_workers=8)
+        tickers = [f"T{i}" for i in range(16)]
+
+        started = time.monotonic()
+        histories = store.get_many(tickers, start="2023-01-01", end="2023-02-01")
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(list(histories), tickers)
+        self.assertTrue(all(len(bars) == 22 for bars in histories.values()))
+        self.assertEqual(yahoo.peak, 8)
+        self.assertLess(elapsed, 16 * 0.05 * 0.75)  # Sequential requests would take 0.8s
+
+    def test_fetch_many_keeps_order_and_drops_duplicates(self):
+        result = fetch_many(lambda ticker, scale: ticker * scale, ["A", "B", "A", "C"], max_workers=2, scale=2)
+        self.assertEqual(result, {"A": "AA", "B": "BB", "C": "CC"})
+
+
+if __name__ == "__main__":
+    unittest.main()
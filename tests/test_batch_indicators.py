@@ -0,0 +1,73 @@
+import logging
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.strategy_agent import StrategyAgent
+from utils import batch_indicators
+from utils.batch_indicators import BatchIndicators, align, compute_indicators
+
+
+def universe(seed=0):
+    """Tickers listed at different dates, one too short for MACD, one with a flat stretch."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2020-01-01", periods=400, name="Date")
+    frames = {}
+    for i, (start, rows) in enumerate([(0, 400), (100, 300), (380, 20), (0, 400), (50, 350)]):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+        if i == 3:
+            close[100:150] = close[100]  # No losses for 50 bars: RSI falls back to 50
+        spread = close * rng.uniform(0, 0.02, rows)
+        frames[f"T{i}"] = pd.DataFrame({"High": close + spread, "Low": close - spread, "Close": close},
+                                       index=dates[start:start + rows])
+    return frames
+
+
+class TestBatchIndicators(unittest.TestCase):
+    def test_columns_match_the_per_ticker_pandas_path(self):
+        agent = StrategyAgent()
+        agent.logger.setLevel(logging.ERROR)
+        frames = universe()
+        index, tickers, matrices = align(frames)
+        for narrow in (batch_indicators.NARROW, 0):  # EMAs per column (few tickers) and per row (wide universes)
+            with mock.patch.object(batch_indicators, "NARROW", narrow):
+                result = compute_indicators(matrices["High"], matrices["Low"], matrices["Close"])
+            self.assert_columns_match(agent, frames, index, tickers, result, narrow)
+
+    def assert_columns_match(self, agent, frames, index, tickers, result, narrow):
+        for j, ticker in enumerate(tickers):
+            expected = agent.calculate_indicators(frames[ticker])
+            rows = index.get_indexer(expected.index)
+            for name, values in result.items():
+                with self.subTest(ticker=ticker, indicator=name, narrow=narrow):
+                    np.testing.assert_allclose(values[rows, j], expected[name].to_numpy(dtype=float),
+                                               rtol=1e-9, atol=1e-9)
+                    unlisted = np.setdiff1d(np.arange(len(index)), rows)
+                    self.assertTrue(np.isnan(values[unlisted, j]).all())  # Not listed yet
+
+    def test_buffers_are_reused_and_shapes_checked(self):
+        _, _, matrices = align(universe(seed=1))
+        batch = BatchIndicators(*matrices["Close"].shape)
+        first = batch.compute(matrices["High"], matrices["Low"], matrices["Close"])["ATR"]
+        again = batch.compute(matrices["High"], matrices["Low"], matrices["Close"])["ATR"]
+        self.assertIs(first, again)
+        with self.assertRaises(ValueError):
+            batch.compute(matrices["High"][1:], matrices["Low"][1:], matrices["Close"][1:])
+
+    def test_align_forward_fills_gaps_after_listing(self):
+        dates = pd.bdate_range("2024-01-01", periods=5)
+        frames = {"A": pd.DataFrame({"Close": [1.0, 2.0, 3.0, 4.0, 5.0]}, index=dates),
+                  "B": pd.DataFrame({"Close": [10.0, 30.0]}, index=dates[[1, 3]])}
+        index, tickers, matrices = align(frames, columns=("Close",))
+        self.assertEqual(list(index), list(dates))
+        np.testing.assert_array_equal(matrices["Close"][:, 1], [np.nan, 10.0, 10.0, 30.0, 30.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
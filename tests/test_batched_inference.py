@@ -0,0 +1,110 @@
+import importlib.util
+import logging
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.batched_inference import BatchedInference
+
+HAS_SB3 = importlib.util.find_spec("stable_baselines3") is not None
+
+
+class Model:
+    """predict() like a PPO model without a torch policy: action = argmax of the summed columns + offset."""
+
+    def __init__(self, offset):
+        self.offset = offset
+        self.batches = []
+
+    def predict(self, obs, deterministic=False):
+        self.batches.append(obs.shape)
+        return (obs.sum(axis=-2).argmax(axis=-1) + self.offset) % 3, None
+
+
+class BrokenModel(Model):
+    def predict(self, obs, deterministic=False):
+        raise RuntimeError("corrupt weights")
+
+
+class BrokenGroup:
+    """Stacked policies whose forward pass fails."""
+
+    def predict(self, observations):
+        raise RuntimeError("out of memory")
+
+
+def observations(tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    return {ticker: rng.normal(size=(50, 3)) for ticker in tickers}
+
+
+class TestBatchedInference(unittest.TestCase):
+    def test_one_call_per_model_and_tickers_without_a_model_are_skipped(self):
+        shared, other = Model(0), Model(1)
+        models = {"QQQ": shared, "SPY": shared, "VGT": shared, "ARKK": other, "SOXX": None}
+        obs = observations(models)
+        actions = BatchedInference().predict(models, obs)
+
+        self.assertEqual(shared.batches, [(3, 50, 3)])
+        self.assertEqual(other.batches, [(1, 50, 3)])
+        expected = {ticker: int(model.predict(obs[ticker])[0]) for ticker, model in models.items() if model}
+        self.assertEqual(actions, expected)
+
+    def test_failing_group_or_model_only_leaves_its_own_tickers_out(self):
+        good, other, broken = Model(0), Model(1), BrokenModel(2)
+        models = {"QQQ": good, "SPY": good, "ARKK": other, "VGT": broken}
+        obs = observations(models)
+        inference = BatchedInference(logger=logging.getLogger("test"))
+        inference.logger.setLevel(logging.CRITICAL)
+        inference.architecture = lambda model: "same"  # One stackable group of three models
+        inference.stacked = lambda key, members: BrokenGroup()
+
+        actions = inference.predict(models, obs)
+        expected = {ticker: int(model.predict(obs[ticker])[0]) for ticker, model in models.items()
+                    if model is not broken}
+        self.assertEqual(actions, expected)
+
+    @unittest.skipUnless(HAS_SB3, "stable_baselines3 is not installed")
+    def test_stacked_policies_match_per_model_predict(self):
+        import copy
+
+        import gymnasium as gym
+        import torch as th
+        from stable_baselines3 import PPO
+
+        class Env(gym.Env):
+            observation_space = gym.spaces.Box(-np.inf, np.inf, (50, 3), np.float32)
+            action_space = gym.spaces.Discrete(3)
+
+        base = PPO("MlpPolicy", Env(), device="cpu", seed=0)
+        models = {}
+        for i, ticker in enumerate(["QQQ", "VGT", "SOXX", "ARKK", "SPY", "IWM"]):
+            model = copy.deepcopy(base)
+            with th.no_grad():
+                for parameter in model.policy.parameters():
+                    parameter.add_(th.randn_like(parameter) * 0.5, alpha=i)
+            models[ticker] = model
+        models["DIA"] = models["SPY"]  # Two tickers on one policy: padded batch of two
+        obs = {ticker: values * 10 for ticker, values in observations(models, seed=1).items()}
+
+        inference = BatchedInference()
+        actions = inference.predict(models, obs)
+        expected = {ticker: int(model.predict(obs[ticker], deterministic=True)[0]) for ticker, model in models.items()}
+        self.assertEqual(actions, expected)
+        self.assertEqual(len(inference.groups), 1)
+        group = next(iter(inference.groups.values()))
+        self.assertEqual(inference.predict(models, obs), expected)
+        self.assertIs(next(iter(inference.groups.values())), group)  # Stacked parameters reused
+
+        models["QQQ"] = copy.deepcopy(models["VGT"])  # Reloaded model: the group is rebuilt
+        self.assertEqual(inference.predict(models, obs)["QQQ"],
+                         int(models["QQQ"].predict(obs["QQQ"], deterministic=True)[0]))
+        self.assertIsNot(next(iter(inference.groups.values())), group)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,305 @@
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import psutil
+import yaml
+import zmq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.comm_framework import CommFramework
+from agents.tracing import Tracer
+
+
+def write_config(ports, bus=None):
+    """Write a throwaway config file with the given port assignments."""
+    handle = tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False)
+    yaml.safe_dump({"ports": ports, "bus": bus or {}}, handle)
+    handle.close()
+    return handle.name
+
+
+class TestPortReservation(unittest.TestCase):
+    def test_conflicts_found_in_one_pass_and_own_process_spared(self):
+        listener = socket.socket()
+        listener.bind(("", 15757))
+        listener.listen()
+        config_path = write_config({"Publisher": {"publisher": 15757}, "Other": {"publisher": 15758}},
+                                   bus={"kill_port_conflicts": True})
+        try:
+            comm = CommFramework(config_path)
+            self.assertEqual(comm.find_port_conflicts(comm.configured_ports()), {15757: os.getpid()})
+            comm.cleanup()
+        finally:
+            listener.close()
+            os.remove(config_path)
+
+    def test_owner_without_access_is_reported_as_unknown(self):
+        config_path = write_config({"Publisher": {"publisher": 15757}}, bus={"kill_port_conflicts": True})
+        try:
+            comm = CommFramework(config_path, transport="inproc")
+            with mock.patch.object(comm, "find_port_conflicts", return_value={15757: 4242}), \
+                    mock.patch("psutil.Process") as process, \
+                    mock.patch.object(comm.logger, "warning") as warning:
+                process.return_value.name.side_effect = psutil.AccessDenied(4242)
+                comm.free_ports()
+            process.return_value.terminate.assert_not_called()
+            warning.assert_called_once_with("⚠️ Port 15757 is already in use by an unknown process (PID 4242).")
+            comm.cleanup()
+        finally:
+            os.remove(config_path)
+
+
+class TestEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.config_path = write_config({"Publisher": {"publisher": 15764}},
+                                        bus={"transport": "ipc", "host": "10.0.0.5", "ipc_dir": "/run/bot"})
+
+    def tearDown(self):
+        os.remove(self.config_path)
+
+    def endpoints(self, transport=None):
+        comm = CommFramework(self.config_path, transport=transport)
+        try:
+            return comm.transport, comm.endpoint(15764, bind=True), comm.endpoint(15764)
+        finally:
+            comm.cleanup()
+
+    def test_transport_from_config(self):
+        self.assertEqual(self.endpoints(), ("ipc", "ipc:///run/bot/ai_trading_bot-15764",
+                                            "ipc:///run/bot/ai_trading_bot-15764"))
+
+    def test_tcp_binds_every_interface_and_connects_to_the_configured_host(self):
+        self.assertEqual(self.endpoints("tcp"), ("tcp", "tcp://*:15764", "tcp://10.0.0.5:15764"))
+
+    def test_inproc_overrides_config(self):
+        self.assertEqual(self.endpoints("inproc"), ("inproc", "inproc://ai_trading_bot-15764",
+                                                    "inproc://ai_trading_bot-15764"))
+
+    def test_unknown_transport_falls_back_to_tcp(self):
+        self.assertEqual(self.endpoints("udp")[0], "tcp")
+
+    def test_defaults_to_tcp_on_localhost(self):
+        config_path = write_config({"Publisher": {"publisher": 15764}})
+        try:
+            comm = CommFramework(config_path)
+            self.assertEqual((comm.transport, comm.endpoint(15764)), ("tcp", "tcp://localhost:15764"))
+            comm.cleanup()
+        finally:
+            os.remove(config_path)
+
+
+class TestTopicRouting(unittest.TestCase):
+    def setUp(self):
+        self.config_path = write_config({
+            "Publisher": {"publisher": 15756},
+            "Subscriber": {"subscriber": 15756},
+        })
+        self.comm = CommFramework(self.config_path)
+
+    def tearDown(self):
+        self.comm.cleanup()
+        os.remove(self.config_path)
+
+    def test_subscriber_only_receives_declared_tickers(self):
+        publisher = self.comm.create_publisher("Publisher")
+        subscriber = self.comm.create_subscriber("Subscriber", msg_types=["bars"], tickers=["SPY"])
+        time.sleep(0.2)
+
+        for msg_type, ticker in [("bars", "QQQ"), ("bars", "SPYX"), ("signal", "SPY"), ("bars", "SPY")]:
+            self.comm.send(publisher, {"ticker": ticker, "type": msg_type}, msg_type=msg_type, ticker=ticker)
+
+        self.assertTrue(subscriber.poll(1000))
+        self.assertEqual(self.comm.recv(subscriber), {"ticker": "SPY", "type": "bars"})
+        self.assertFalse(subscriber.poll(100))
+
+
+class TestEventLoop(unittest.TestCase):
+    def setUp(self):
+        self.config_path = write_config({
+            "Publisher": {"publisher": 15755},
+            "Subscriber": {"subscriber": 15755},
+        })
+        self.comm = CommFramework(self.config_path)
+        self.publisher = self.comm.create_publisher("Publisher")
+        self.subscriber = self.comm.create_subscriber("Subscriber")
+        self.loop = self.comm.create_event_loop("Subscriber")
+        time.sleep(0.2)  # Let the SUB socket finish connecting
+
+    def tearDown(self):
+        self.loop.stop()
+        self.loop.close()
+        self.comm.cleanup()
+        os.remove(self.config_path)
+
+    def start_loop(self):
+        thread = threading.Thread(target=self.loop.run, daemon=True)
+        thread.start()
+        return thread
+
+    def test_drains_every_pending_message(self):
+        received = []
+        done = threading.Event()
+
+        def handler(message):
+            received.append(message)
+            if len(received) == 100:
+                done.set()
+
+        self.loop.register(self.subscriber, handler)
+        thread = self.start_loop()
+        for i in range(100):
+            self.publisher.send_string(f"msg-{i}")
+
+        self.assertTrue(done.wait(2), "Messages were not drained promptly.")
+        self.assertEqual(received, [f"msg-{i}" for i in range(100)])
+        self.loop.stop()
+        thread.join(1)
+
+    def test_conflates_to_latest_message_per_topic(self):
+        self.loop.conflate_types = {"quote"}
+        received = []
+        for price in range(5):
+            for ticker in ["SPY", "QQQ"]:
+                self.comm.send(self.publisher, {"ticker": ticker, "price": price}, msg_type="quote", ticker=ticker)
+        self.comm.send(self.publisher, {"ticker": "SPY", "signal": "BUY"}, msg_type="signal", ticker="SPY")
+        time.sleep(0.2)
+
+        self.loop.register(self.subscriber, received.append)
+        self.loop._drain(self.subscriber, received.append)
+
+        self.assertEqual(received, [
+            {"ticker": "SPY", "signal": "BUY"},
+            {"ticker": "SPY", "price": 4},
+            {"ticker": "QQQ", "price": 4},
+        ])
+        self.assertEqual(self.comm.get_metrics()["Subscriber"]["quote"], {"received": 10, "conflated": 8})
+
+    def test_sequence_gaps_count_as_dropped(self):
+        for i in range(5):
+            if i == 2:  # Simulate a message lost at the high-water mark
+                self.comm.sequences[(self.publisher, "bars.SPY.")] += 1
+                continue
+            self.comm.send(self.publisher, {"i": i}, msg_type="bars", ticker="SPY")
+
+        for _ in range(4):
+            self.assertTrue(self.subscriber.poll(1000))
+            self.comm.recv(self.subscriber)
+
+        counts = self.comm.get_metrics()["Subscriber"]["bars"]
+        self.assertEqual(counts["received"], 4)
+        self.assertEqual(counts["dropped"], 1)
+        self.assertEqual(self.comm.get_metrics()["Publisher"]["bars"]["published"], 4)
+
+    def test_failed_send_leaves_no_sequence_gap(self):
+        self.comm.send(self.publisher, {"i": 0}, msg_type="bars", ticker="SPY")
+        with mock.patch.object(self.publisher, "send_multipart", side_effect=zmq.Again()):
+            with self.assertRaises(zmq.Again):
+                self.comm.send(self.publisher, {"i": 1}, msg_type="bars", ticker="SPY")
+        self.comm.send(self.publisher, {"i": 2}, msg_type="bars", ticker="SPY")
+
+        for _ in range(2):
+            self.assertTrue(self.subscriber.poll(1000))
+            self.comm.recv(self.subscriber)
+        self.assertEqual(self.comm.get_metrics()["Subscriber"]["bars"], {"received": 2})
+        self.assertEqual(self.comm.get_metrics()["Publisher"]["bars"], {"published": 2, "send_failed": 1})
+
+    def test_trace_follows_messages_sent_by_handlers(self):
+        self.comm.tracer = self.loop.tracer = Tracer()
+        received = []
+
+        def handler(message):
+            received.append((message, self.comm.tracer.current()))
+            if "close" in message:  # ✅ The subscriber also receives the signal it publishes
+                self.comm.send(self.publisher, {"signal": "BUY"}, msg_type="signal", ticker="SPY")
+
+        self.comm.send(self.publisher, {"close": 1.0}, msg_type="bars", ticker="SPY")
+        time.sleep(0.2)
+        self.loop.register(self.subscriber, handler)
+        while len(received) < 2 and self.subscriber.poll(1000):
+            self.loop._drain(self.subscriber, handler)
+
+        (bar, bar_trace), (signal, signal_trace) = received
+        self.assertEqual(signal, {"signal": "BUY"})
+        self.assertEqual(signal_trace["id"], bar_trace["id"])
+        self.assertEqual([hop[:2] for hop in signal_trace["hops"]],
+                         [["Publisher", "send"], ["Subscriber", "recv"], ["Publisher", "send"], ["Subscriber", "recv"]])
+        self.assertIsNone(self.comm.tracer.current())
+
+    def test_recv_and_request_do_not_leave_a_stale_trace(self):
+        self.comm.tracer = Tracer()
+        self.comm.send(self.publisher, {"close": 1.0}, msg_type="bars", ticker="SPY")
+        self.assertTrue(self.subscriber.poll(1000))
+        self.comm.recv(self.subscriber)
+        self.assertIsNone(self.comm.tracer.current())
+        self.assertEqual(len(self.comm.stamp(self.publisher, "signal.SPY.")[1]["trace"]["hops"]), 1)  # A new trace
+
+        self.comm.send(self.publisher, {"close": 2.0}, msg_type="bars", ticker="SPY")
+        self.assertTrue(self.subscriber.poll(1000))
+        with self.comm.handling(self.subscriber) as message:
+            trace = self.comm.tracer.current()
+            self.assertEqual(message, {"close": 2.0})
+            self.assertEqual(self.comm.stamp(self.publisher, "signal.SPY.")[1]["trace"]["id"], trace["id"])
+        self.assertIsNone(self.comm.tracer.current())
+
+    def test_stop_wakes_blocked_loop(self):
+        self.loop.poll_timeout = 60000
+        self.loop.register(self.subscriber, lambda message: None)
+        thread = self.start_loop()
+        time.sleep(0.1)
+
+        started = time.monotonic()
+        self.loop.stop()
+        thread.join(2)
+        self.assertFalse(thread.is_alive())
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_timers_fire_while_idle(self):
+        fired = threading.Event()
+        self.loop.poll_timeout = 60000
+        self.loop.call_later(0.05, fired.set)
+        thread = self.start_loop()
+
+        self.assertTrue(fired.wait(1))
+        self.loop.stop()
+        thread.join(1)
+
+
+class TestReplier(unittest.TestCase):
+    def setUp(self):
+        self.config_path = write_config({"Server": {"snapshot": 15763}}, bus={"transport": "inproc"})
+        self.comm = CommFramework(self.config_path)
+        self.replier = self.comm.create_replier("Server")
+        self.loop = self.comm.create_event_loop("Server")
+
+    def tearDown(self):
+        self.loop.stop()
+        self.loop.close()
+        self.comm.cleanup()
+        os.remove(self.config_path)
+
+    def test_handler_that_does_not_reply_gets_an_error_reply_and_loop_survives(self):
+        def handler(request):
+            if request.get("fail"):
+                raise ValueError("broken handler")
+            self.comm.send(self.replier, {"echo": request["value"]})
+
+        self.loop.register(self.replier, handler)
+        thread = threading.Thread(target=self.loop.run, daemon=True)
+        thread.start()
+
+        self.assertEqual(self.comm.request("Server", {"fail": True}, timeout=2000)["type"], "error")
+        self.assertEqual(self.comm.request("Server", {"value": 1}, timeout=2000), {"echo": 1})
+        self.assertTrue(thread.is_alive())
+        self.loop.stop()
+        thread.join(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+import yaml
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.data_providers import CsvProvider, create_provider
+from utils.history_store import HistoryStore
+
+
+class TestCsvProvider(unittest.TestCase):
+    def write(self, text):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        handle.write(text)
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def test_long_layout_with_day_first_dates(self):
+        path = self.write("Date;Ticker;Close;High;Low;Open;Volume\n"
+                          "02/01/2015;QQQ;100.5;101;99;100;1000\n"
+                          "05/01/2015;QQQ;9.386.772;102;100;101;2000\n"  # Unreadable number: skipped
+                          "06/01/2015;QQQ;102.5;103;101;102;3000\n"
+                          "02/01/2015;SPY;200;201;199;200;5000\n")
+        bars = CsvProvider(path).get("QQQ", start="2015-01-01")
+        self.assertEqual(list(bars.index), [pd.Timestamp("2015-01-02"), pd.Timestamp("2015-01-06")])
+        self.assertEqual(list(bars.columns), ["Open", "High", "Low", "Close", "Volume"])
+        self.assertEqual(bars["Close"].tolist(), [100.5, 102.5])
+
+    def test_wide_layout_and_periods_end_at_the_last_bar(self):
+        path = self.write("Date,Open_QQQ,High_QQQ,Low_QQQ,Close_QQQ,Volume_QQQ,Ticker,Close_SPY,Ticker_SPY\n"
+                          "2023-12-01,1,2,0.5,1.5,10,QQQ,400,SPY\n"
+                          "2023-12-28,2,3,1.5,2.5,20,QQQ,410,SPY\n"
+                          "2023-12-29,3,4,2.5,3.5,30,QQQ,420,SPY\n")
+        provider = CsvProvider(path)
+        self.assertEqual(provider.get("QQQ", period="5d")["Close"].tolist(), [2.5, 3.5])
+        self.assertEqual(provider.get("SPY", start="2023-01-01")["Close"].tolist(), [400, 410, 420])
+        with self.assertRaises(ValueError):
+            provider.get("QQQ", period="5d", interval="1h")
+
+
+class TestProviderSelection(unittest.TestCase):
+    def provider(self, market_data):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False)
+        yaml.safe_dump({"market_data": market_data, "history_store": {"root": tempfile.mkdtemp()}}, handle)
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        return create_provider(handle.name)
+
+    def test_config_selects_the_provider(self):
+        self.assertIsInstance(self.provider({"provider": "csv", "csv": "bars.csv"}), CsvProvider)
+        offline = self.provider({"provider": "store"})
+        self.assertIsInstance(offline, HistoryStore)
+        self.assertTrue(offline.get("SPY", period="1mo").empty)  # Nothing stored and no download attempted
+        with self.assertRaises(ValueError):
+            self.provider({"provider": "bloomberg"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.history_store import HistoryStore, subtract_ranges
+
+
+class FakeYahoo:
+    """Stands in for yf.download: business-day bars, records every requested range.
+
+    Prices depend on the date only; `factor` re-bases all of them, as Yahoo does after a split.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.factor = 1.0
+
+    def __call__(self, ticker, start, end, interval):
+        self.calls.append((start.normalize(), end.normalize()))
+        dates = pd.bdate_range(start.normalize(), end - pd.Timedelta(1), name="Date")
+        close = (100.0 + dates.dayofyear.to_numpy(dtype=float)) * self.factor
+        return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                             "Adj Close": close / 2, "Volume": 1000.0}, index=dates)
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.fetcher = FakeYahoo()
+        self.store = HistoryStore(root=tempfile.mkdtemp(), fetcher=self.fetcher)
+
+    def test_only_missing_ranges_are_downloaded(self):
+        first = self.store.get("SPY", start="2023-03-01", end="2023-06-01")
+        self.assertEqual(len(self.fetcher.calls), 1)
+        self.assertEqual(first.index.min(), pd.Timestamp("2023-03-01"))
+
+        again = self.store.get("SPY", start="2023-04-01", end="2023-05-01")  # Inside the stored range
+        self.assertEqual(len(self.fetcher.calls), 1)
+        pd.testing.assert_frame_equal(again, first.loc["2023-04-01":"2023-04-30"], check_freq=False)
+
+        wider = self.store.get("SPY", start="2023-01-01", end="2023-07-01")
+        # ✅ Each download reaches one stored bar (2023-03-01, 2023-05-31) to check it was not re-based
+        self.assertEqual(self.fetcher.calls[1:], [(pd.Timestamp("2023-01-01"), pd.Timestamp("2023-03-02")),
+                                                  (pd.Timestamp("2023-05-31"), pd.Timestamp("2023-07-01"))])
+        self.assertTrue(wider.index.is_unique and wider.index.is_monotonic_increasing)
+        self.assertEqual(len(wider), len(pd.bdate_range("2023-01-01", "2023-06-30")))
+
+    def test_store_survives_a_new_instance(self):
+        self.store.get("QQQ", start="2023-01-01", end="2023-02-01")
+        reopened = HistoryStore(root=self.store.root, fetcher=self.fetcher)
+        self.assertEqual(len(reopened.get("QQQ", start="2023-01-01", end="2023-02-01")), 22)
+        self.assertEqual(len(self.fetcher.calls), 1)
+
+    def test_auto_adjust_matches_yfinance(self):
+        raw = self.store.get("SPY", start="2023-01-01", end="2023-02-01")
+        adjusted = self.store.get("SPY", start="2023-01-01", end="2023-02-01", auto_adjust=True)
+        self.assertNotIn("Adj Close", adjusted.columns)
+        np.testing.assert_allclose(adjusted["Open"], raw["Open"] * raw["Adj Close"] / raw["Close"])
+        np.testing.assert_allclose(adjusted["Volume"], raw["Volume"])
+
+    def test_expired_recent_end_is_refreshed(self):
+        self.store.get("SPY", period="1mo")
+        self.store.ttl = 0  # Always stale
+        self.store.get("SPY", period="1mo")
+        refreshed_from = self.fetcher.calls[1][0]
+        self.assertGreater(refreshed_from, pd.Timestamp.now() - pd.Timedelta(days=6))
+
+    def test_split_downloads_the_whole_range_again(self):
+        self.store.get("SPY", start="2023-01-01", end="2023-03-01")
+        self.fetcher.factor = 0.5  # 2:1 split: every earlier price is halved at the provider
+        bars = self.store.get("SPY", start="2023-02-01", end="2023-04-01")
+
+        self.assertEqual(self.fetcher.calls[-1], (pd.Timestamp("2023-02-01"), pd.Timestamp("2023-04-01")))
+        expected = FakeYahoo()
+        expected.factor = 0.5
+        expected = expected("SPY", pd.Timestamp("2023-02-01"), pd.Timestamp("2023-04-01"), "1d")
+        np.testing.assert_allclose(bars["Close"], expected["Close"])
+
+        self.store.get("SPY", start="2023-01-01", end="2023-02-01")  # Dropped with the old basis
+        self.assertEqual(self.fetcher.calls[-1][0], pd.Timestamp("2023-01-01"))
+
+    def test_subtract_ranges(self):
+        self.assertEqual(subtract_ranges(0, 100, [(10, 20), (15, 30), (80, 120)]), [(0, 10), (30, 80)])
+        self.assertEqual(subtract_ranges(0, 100, []), [(0, 100)])
+
+
+if __name__ == "__main__":
+    unittest.main()
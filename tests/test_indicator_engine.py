@@ -0,0 +1,118 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.strategy_agent import StrategyAgent
+from utils.indicator_engine import IndicatorEngine
+
+COLUMNS = ("SMA_50", "SMA_200", "RSI", "ATR", "MACD", "MACD_signal")
+
+
+def random_bars(rows, seed):
+    """Random OHLC bars: trending, flat (zero changes) or jumpy, depending on the seed."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(rng.normal(0, 0.002), rng.choice([0.001, 0.01, 0.05]), rows)
+    steps[rng.random(rows) < rng.choice([0.0, 0.3])] = 0.0  # Runs of unchanged closes
+    close = 100 * np.exp(np.cumsum(steps))
+    spread = close * rng.uniform(0, 0.03, rows)
+    high = close + spread * rng.random(rows)
+    low = close - spread * rng.random(rows)
+    return pd.DataFrame({"Open": close, "High": high, "Low": low, "Close": close, "Volume": 1.0},
+                        index=pd.bdate_range("2020-01-01", periods=rows, name="Date"))
+
+
+class TestIndicatorEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.agent = StrategyAgent()
+        cls.agent.logger.setLevel(logging.ERROR)  # ✅ calculate_macd warns on every short frame
+
+    def assert_matches_pandas(self, values, data):
+        expected = self.agent.calculate_indicators(data).iloc[-1]
+        for column in COLUMNS:
+            if np.isnan(expected[column]):
+                self.assertTrue(np.isnan(values[column]), column)
+            else:
+                self.assertAlmostEqual(values[column], expected[column], delta=1e-9 * max(1, abs(expected[column])),
+                                       msg=column)
+
+    def test_property_every_prefix_matches_the_pandas_implementation(self):
+        for seed in range(12):
+            data = random_bars(int(np.random.default_rng(seed).integers(1, 450)), seed)
+            engine = IndicatorEngine()
+            checked = set(np.random.default_rng(seed).choice(len(data), min(len(data), 15), replace=False))
+            checked |= {0, len(data) - 1, min(len(data) - 1, 13), min(len(data) - 1, 25), min(len(data) - 1, 199)}
+            for i, (high, low, close) in enumerate(data[["High", "Low", "Close"]].itertuples(index=False)):
+                values = engine.update("SPY", high, low, close)
+                if i in checked:
+                    with self.subTest(seed=seed, bar=i):
+                        self.assert_matches_pandas(values, data.iloc[:i + 1])
+
+    def test_sync_on_a_sliding_window_matches_that_window(self):
+        data = random_bars(330, seed=11)
+        engine = IndicatorEngine()
+        for end in range(60, 330, 9):
+            window = data.iloc[end - 60:end].copy()  # The last 60 bars, like the market data cache
+            window.iloc[-1, window.columns.get_loc("Close")] *= 1.01  # Today's bar, still moving
+            for frame in (window, data.iloc[end - 60:end]):  # Then the same window with the bar closed
+                with self.subTest(end=end):
+                    values = engine.sync("SPY", frame)
+                    self.assert_matches_pandas(values, frame)
+                    self.assertTrue(np.isnan(values["SMA_200"]))  # Never more history than the window
+                    self.assertEqual(engine.states["SPY"].count, 60)
+
+    def test_full_history_sync_adds_new_bars_and_revises_the_last_one(self):
+        data = random_bars(300, seed=42)
+        engine = IndicatorEngine(full_history=True)
+        engine.sync("SPY", data.iloc[:250])
+
+        partial = data.iloc[:260].copy()
+        partial.iloc[-1, partial.columns.get_loc("Close")] *= 1.05  # Today's bar, still moving
+        engine.sync("SPY", partial.iloc[-60:])  # Window of the last 60 bars, like the market data cache
+        self.assert_matches_pandas(engine.latest("SPY"), partial)
+
+        values = engine.sync("SPY", data.iloc[200:280])  # The bar closed at its final value, then 20 more
+        self.assert_matches_pandas(values, data.iloc[:280])
+        self.assertEqual(engine.states["SPY"].count, 280)
+
+    def test_sync_starts_over_when_earlier_bars_were_revised(self):
+        data = random_bars(300, seed=7)
+        for changed in ("Close", "High"):  # Closes feed SMA/RSI/MACD, highs and lows only ATR
+            engine = IndicatorEngine()
+            engine.sync("SPY", data.iloc[:250])
+            revised = data.iloc[:260].copy()
+            revised.iloc[-14:-12, revised.columns.get_loc(changed)] *= 1.03  # Trailing days downloaded again
+            with self.subTest(changed=changed):
+                self.assert_matches_pandas(engine.sync("SPY", revised), revised)
+                self.assertEqual(engine.states["SPY"].count, 260)
+
+        self.assert_matches_pandas(engine.sync("SPY", data.iloc[200:280]), data.iloc[200:280])  # Started over
+
+    def test_checkpoint_and_restore(self):
+        data = random_bars(320, seed=7)
+        engine = IndicatorEngine(full_history=True)
+        engine.sync("QQQ", data.iloc[:300])
+        path = os.path.join(tempfile.mkdtemp(), "indicators.json")
+        engine.checkpoint(path)
+
+        restored = IndicatorEngine.restore(path, full_history=True)
+        self.assertEqual(restored.latest("QQQ"), engine.latest("QQQ"))
+        self.assert_matches_pandas(restored.sync("QQQ", data.iloc[250:]), data)
+        self.assert_matches_pandas(IndicatorEngine.restore(path).sync("QQQ", data.iloc[250:]), data.iloc[250:])
+        self.assertEqual(IndicatorEngine.restore(path, rsi_period=7).states, {})  # Other parameters: start over
+
+    def test_calculate_indicators_leaves_the_input_alone(self):
+        data = random_bars(60, seed=3)
+        self.agent.calculate_indicators(data)
+        self.assertEqual(list(data.columns), ["Open", "High", "Low", "Close", "Volume"])
+
+
+if __name__ == "__main__":
+    unittest.main()
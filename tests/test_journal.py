@@ -0,0 +1,125 @@
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import yaml
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.comm_framework import CommFramework
+from agents.journal import JournalReader, JournalRecorder, JournalReplayer, JournalWriter
+from agents.serializers import decode_message, encode_message, get_serializer
+from agents.strategy_agent import StrategyAgent
+
+
+class TestJournalFile(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "bus.journal")
+
+    def test_round_trip_and_truncated_tail(self):
+        writer = JournalWriter(self.path)
+        for i in range(3):
+            writer.append("StrategyAgent", encode_message({"i": i}, get_serializer("json"), "signal.SPY."), i)
+        writer.close()
+        with open(self.path, "ab") as handle:
+            handle.write(b"\x40\x00\x00\x00partial")  # A record cut short by a crash
+
+        reader = JournalReader(self.path)
+        records = [(timestamp, publisher, decode_message(frames)) for timestamp, publisher, frames in reader]
+        self.assertEqual(records, [(i, "StrategyAgent", {"i": i}) for i in range(3)])
+        self.assertTrue(reader.truncated)
+        self.assertEqual(reader.publishers(), ["StrategyAgent"])
+        reader.close()
+
+
+class TestRecordReplay(unittest.TestCase):
+    def setUp(self):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False)
+        yaml.safe_dump({"ports": {"StrategyAgent": {"publisher": 15955, "subscriber": 15956},
+                                  "RiskManagementAgent": {"publisher": 15957, "subscriber": 15958}},
+                        "bus": {"transport": "inproc", "tracing": {"enabled": True}}}, handle)
+        handle.close()
+        self.config_path = handle.name
+        self.path = os.path.join(tempfile.mkdtemp(), "bus.journal")
+        self.comm = CommFramework(self.config_path)
+
+    def tearDown(self):
+        self.comm.cleanup()
+        os.remove(self.config_path)
+
+    def record(self, messages, gap=0.0):
+        recorder = JournalRecorder(self.comm, self.path).start()
+        publisher = self.comm.create_publisher("StrategyAgent")
+        time.sleep(0.1)  # Let the tap connect
+        for message in messages:
+            self.comm.send(publisher, message, msg_type="signal", ticker=message["ticker"])
+            time.sleep(gap)
+        time.sleep(0.1)
+        recorder.stop()
+        publisher.close()
+
+    def replay_into_risk(self, speed, into=("RiskManagementAgent",), agents=None):
+        received, done = [], threading.Event()
+        subscriber = self.comm.create_subscriber("RiskManagementAgent", msg_types=["signal"])
+        loop = self.comm.create_event_loop("RiskManagementAgent", poll_timeout=50)
+        loop.register(subscriber, received.append)
+        thread = threading.Thread(target=loop.run, args=(lambda: not done.is_set(),))
+        thread.start()
+
+        replayer = JournalReplayer(self.comm, self.path, speed=speed, agents=agents, into=into and list(into))
+        replayer.bind(warmup=0.1)
+        sent, elapsed = replayer.run()
+        deadline = time.monotonic() + 5
+        while len(received) < sent and time.monotonic() < deadline:
+            time.sleep(0.01)
+        done.set()
+        thread.join()
+        return sent, elapsed, received
+
+    def test_replay_at_max_speed_is_complete_and_in_order(self):
+        messages = [{"ticker": "SPY" if i % 2 else "QQQ", "signal": "BUY", "i": i} for i in range(500)]
+        self.record(messages)
+
+        sent, _, received = self.replay_into_risk(speed=None)
+        self.assertEqual(sent, 500)
+        self.assertEqual(received, messages)
+        self.assertEqual(self.comm.get_metrics()["RiskManagementAgent"]["signal"].get("dropped", 0), 0)
+        # ✅ Replayed messages carry fresh traces from the recorded publisher
+        self.assertTrue(any("StrategyAgent -> RiskManagementAgent" in line for line in self.comm.tracer.report()))
+
+    def test_signals_published_into_risk_are_recorded_and_replayed_into_it(self):
+        recorder = JournalRecorder(self.comm, self.path).start()
+        strategy = StrategyAgent(self.comm)  # Publishes into RiskManagementAgent's subscriber port
+        strategy.logger.setLevel(logging.ERROR)
+        time.sleep(0.1)
+        for ticker in ["SPY", "QQQ", "SPY"]:
+            strategy.publish_signal(ticker, "BUY")
+        time.sleep(0.1)
+        recorder.stop()
+        strategy.publisher.close()  # ✅ The replayer binds the same port
+        strategy.stop()
+
+        self.assertEqual(recorder.writer.records, 3)
+        reader = JournalReader(self.path)
+        self.assertEqual(reader.publishers(), ["StrategyAgent->RiskManagementAgent"])
+        reader.close()
+
+        sent, _, received = self.replay_into_risk(speed=None, into=None, agents=["StrategyAgent"])
+        self.assertEqual(sent, 3)
+        self.assertEqual(received, [{"ticker": ticker, "signal": "BUY"} for ticker in ["SPY", "QQQ", "SPY"]])
+
+    def test_replay_keeps_scaled_timing(self):
+        self.record([{"ticker": "SPY", "signal": "BUY", "i": i} for i in range(3)], gap=0.1)
+
+        _, elapsed, received = self.replay_into_risk(speed=2)
+        self.assertEqual(len(received), 3)
+        self.assertGreaterEqual(elapsed, 0.09)  # ~0.2s recorded span at 2x
+        self.assertLess(elapsed, 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+import unittest
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.comm_framework import CommFramework
+from agents.market_data_agent import MarketDataAgent
+from tests.test_comm_framework import write_config
+
+
+def bars(dates, closes):
+    return pd.DataFrame({"Date": dates, "Close": closes, "Volume": [100.0] * len(dates)})
+
+
+class TestComputeDelta(unittest.TestCase):
+    def setUp(self):
+        self.agent = MarketDataAgent()
+
+    def published(self, ticker, data):
+        self.agent.history[ticker] = data
+        self.agent.last_published[ticker] = data["Date"].max()
+
+    def test_first_publish_carries_full_history(self):
+        data = bars(["2024-01-01", "2024-01-02"], [1.0, 2.0])
+        self.assertTrue(self.agent.compute_delta("SPY", data).equals(data))
+
+    def test_only_new_and_revised_bars(self):
+        self.published("SPY", bars(["2024-01-01", "2024-01-02", "2024-01-03"], [1.0, 2.0, 3.0]))
+        data = bars(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"], [1.0, 2.5, 3.0, 4.0])
+        self.assertEqual(self.agent.compute_delta("SPY", data)["Date"].tolist(), ["2024-01-02", "2024-01-04"])
+
+    def test_unchanged_history_is_empty_and_missing_values_are_equal(self):
+        self.published("SPY", bars(["2024-01-01", "2024-01-02"], [1.0, float("nan")]))
+        self.assertTrue(self.agent.compute_delta("SPY", bars(["2024-01-01", "2024-01-02"],
+                                                             [1.0, float("nan")])).empty)
+
+
+class TestSnapshotRequests(unittest.TestCase):
+    def setUp(self):
+        self.config_path = write_config({"MarketDataAgent": {"publisher": 15761, "snapshot": 15762}},
+                                        bus={"transport": "inproc"})
+        self.comm = CommFramework(self.config_path)
+        self.agent = MarketDataAgent(self.comm)
+        self.agent.history["SPY"] = bars(["2024-01-01", "2024-01-02"], [1.0, 2.0])
+        self.agent.event_loop.register(self.agent.snapshot_server, self.agent.handle_snapshot_request)
+        self.thread = threading.Thread(target=self.agent.event_loop.run, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.agent.stop()
+        self.thread.join(2)
+        self.agent.event_loop.close()
+        self.comm.cleanup()
+        os.remove(self.config_path)
+
+    def test_snapshot_round_trip(self):
+        reply = self.comm.request_snapshot(tickers=["SPY", "QQQ"], timeout=2000)
+        self.assertEqual(reply["type"], "snapshot")
+        self.assertEqual(reply["tickers"], ["SPY"])
+        self.assertEqual(pd.DataFrame(reply["SPY"])["Close"].tolist(), [1.0, 2.0])
+
+    def test_malformed_requests_get_an_error_and_the_server_keeps_answering(self):
+        for request in [["bad"], {"type": "subscribe"}, {"tickers": 5}]:
+            with self.subTest(request=request):
+                reply = self.comm.request("MarketDataAgent", request, timeout=2000)
+                self.assertEqual(reply["type"], "error")
+
+        self.assertEqual(self.comm.request_snapshot(timeout=2000)["tickers"], ["SPY"])
+        self.assertTrue(self.thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import threading
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.market_data_cache import MarketDataCache, next_bar_close
+
+NEW_YORK = "America/New_York"
+
+
+def at(text):
+    """Epoch seconds of a New York wall clock time."""
+    return pd.Timestamp(text, tz=NEW_YORK).timestamp()
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Loader:
+    """Stands in for get_history: 100 bars whose values change with every download."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, ticker, **request):
+        self.release.wait(5)
+        self.calls += 1
+        return pd.DataFrame({"Close": np.full(100, float(self.calls))},
+                            index=pd.date_range("2024-01-01", periods=100, name="Date"))
+
+
+class TestNextBarClose(unittest.TestCase):
+    def close(self, interval, text):
+        return next_bar_close(interval, pd.Timestamp(text, tz=NEW_YORK))
+
+    def test_daily_bars_close_with_the_session(self):
+        self.assertEqual(self.close("1d", "2024-03-06 11:00"), pd.Timestamp("2024-03-06 16:00", tz=NEW_YORK))
+        self.assertEqual(self.close("1d", "2024-03-06 16:30"), pd.Timestamp("2024-03-07 16:00", tz=NEW_YORK))
+        self.assertEqual(self.close("1d", "2024-03-08 17:00"), pd.Timestamp("2024-03-11 16:00", tz=NEW_YORK))
+
+    def test_intraday_bars_start_at_the_open(self):
+        self.assertEqual(self.close("1h", "2024-03-06 08:00"), pd.Timestamp("2024-03-06 10:30", tz=NEW_YORK))
+        self.assertEqual(self.close("1h", "2024-03-06 10:30"), pd.Timestamp("2024-03-06 11:30", tz=NEW_YORK))
+        self.assertEqual(self.close("1h", "2024-03-06 15:45"), pd.Timestamp("2024-03-06 16:00", tz=NEW_YORK))
+        self.assertEqual(self.close("5m", "2024-03-06 09:31"), pd.Timestamp("2024-03-06 09:35", tz=NEW_YORK))
+
+
+class TestMarketDataCache(unittest.TestCase):
+    def setUp(self):
+        self.loader = Loader()
+        self.clock = Clock(at("2024-03-06 11:00"))
+        self.cache = MarketDataCache(loader=self.loader, clock=self.clock, grace=60, max_stale=3600)
+        self.addCleanup(self.cache.close)
+
+    def test_fresh_until_bar_close_then_stale_while_revalidate(self):
+        first = self.cache.get("SPY", period="60d")
+        self.assertIs(self.cache.get("SPY", period="60d"), first)
+        self.assertEqual(self.loader.calls, 1)
+
+        self.clock.now = at("2024-03-06 16:01:30")  # Bar closed and grace passed: serve stale, refresh
+        self.loader.release.clear()
+        self.assertIs(self.cache.get("SPY", period="60d"), first)
+        self.assertIs(self.cache.get("SPY", period="60d"), first)  # Refresh still running: not started again
+        future = self.cache.loading[("SPY", "60d", "1d", False, None, None)]
+        self.loader.release.set()
+        future.result(5)
+
+        self.assertEqual(self.loader.calls, 2)
+        self.assertEqual(self.cache.get("SPY", period="60d")["Close"].iloc[0], 2.0)
+        self.assertEqual(self.cache.stats()["refreshes"], 1)
+
+        self.clock.now = at("2024-03-08 12:00")  # Far past max_stale: wait for a new download
+        self.assertEqual(self.cache.get("SPY", period="60d")["Close"].iloc[0], 3.0)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["stale_hits"], stats["misses"]), (2, 2, 2))
+
+    def test_fetch_just_after_a_close_expires_after_the_grace(self):
+        self.clock.now = at("2024-03-06 16:00:20")  # The 16:00 bar may not be published yet
+        self.cache.get("SPY", period="60d")
+        self.assertEqual(self.cache.entries[("SPY", "60d", "1d", False, None, None)][2], at("2024-03-06 16:01"))
+
+        self.clock.now = at("2024-03-06 16:01:30")
+        self.cache.get("SPY", period="60d")
+        self.assertEqual(self.cache.stats()["stale_hits"], 1)
+
+    def test_lru_eviction_within_the_memory_budget(self):
+        size = int(self.loader("X").memory_usage(index=True, deep=True).sum())
+        self.cache.max_bytes = 2 * size
+        self.cache.get("QQQ")
+        self.cache.get("SPY")
+        self.cache.get("QQQ")  # SPY becomes the least recently used
+        self.cache.get("VGT")
+        keys = [key[0] for key in self.cache.entries]
+        self.assertEqual(keys, ["QQQ", "VGT"])
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.assertLessEqual(self.cache.stats()["bytes"], self.cache.max_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.model_registry import ModelRegistry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Model:
+    def __init__(self, path):
+        with open(path) as file:
+            self.version = file.read()
+
+
+class Loader:
+    """Stands in for PPO.load: a model holding the file's text; "broken" files raise."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, path):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append(os.path.basename(path))
+        model = Model(path)
+        if model.version == "broken":
+            raise ValueError("not a zip file")
+        return model
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.clock = Clock()
+        self.loader = Loader()
+
+    def write(self, ticker, text, mtime=1_000_000):
+        path = os.path.join(self.root, f"{ticker}_ppo.zip")
+        with open(path, "w") as file:
+            file.write(text)
+        os.utime(path, (mtime, mtime))  # ✅ Explicit mtimes: a rewrite within the same tick must still count
+
+    def registry(self, **kwargs):
+        return ModelRegistry(root=self.root, loader=self.loader, clock=self.clock, **kwargs)
+
+    def test_each_model_is_loaded_once(self):
+        self.write("SPY", "v1")
+        registry = self.registry()
+        models = [registry.get("SPY") for _ in range(250)]  # One backtest year of signals
+        self.clock.now += 60
+        models.append(registry.get("SPY"))  # File checked again: unchanged
+        self.assertEqual(self.loader.calls, ["SPY_ppo.zip"])
+        self.assertTrue(all(model is models[0] for model in models))
+        self.assertEqual(registry.stats()["hits"], 250)
+
+    def test_changed_file_is_reloaded_and_a_broken_one_keeps_the_previous_model(self):
+        self.write("SPY", "v1")
+        registry = self.registry(check_interval=5)
+        self.assertEqual(registry.get("SPY").version, "v1")
+
+        self.write("SPY", "v2", mtime=1_000_100)
+        self.assertEqual(registry.get("SPY").version, "v1")  # Not checked before check_interval
+        self.clock.now += 5
+        self.assertEqual(registry.get("SPY").version, "v2")
+
+        self.write("SPY", "broken", mtime=1_000_200)
+        self.clock.now += 5
+        self.assertEqual(registry.get("SPY").version, "v2")
+        self.clock.now += 5
+        self.assertEqual(registry.get("SPY").version, "v2")  # The same broken file is not loaded again
+        self.assertEqual(self.loader.calls.count("SPY_ppo.zip"), 3)
+        self.assertEqual({key: registry.stats()[key] for key in ("loads", "reloads", "load_errors")},
+                         {"loads": 1, "reloads": 1, "load_errors": 1})
+
+    def test_missing_and_broken_files_give_none(self):
+        self.write("QQQ", "broken")
+        registry = self.registry()
+        self.assertIsNone(registry.get("ARKK"))
+        self.assertIsNone(registry.get("QQQ"))
+        self.assertIsNone(registry.get("QQQ"))
+        self.assertEqual(self.loader.calls, ["QQQ_ppo.zip"])
+
+        self.write("QQQ", "fixed", mtime=1_000_100)
+        self.assertEqual(registry.get("QQQ").version, "fixed")
+
+    def test_least_recently_used_models_are_evicted(self):
+        for ticker in ("QQQ", "SPY", "VGT"):
+            self.write(ticker, "x" * 100)
+        registry = self.registry(max_models=2)
+        registry.get("QQQ")
+        registry.get("SPY")
+        registry.get("QQQ")
+        registry.get("VGT")
+        self.assertEqual(list(registry.entries), ["QQQ", "VGT"])
+
+        registry = self.registry(max_bytes=250)  # Models without a torch policy count their file size
+        for ticker in ("QQQ", "SPY", "VGT"):
+            registry.get(ticker)
+        self.assertEqual(list(registry.entries), ["SPY", "VGT"])
+        self.assertEqual(registry.stats()["bytes"], 200)
+        self.assertEqual(registry.stats()["evictions"], 1)
+
+    def test_preload_loads_in_parallel_and_concurrent_gets_share_one_load(self):
+        tickers = ["QQQ", "VGT", "SOXX", "ARKK", "SPY"]
+        for ticker in tickers:
+            self.write(ticker, ticker)
+        self.loader.delay = 0.2
+        registry = self.registry(workers=5, preload=tickers)
+        started = time.perf_counter()
+        models = registry.preload()
+        self.assertLess(time.perf_counter() - started, 0.6)
+        self.assertEqual({ticker: model.version for ticker, model in models.items()}, dict(zip(tickers, tickers)))
+
+        registry.invalidate("SPY")
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("SPY"))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.loader.calls.count("SPY_ppo.zip"), 2)
+        self.assertTrue(all(model is results[0] for model in results))
+
+    def test_strategy_agents_share_the_registry(self):
+        from agents.strategy_agent import StrategyAgent
+        self.assertIs(StrategyAgent().models, StrategyAgent().models)
+
+
+if __name__ == "__main__":
+    unittest.main()
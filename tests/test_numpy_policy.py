@@ -0,0 +1,109 @@
+import importlib.util
+import io
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from utils.batched_inference import BatchedInference
+from utils.model_registry import ModelRegistry
+from utils.numpy_policy import NumpyPolicy, export_policy, read_state_dict
+
+HAS_SB3 = importlib.util.find_spec("stable_baselines3") is not None
+TICKERS = ["QQQ", "VGT", "SOXX", "ARKK", "SPY"]
+
+
+def observations(count, seed=0):
+    """Price-like observations at several scales."""
+    rng = np.random.default_rng(seed)
+    scale = rng.choice([1.0, 10.0, 100.0], size=(count, 1, 1))
+    return rng.normal(0, 1, (count, 50, 3)) * scale + scale
+
+
+class TestNumpyPolicy(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        cls.policies = {ticker: export_policy(os.path.join(ROOT, "models", f"{ticker}_ppo.zip"),
+                                              os.path.join(cls.root, f"{ticker}_ppo.npz")) for ticker in TICKERS}
+
+    def test_export_keeps_the_actor_and_round_trips(self):
+        policy = NumpyPolicy.load(os.path.join(self.root, "SPY_ppo.npz"))
+        self.assertEqual([weight.shape for weight in policy.weights], [(64, 150), (64, 64), (3, 64)])
+        self.assertEqual((policy.activation, policy.obs_shape), ("Tanh", (50, 3)))
+        with zipfile.ZipFile(os.path.join(ROOT, "models", "SPY_ppo.zip")) as archive:
+            state = read_state_dict(archive.read("policy.pth"))
+        np.testing.assert_array_equal(policy.weights[2], state["action_net.weight"])
+        np.testing.assert_array_equal(policy.biases[0], state["mlp_extractor.policy_net.0.bias"])
+
+    def test_actions_match_a_float64_reference(self):
+        obs = observations(500)
+        policy = self.policies["QQQ"]
+        x = obs.reshape(len(obs), -1)
+        for i, (weight, bias) in enumerate(zip(policy.weights, policy.biases)):
+            x = x @ weight.T.astype(np.float64) + bias
+            if i < len(policy.weights) - 1:
+                x = np.tanh(x)
+        top = np.sort(x, axis=1)
+        clear = top[:, -1] - top[:, -2] > 1e-3  # Away from ties that float32 rounding could flip
+        actions, state = policy.predict(obs)
+        self.assertIsNone(state)
+        np.testing.assert_array_equal(actions[clear], x.argmax(axis=1)[clear])
+        self.assertEqual([int(policy.predict(o)[0]) for o in obs[:20]], actions[:20].tolist())
+
+    def test_unpickler_only_rebuilds_tensors(self):
+        class Exploit:
+            def __reduce__(self):
+                return os.system, ("echo pwned",)
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("archive/data.pkl", pickle.dumps({"weight": Exploit()}))
+        with self.assertRaises(pickle.UnpicklingError):
+            read_state_dict(buffer.getvalue())
+
+    def test_registry_and_batched_inference_run_without_torch(self):
+        script = ("import sys; sys.path.insert(0, sys.argv[1])\n"
+                  "from utils.model_registry import ModelRegistry\n"
+                  "from utils.batched_inference import BatchedInference\n"
+                  "import numpy as np\n"
+                  "registry = ModelRegistry(root=sys.argv[2], format='numpy')\n"
+                  "models = registry.preload(['SPY', 'QQQ'])\n"
+                  "BatchedInference().predict(models, {t: np.ones((50, 3)) for t in models})\n"
+                  "print(sorted(m for m in ('torch', 'stable_baselines3') if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", script, ROOT, self.root], capture_output=True, text=True,
+                                check=True)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "[]")
+
+    def test_stacked_numpy_policies_match_one_policy_at_a_time(self):
+        registry = ModelRegistry(root=self.root, format="numpy")
+        models = registry.preload(TICKERS)
+        models["DIA"] = models["SPY"]
+        obs = dict(zip(models, observations(len(models), seed=3)))
+        inference = BatchedInference()
+        actions = inference.predict(models, obs)
+        self.assertEqual(len(inference.groups), 1)
+        self.assertEqual(actions, {ticker: int(model.predict(obs[ticker])[0]) for ticker, model in models.items()})
+
+    @unittest.skipUnless(HAS_SB3, "stable_baselines3 is not installed")
+    def test_actions_match_stable_baselines3(self):
+        from stable_baselines3 import PPO
+
+        obs = observations(5000, seed=1)
+        for ticker in TICKERS:
+            with self.subTest(ticker=ticker):
+                model = PPO.load(os.path.join(ROOT, "models", f"{ticker}_ppo.zip"), device="cpu")
+                expected, _ = model.predict(obs, deterministic=True)
+                np.testing.assert_array_equal(self.policies[ticker].predict(obs)[0], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.registry import load_agent, select_agents
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class TestAgentRegistry(unittest.TestCase):
+    def test_select_agents(self):
+        self.assertEqual(list(select_agents(["RiskManagementAgent"])), ["RiskManagementAgent"])
+        self.assertEqual(len(select_agents()), 6)
+        with self.assertRaises(ValueError):
+            select_agents(["NoSuchAgent"])
+
+    def test_risk_agent_does_not_import_heavy_dependencies(self):
+        code = ("import sys, main; from agents.registry import load_agent; "
+                "load_agent(main.AGENTS['RiskManagementAgent']); "
+                "print(sorted(m for m in ('pandas', 'yfinance', 'torch', 'stable_baselines3') if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "[]")
+
+    def test_classes_pass_through(self):
+        self.assertIs(load_agent(TestAgentRegistry), TestAgentRegistry)
+
+
+if __name__ == "__main__":
+    unittest.main()
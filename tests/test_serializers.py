@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.serializers import decode_envelope, decode_message, encode_message, get_serializer, make_topic
+
+
+class TestSerializers(unittest.TestCase):
+    def setUp(self):
+        self.bars = pd.DataFrame({
+            "Date": ["2024-01-02", "2024-01-03", "2024-01-04"],
+            "Close": [100.0, 101.5, 99.25],
+            "Volume": [1000, 2000, 3000],
+        })
+
+    def round_trip(self, name, payload):
+        return decode_message(encode_message(payload, get_serializer(name)))
+
+    def test_formats_decode_to_the_same_columns(self):
+        for name in ["json", "numpy"]:
+            payload = self.round_trip(name, {"ticker": "SPY", "bars": self.bars})
+            self.assertEqual(payload["ticker"], "SPY")
+            self.assertEqual(list(payload["bars"]), ["Date", "Close", "Volume"])
+            np.testing.assert_array_equal(payload["bars"]["Close"], self.bars["Close"].to_numpy())
+            np.testing.assert_array_equal(payload["bars"]["Date"], self.bars["Date"].to_numpy().astype(str))
+
+    def test_numpy_decode_is_zero_copy(self):
+        frames = encode_message({"ticker": "SPY", "bars": self.bars}, get_serializer("numpy"))
+        payload = decode_message(frames)
+        self.assertFalse(payload["bars"]["Close"].flags.owndata)
+        self.assertFalse(payload["bars"]["Close"].flags.writeable)
+
+    def test_numpy_arrays_keep_shape(self):
+        matrix = np.arange(12, dtype=np.float32).reshape(4, 3)
+        payload = self.round_trip("numpy", {"obs": matrix})
+        np.testing.assert_array_equal(payload["obs"], matrix)
+
+    def test_numpy_sends_datetime_columns(self):
+        bars = self.bars.assign(Date=pd.to_datetime(self.bars["Date"]))
+        frames = encode_message({"bars": bars}, get_serializer("numpy"))
+        for frame in frames:
+            memoryview(frame)  # ZeroMQ needs the buffer protocol (datetime64 arrays do not export one)
+        payload = decode_message(frames)
+        np.testing.assert_array_equal(payload["bars"]["Date"], bars["Date"].to_numpy())
+
+    def test_topic_frame_comes_first(self):
+        frames = encode_message({"signal": "BUY"}, get_serializer("json"), make_topic("signal", "SPY"))
+        self.assertEqual(frames[0], b"signal.SPY.")
+        self.assertEqual(decode_envelope(frames), ("signal.SPY.", {"signal": "BUY"}))
+
+    def test_plain_messages_fall_back_to_json(self):
+        signal = {"ticker": "SPY", "signal": "BUY"}
+        self.assertEqual(self.round_trip("numpy", signal), signal)
+        self.assertEqual(decode_message([b'{"ticker": "SPY"}']), {"ticker": "SPY"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.shm_bars import SharedBarStore
+from agents.strategy_agent import StrategyAgent
+from utils.history_store import period_start
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class TestSharedBarStore(unittest.TestCase):
+    def setUp(self):
+        self.store = SharedBarStore.create("ai_trading_bot_test_bars", ["SPY", "QQQ"], capacity=8)
+        self.reader = SharedBarStore.attach("ai_trading_bot_test_bars")
+
+    def tearDown(self):
+        self.reader.close()
+        self.store.close()
+
+    def test_append_and_revise(self):
+        self.assertEqual(self.store.write("SPY", [1, 2, 3], {"Close": [10.0, 20.0, 30.0]}), 3)
+        self.assertEqual(self.store.write("SPY", [3, 4], {"Close": [31.0, 40.0]}), 4)  # Bar 3 revised
+
+        count, bars = self.reader.read("SPY")
+        self.assertEqual(count, 4)
+        np.testing.assert_array_equal(bars["Date"].astype(np.int64), [1, 2, 3, 4])
+        np.testing.assert_array_equal(bars["Close"], [10.0, 20.0, 31.0, 40.0])
+        self.assertTrue(np.isnan(bars["Open"]).all())
+        self.assertEqual(self.reader.bar_count("QQQ"), 0)
+
+    def test_views_are_zero_copy_and_contiguous_across_wrap(self):
+        self.store.write("SPY", np.arange(13), {"Close": np.arange(13) * 1.0})
+        sequence, count, bars = self.reader.view("SPY", 6)
+
+        self.assertEqual(count, 13)
+        np.testing.assert_array_equal(bars["Close"], np.arange(7, 13))
+        self.assertFalse(bars["Close"].flags.owndata)
+        self.assertFalse(bars["Close"].flags.writeable)
+        self.assertTrue(self.reader.unchanged("SPY", sequence))
+
+        self.store.write("SPY", [13], {"Close": [13.0]})
+        self.assertFalse(self.reader.unchanged("SPY", sequence))
+
+    def test_other_process_reads_the_store(self):
+        self.store.write("QQQ", [1, 2], {"Close": [1.5, 2.5]})
+        code = ("from agents.shm_bars import SharedBarStore; "
+                "store = SharedBarStore.attach('ai_trading_bot_test_bars'); "
+                "print(store.read('QQQ')[1]['Close'].tolist()); store.close()")
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "[1.5, 2.5]")
+        self.assertEqual(result.stderr, "")  # ✅ No resource tracker warnings from the reader
+
+    def test_recreated_store_is_detected_by_attached_readers(self):
+        self.assertFalse(self.reader.replaced())
+        recreated = SharedBarStore.create("ai_trading_bot_test_bars", ["SPY"], capacity=8)  # Writer restarted
+        try:
+            self.assertTrue(self.store.retired)
+            self.assertTrue(self.reader.replaced())
+            self.assertNotEqual(SharedBarStore.generation_of("ai_trading_bot_test_bars"), self.reader.generation)
+        finally:
+            recreated.close()
+        self.assertIsNone(SharedBarStore.generation_of("ai_trading_bot_test_bars"))
+
+    def test_segment_removed_without_retiring_is_detected_by_generation(self):
+        self.store.shm.unlink()  # e.g. the resource tracker of a crashed writer
+        recreated = SharedBarStore.create("ai_trading_bot_test_bars", ["SPY"], capacity=8)
+        try:
+            self.assertFalse(self.reader.retired)
+            self.assertTrue(self.reader.replaced())
+        finally:
+            recreated.close()
+
+
+class TestStrategyAgentBarStore(unittest.TestCase):
+    def setUp(self):
+        self.store = SharedBarStore.create("ai_trading_bot_test_bars", ["SPY"], capacity=8)
+        self.agent = StrategyAgent()
+        self.agent.bar_store_name = "ai_trading_bot_test_bars"
+
+    def tearDown(self):
+        if self.agent.bar_store is not None:
+            self.agent.bar_store.close()
+        self.store.close()
+
+    def test_frames_do_not_alias_shared_memory(self):
+        self.store.write("SPY", [1, 2], {"Close": [10.0, 20.0]})
+        bars = self.agent.read_bar_store("SPY")
+        self.store.write("SPY", [2], {"Close": [21.0]})  # Revised in place after the read
+
+        self.assertEqual(bars["Close"].tolist(), [10.0, 20.0])
+        self.assertEqual(self.agent.read_bar_store("SPY")["Close"].tolist(), [10.0, 21.0])
+
+    def test_store_and_cache_give_the_same_window(self):
+        # ✅ ~100 days of bars: more than the 60-day window, like MarketDataAgent's year
+        dates = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=8, freq="9B", name="Date").as_unit("ns")
+        history = pd.DataFrame({column: np.arange(8, dtype=float) + i for i, column in enumerate(
+            ("Open", "High", "Low", "Close", "Volume"))}, index=dates)
+        self.store.write("SPY", dates.asi8, {column: history[column].to_numpy() for column in history})
+
+        def get_history(ticker, period=None, **request):  # The provider's period: calendar days back from now
+            return history[history.index >= period_start(period, pd.Timestamp.now().floor("s"))]
+
+        cached = StrategyAgent()
+        cached.market_data_cache.loader = get_history
+        from_store = self.agent.fetch_market_data("SPY")
+        self.assertLess(len(from_store), len(history))
+        pd.testing.assert_frame_equal(from_store, cached.fetch_market_data("SPY"), check_freq=False)
+        cached.market_data_cache.close()
+
+    def test_reattaches_when_market_data_agent_recreates_the_store(self):
+        self.store.write("SPY", [1], {"Close": [10.0]})
+        self.assertEqual(self.agent.read_bar_store("SPY")["Close"].tolist(), [10.0])
+
+        self.store.close()  # MarketDataAgent restarts with a fresh segment
+        self.store = SharedBarStore.create("ai_trading_bot_test_bars", ["SPY"], capacity=8)
+        self.store.write("SPY", [1, 2], {"Close": [11.0, 12.0]})
+        self.assertEqual(self.agent.read_bar_store("SPY")["Close"].tolist(), [11.0, 12.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import logging
+import os
+import sys
+import threading
+import time
+import unittest
+
+import zmq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.comm_framework import CommFramework
+from agents.execution_agent import ExecutionAgent
+from agents.risk_agent import RiskManagementAgent
+from agents.strategy_agent import StrategyAgent
+from tests.test_comm_framework import write_config
+
+PORTS = {
+    "StrategyAgent": {"publisher": 15771, "subscriber": 15772},
+    "RiskManagementAgent": {"publisher": 15773, "subscriber": 15774},
+    "ExecutionAgent": {"publisher": 15775, "subscriber": 15776},
+}
+
+
+class TestSignalFlow(unittest.TestCase):
+    """Signals published by StrategyAgent go through RiskManagementAgent; ExecutionAgent trades what it approves."""
+
+    def setUp(self):
+        self.config_path = write_config(PORTS, bus={"transport": "inproc"})
+        self.comm = CommFramework(self.config_path)
+        self.agents = [RiskManagementAgent(self.comm), ExecutionAgent(self.comm)]
+        for agent in self.agents:
+            threading.Thread(target=agent.run, daemon=True).start()
+
+        # ✅ What the agents publish in response: risk assessments and execution feedback
+        self.sink = self.comm.context.socket(zmq.SUB)
+        for name in ["RiskManagementAgent", "ExecutionAgent"]:
+            self.sink.connect(self.comm.endpoint(PORTS[name]["publisher"]))
+        self.sink.setsockopt(zmq.SUBSCRIBE, b"")
+        time.sleep(0.2)
+
+    def tearDown(self):
+        for agent in self.agents:
+            agent.stop()
+        self.sink.close()
+        self.comm.cleanup()
+        os.remove(self.config_path)
+
+    def responses(self, count, timeout=2.0):
+        received, deadline = [], time.monotonic() + timeout
+        while len(received) < count and self.sink.poll(max(0, deadline - time.monotonic()) * 1000):
+            received.append(self.comm.recv(self.sink))
+        return received
+
+    def test_only_signals_approved_by_risk_are_executed(self):
+        strategy = StrategyAgent(self.comm)
+        strategy.logger.setLevel(logging.ERROR)
+        strategy.predict_trade_signal = lambda ticker: {"SPY": "BUY", "QQQ": "SELL"}.get(ticker, "HOLD")
+        time.sleep(0.2)
+        strategy.publish_signals()
+
+        received = self.responses(4, timeout=1.0)  # ✅ Waits for a QQQ execution that must not come
+        risk = sorted((message["ticker"], message["risk_status"]) for message in received if "risk_status" in message)
+        executed = sorted((message["ticker"], message["action"]) for message in received if "action" in message)
+        self.assertEqual(risk, [("QQQ", "Rejected"), ("SPY", "Approved")])  # Short selling is not permitted
+        self.assertEqual(executed, [("SPY", "BUY")])
+        self.assertEqual(self.comm.get_metrics()["StrategyAgent"]["signal"]["published"], 2)
+
+    def test_legacy_single_frame_signals_are_still_received(self):
+        legacy = self.comm.context.socket(zmq.PUB)
+        legacy.bind(self.comm.endpoint(PORTS["RiskManagementAgent"]["subscriber"], bind=True))
+        time.sleep(0.2)
+        legacy.send_json({"ticker": "SPY", "signal": "BUY"})
+        self.comm.send(legacy, {"ticker": "SPY", "close": 1.0}, msg_type="bars", ticker="SPY")  # Filtered out
+
+        received = self.responses(3, timeout=1.0)
+        self.assertEqual([message["risk_status"] for message in received if "risk_status" in message], ["Approved"])
+        self.assertEqual([message["action"] for message in received if "action" in message], ["BUY"])
+        legacy.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
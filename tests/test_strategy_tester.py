@@ -0,0 +1,90 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from agents.strategy_agent import StrategyAgent
+from backtesting.strategy_tester import StrategyTester
+from utils.model_registry import ModelRegistry
+from utils.numpy_policy import export_policy
+
+
+class ReplayAgent(StrategyAgent):
+    """StrategyAgent whose "live" data is the backtest frame up to the row being evaluated."""
+
+    def __init__(self, data):
+        super().__init__()
+        self.logger.setLevel(logging.ERROR)
+        self.data = data
+        self.row = 0
+
+    def load_ppo_model(self, ticker):
+        return object()  # The rules only need a model to exist
+
+    def fetch_market_data(self, ticker):
+        return self.data.iloc[:self.row + 1]
+
+
+def swinging_bars(rows, seed):
+    """Daily bars with strong swings (RSI beyond 30/65 often), gaps over weekends and a flat stretch."""
+    rng = np.random.default_rng(seed)
+    steps = np.sin(np.arange(rows) / rng.uniform(5, 15)) * 0.02 + rng.normal(0.0005, 0.01, rows)
+    close = 100 * np.exp(np.cumsum(steps))
+    close[rows // 2:rows // 2 + 20] = close[rows // 2]
+    spread = close * rng.uniform(0, 0.02, rows)
+    return pd.DataFrame({"Open": close, "High": close + spread, "Low": close - spread, "Close": close},
+                        index=pd.bdate_range("2021-01-01", periods=rows, name="Date"))
+
+
+class TestStrategyTester(unittest.TestCase):
+    def test_batch_signals_match_row_by_row_evaluation(self):
+        for seed in range(4):
+            data = swinging_bars(320, seed)
+            replay = ReplayAgent(data)
+            expected = []
+            for replay.row in range(len(data)):
+                expected.append(replay.predict_trade_signal("SPY"))
+
+            agent = ReplayAgent(data)
+            signals = agent.trade_signals("SPY", data)
+            with self.subTest(seed=seed):
+                self.assertEqual(signals.tolist(), expected)
+                self.assertGreater(sum(signal != "HOLD" for signal in expected), 3)
+                self.assertEqual(agent.last_trade_day, replay.last_trade_day)
+
+    def test_cooldown_carries_over_from_earlier_trades(self):
+        data = swinging_bars(320, seed=1)
+        agent = ReplayAgent(data)
+        first = agent.trade_signals("SPY", data.iloc[:200])
+        trade_day = agent.last_trade_day["SPY"]
+        rest = agent.trade_signals("SPY", data)[200:]
+        blocked = data.index[200:] < trade_day + pd.Timedelta(days=10)
+        self.assertTrue((rest[blocked] == "HOLD").all())
+        self.assertGreater(sum(first != "HOLD"), 0)
+
+    def test_apply_strategy_batch_mode_with_policy_signals(self):
+        data = swinging_bars(120, seed=2)
+        root = tempfile.mkdtemp()
+        policy = export_policy(os.path.join(ROOT, "models", "SPY_ppo.zip"), os.path.join(root, "SPY_ppo.npz"))
+        tester = StrategyTester(policy=True)
+        tester.strategy_agent.logger.setLevel(logging.ERROR)
+        tester.strategy_agent.models = ModelRegistry(root=root, format="numpy")
+
+        result = tester.apply_strategy("SPY", data.copy())
+        self.assertEqual(set(result["Trade_Signal"]) - {"BUY", "SELL", "HOLD"}, set())
+        self.assertEqual(result["Policy_Signal"].iloc[:49].tolist(), ["HOLD"] * 49)  # No full window yet
+        values = data[["Open", "High", "Low"]].to_numpy()
+        expected = [{0: "BUY", 1: "SELL", 2: "HOLD"}[int(policy.predict(values[row - 49:row + 1])[0])]
+                    for row in range(49, len(data))]
+        self.assertEqual(result["Policy_Signal"].iloc[49:].tolist(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
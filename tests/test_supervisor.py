@@ -0,0 +1,141 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.supervisor import AgentSupervisor
+
+
+class FakeValue:
+    def __init__(self, typecode, value):
+        self.value = value
+
+
+class FakeEvent:
+    def __init__(self):
+        self.flag = False
+
+    def set(self):
+        self.flag = True
+
+    def is_set(self):
+        return self.flag
+
+
+class FakeProcess:
+    """Stands in for a spawned agent process: alive until terminated or crashed."""
+
+    pids = iter(range(1000, 2000))
+
+    def __init__(self, target=None, args=(), name=None):
+        self.name = name
+        self.pid = None
+        self.alive = False
+        self.exitcode = None
+        self.terminated = False
+
+    def start(self):
+        self.pid = next(FakeProcess.pids)
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def crash(self, code=1):
+        self.alive, self.exitcode = False, code
+
+    def terminate(self):
+        self.terminated = True
+        self.crash(-15)
+
+    def join(self, timeout=None):
+        pass
+
+
+class FakeContext:
+    Process = FakeProcess
+    Value = FakeValue
+    Event = FakeEvent
+
+
+SETTINGS = {
+    "heartbeat_timeout": 10,
+    "startup_timeout": 60,
+    "restart_backoff": {"initial": 1, "max": 4, "reset_after": 60},
+    "groups": {"pair": {"agents": ["A", "B", "Unknown"]}},
+}
+
+
+class TestAgentSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("agents.supervisor.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # ✅ Specs are only imported in the agents' own processes: these modules need not exist here
+        self.supervisor = AgentSupervisor({name: f"tests.missing_{name}:Agent" for name in "ABC"},
+                                          settings=SETTINGS)
+        self.supervisor.context = FakeContext()
+
+    def group(self, name):
+        return next(group for group in self.supervisor.groups if group.name == name)
+
+    def test_build_groups(self):
+        self.assertEqual([(group.name, group.agent_names) for group in self.supervisor.groups],
+                         [("pair", ["A", "B"]), ("C", ["C"])])
+
+        with mock.patch("agents.supervisor.psutil.cpu_count", return_value=2):
+            groups = self.supervisor.build_groups({"pair": {"agents": ["A", "B"], "cpus": [3]}}, pin_cpus="auto")
+        self.assertEqual([group.cpus for group in groups], [[3], [1]])
+
+    def test_crashed_group_restarts_with_exponential_backoff(self):
+        group = self.group("C")
+        self.supervisor.start_group(group)
+        delays = []
+        for _ in range(4):
+            group.process.crash()
+            self.supervisor.check_group(group)
+            delays.append(group.restart_at - self.now)
+
+            self.now = group.restart_at - 0.1
+            self.supervisor.check_group(group)
+            self.assertFalse(group.process.is_alive(), "Restarted before the backoff elapsed")
+            self.now = group.restart_at
+            self.supervisor.check_group(group)
+            self.assertTrue(group.process.is_alive())
+        self.assertEqual(delays, [1, 2, 4, 4])
+
+        self.now += 60  # Stable long enough: the backoff starts over
+        group.process.crash()
+        self.supervisor.check_group(group)
+        self.assertEqual(group.restart_at - self.now, 1)
+
+    def test_silent_group_is_terminated_after_heartbeat_timeout(self):
+        group = self.group("C")
+        self.supervisor.start_group(group)
+
+        self.now += 59  # No heartbeat yet: the startup allowance applies
+        self.supervisor.check_group(group)
+        self.assertFalse(group.process.terminated)
+
+        group.heartbeat.value = self.now
+        self.now += 10
+        self.supervisor.check_group(group)
+        self.assertFalse(group.process.terminated)
+
+        self.now += 0.5
+        self.supervisor.check_group(group)
+        self.assertTrue(group.process.terminated)
+        self.assertEqual(group.restart_at, self.now + 1)
+
+    def test_shutdown_asks_every_group_to_stop(self):
+        for group in self.supervisor.groups:
+            self.supervisor.start_group(group)
+        self.supervisor.shutdown(timeout=0)
+        self.assertTrue(all(group.stop_event.is_set() for group in self.supervisor.groups))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.tracing import LatencyHistogram, Tracer, segments
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_relative_error(self):
+        values = np.random.default_rng(0).lognormal(mean=11, sigma=1.5, size=100_000).astype(int)
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for percent in [50, 99, 99.9]:
+            expected = np.percentile(values, percent, method="inverted_cdf")
+            self.assertLess(abs(histogram.percentile(percent) - expected) / expected, 0.01)
+        self.assertEqual(histogram.percentile(100), values.max())
+
+
+class TestTracer(unittest.TestCase):
+    def test_segments_per_hop_and_end_to_end(self):
+        hops = [["MarketDataAgent", "send", 0], ["StrategyAgent", "recv", 100],
+                ["StrategyAgent", "send", 350], ["RiskManagementAgent", "recv", 400]]
+        self.assertEqual(list(segments(hops)), [
+            ("StrategyAgent", "MarketDataAgent -> StrategyAgent", 100),
+            ("StrategyAgent", "end_to_end MarketDataAgent -> StrategyAgent", 100),
+            ("StrategyAgent", "StrategyAgent processing", 250),
+            ("RiskManagementAgent", "StrategyAgent -> RiskManagementAgent", 50),
+            ("RiskManagementAgent", "end_to_end MarketDataAgent -> RiskManagementAgent", 400),
+        ])
+
+    def test_handled_message_continues_the_trace(self):
+        tracer = Tracer()
+        bar = tracer.outgoing("MarketDataAgent")
+        tracer.incoming("StrategyAgent", bar)
+        signal = tracer.outgoing("StrategyAgent")
+        tracer.clear()
+
+        self.assertEqual(signal["id"], bar["id"])
+        self.assertEqual([hop[:2] for hop in signal["hops"]],
+                         [["MarketDataAgent", "send"], ["StrategyAgent", "recv"], ["StrategyAgent", "send"]])
+        self.assertNotEqual(tracer.outgoing("StrategyAgent")["id"], bar["id"])
+        self.assertIn("StrategyAgent processing", tracer.histograms)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Concurrent downloads for many tickers. Tickers are fetched by a bounded
+# thread pool; every request to a host first takes a token from that host's
+# bucket (shared by all fetchers in the process), and failed requests are
+# retried after an exponential backoff with full jitter. A refresh of N
+# tickers therefore takes about N / rate seconds instead of N round trips
+# plus fixed pauses between tickers.
+
+YAHOO_HOST = "query2.finance.yahoo.com"
+
+
+class RateLimiter:
+    """Token bucket: `rate` requests per second on average, at most `burst` back to back."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent; return the seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def host_limiter(host, rate, burst=1):
+    """The process-wide limiter of a host (created with `rate` and `burst` on first use)."""
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter(rate, burst)
+        return _limiters[host]
+
+
+def backoff_delay(attempt, backoff, cap=60.0):
+    """Full jitter: uniform in [0, backoff * 2^attempt], capped."""
+    return random.uniform(0, min(cap, backoff * 2 ** attempt))
+
+
+class ThrottledFetcher:
+    """Wraps fetcher(ticker, start, end, interval) with a per-host rate limit and retries."""
+
+    def __init__(self, fetcher, host=YAHOO_HOST, rate=2.0, burst=4, retries=3, backoff=1.0, logger=None):
+        self.fetcher = fetcher
+        self.host = host
+        self.limiter = host_limiter(host, rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.logger = logger or logging.getLogger("ThrottledFetcher")
+
+    def __call__(self, ticker, start, end, interval):
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                return self.fetcher(ticker, start, end, interval)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = backoff_delay(attempt, self.backoff)
+                self.logger.warning(f"⚠️ {self.host}: {ticker} failed ({e}), retry {attempt + 1}/{self.retries} "
+                                    f"in {delay:.1f}s")
+                time.sleep(delay)
+
+
+def fetch_many(get, tickers, max_workers=4, **request):
+    """{ticker: get(ticker, **request)} for every ticker, at most `max_workers` at a time, in ticker order."""
+    tickers = list(dict.fromkeys(tickers))
+    if len(tickers) <= 1 or max_workers <= 1:
+        return {ticker: get(ticker, **request) for ticker in tickers}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers)), thread_name_prefix="fetch") as pool:
+        futures = {ticker: pool.submit(get, ticker, **request) for ticker in tickers}
+        return {ticker: future.result() for ticker, future in futures.items()}
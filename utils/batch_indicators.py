@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+# StrategyAgent.calculate_indicators for a whole universe at once: inputs are
+# aligned (time x ticker) float64 matrices of High, Low and Close, outputs the
+# same indicators as (time x ticker) matrices. Column n equals the pandas
+# implementation applied to ticker n's own bars. Leading NaN rows mean "not
+# listed yet" and stay NaN in every output; gaps after the first bar must be
+# filled before (align() forward-fills them).
+#
+# Rolling means come from cumulative sums (one pass whatever the window),
+# EMAs from one recurrence step per row across all tickers, and every output
+# and intermediate lives in buffers allocated once per shape. With fewer
+# than NARROW tickers (e.g. one ticker over a long backtest) the EMAs use
+# pandas' per-column loop instead of the per-row recurrence.
+
+NARROW = 32
+
+
+class BatchIndicators:
+    """Preallocated indicator computation for `rows` x `tickers` price matrices."""
+
+    def __init__(self, rows, tickers, sma_windows=(50, 200), rsi_period=14, atr_period=14, macd=(12, 26, 9)):
+        self.shape = (rows, tickers)
+        self.sma_windows = tuple(sma_windows)
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.macd = tuple(macd)
+        names = [f"SMA_{window}" for window in self.sma_windows] + ["RSI", "ATR", "MACD", "MACD_signal"]
+        self.out = {name: np.empty(self.shape) for name in names}
+
+        self._sums = np.empty((rows + 1, tickers))  # Cumulative sums, leading zero row
+        self._nonzero = np.empty((rows + 1, tickers))  # Cumulative counts of non-zero values
+        self._seen = np.empty(self.shape, dtype=np.int64)  # Bars of the ticker up to each row (<= 0: not listed)
+        self._unlisted = np.empty(self.shape, dtype=bool)
+        self._mask = np.empty(self.shape, dtype=bool)
+        self._masked = np.empty(self.shape)
+        self._a, self._b, self._c = np.empty(self.shape), np.empty(self.shape), np.empty(self.shape)
+
+    def compute(self, high, low, close):
+        """{name: (rows x tickers) array}; the arrays are reused by the next call."""
+        if close.shape != self.shape or high.shape != self.shape or low.shape != self.shape:
+            raise ValueError(f"Expected {self.shape} matrices, got {high.shape}, {low.shape}, {close.shape}")
+        rows, _ = self.shape
+        unlisted = np.isnan(close, out=self._unlisted)
+        first = np.where(unlisted.all(axis=0), rows, unlisted.argmin(axis=0))
+        np.subtract(np.arange(1, rows + 1)[:, None], first[None, :], out=self._seen)
+        seen, out = self._seen, self.out
+
+        for window in self.sma_windows:
+            self._rolling_mean(close, window, out[f"SMA_{window}"])
+
+        # ✅ RSI: gains/losses of close-to-close changes; the first change of a ticker counts as 0
+        change, gain, loss = self._a, self._b, self._c
+        change[0] = np.nan
+        np.subtract(close[1:], close[:-1], out=change[1:])
+        np.copyto(gain, 0.0)
+        np.copyto(gain, change, where=change > 0)
+        np.copyto(loss, 0.0)
+        np.negative(change, out=loss, where=change < 0)
+        rsi = out["RSI"]
+        self._rolling_mean(gain, self.rsi_period, rsi)
+        self._rolling_mean(loss, self.rsi_period, loss, exact_zero=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(rsi, loss, out=rsi)  # rs; a zero average loss leaves it undefined (inf/nan)
+            np.add(rsi, 1.0, out=rsi)
+            np.divide(100.0, rsi, out=rsi)
+            np.subtract(100.0, rsi, out=rsi)
+        np.copyto(rsi, 50.0, where=~np.isfinite(rsi) | (loss == 0))  # ✅ Neutral while undefined
+
+        # ✅ ATR: true range without materializing the three candidates side by side
+        true_range, other = self._a, self._b
+        np.subtract(high, low, out=true_range)
+        other[0] = np.nan
+        np.subtract(high[1:], close[:-1], out=other[1:])
+        np.abs(other, out=other)
+        np.fmax(true_range, other, out=true_range)
+        np.subtract(low[1:], close[:-1], out=other[1:])
+        np.abs(other, out=other)
+        np.fmax(true_range, other, out=true_range)
+        self._rolling_mean(true_range, self.atr_period, out["ATR"])
+
+        fast, slow, signal = self.macd
+        macd, macd_signal = out["MACD"], out["MACD_signal"]
+        self._ema(close, fast, self._a)
+        self._ema(close, slow, self._b)
+        np.subtract(self._a, self._b, out=macd)
+        self._ema(macd, signal, macd_signal)
+        short = first > rows - slow  # ✅ Fewer than `slow` bars: calculate_macd returns zeros
+        macd[:, short] = 0.0
+        macd_signal[:, short] = 0.0
+
+        for values in out.values():
+            np.copyto(values, np.nan, where=seen <= 0)
+        return out
+
+    def _rolling_mean(self, values, window, result, exact_zero=False):
+        """Mean of the last `window` values per ticker (NaN until the ticker has `window` bars).
+
+        `result` may be `values`. With exact_zero, windows holding only zeros give exactly 0
+        (a difference of cumulative sums can leave rounding noise there).
+        """
+        rows = self.shape[0]
+        masked, sums, counts = self._masked, self._sums, self._nonzero
+        np.copyto(masked, values)
+        np.copyto(masked, 0.0, where=self._unlisted)
+        sums[0] = 0.0
+        np.cumsum(masked, axis=0, out=sums[1:])
+        if exact_zero:
+            counts[0] = 0.0
+            np.not_equal(masked, 0.0, out=self._mask)
+            np.cumsum(self._mask, axis=0, out=counts[1:])
+
+        if window <= rows:
+            np.subtract(sums[window:], sums[:-window], out=result[window - 1:])
+            if exact_zero:
+                np.subtract(counts[window:], counts[:-window], out=counts[:rows + 1 - window])
+                np.copyto(result[window - 1:], 0.0, where=counts[:rows + 1 - window] == 0)
+            result /= window
+        np.copyto(result, np.nan, where=self._seen < window)
+
+    def _ema(self, values, span, result):
+        """pandas ewm(span, adjust=False).mean() per ticker, started at each ticker's first bar."""
+        if self.shape[1] < NARROW:
+            # ✅ Few tickers: one C loop per ticker beats one Python step per row
+            np.copyto(self._masked, values)
+            np.copyto(self._masked, np.nan, where=self._unlisted)  # ewm starts at the first non-NaN bar
+            np.copyto(result, pd.DataFrame(self._masked, copy=False).ewm(span=span, adjust=False).mean().to_numpy())
+            return
+        alpha = 2.0 / (span + 1)
+        result[0] = values[0]
+        for row in range(1, self.shape[0]):
+            previous, current = result[row - 1], result[row]
+            np.subtract(values[row], previous, out=current)
+            current *= alpha
+            current += previous
+            np.copyto(current, values[row], where=self._seen[row] == 1)  # ✅ First bar of a ticker
+
+
+def compute_indicators(high, low, close, **params):
+    """Indicators of (time x ticker) matrices in one pass; see BatchIndicators for the parameters."""
+    close = np.asarray(close, dtype=np.float64)
+    return BatchIndicators(*close.shape, **params).compute(np.asarray(high, dtype=np.float64),
+                                                           np.asarray(low, dtype=np.float64), close)
+
+
+def align(frames, columns=("High", "Low", "Close")):
+    """Stack {ticker: bar frame} into (index, tickers, {column: time x ticker matrix}).
+
+    Rows are the union of all dates. Before a ticker's first bar values stay NaN;
+    later gaps are forward-filled.
+    """
+    tickers = list(frames)
+    index = frames[tickers[0]].index
+    for frame in frames.values():
+        if not frame.index.equals(index):
+            index = index.union(frame.index)
+    stacked = np.full((len(columns), len(index), len(tickers)), np.nan)
+    for j, ticker in enumerate(tickers):
+        frame = frames[ticker]
+        rows = slice(None) if frame.index.equals(index) else index.get_indexer(frame.index)
+        for i, column in enumerate(columns):
+            stacked[i, rows, j] = frame[column].to_numpy(dtype=np.float64)
+
+    # ✅ Forward-fill: each row takes the last row with a value (leading rows keep their NaN)
+    filled = np.where(np.isnan(stacked), 0, np.arange(len(index))[None, :, None])
+    np.maximum.accumulate(filled, axis=1, out=filled)
+    stacked = np.take_along_axis(stacked, filled, axis=1)
+    return index, tickers, dict(zip(columns, stacked))
@@ -0,0 +1,174 @@
+import logging
+
+import numpy as np
+
+from utils.numpy_policy import NumpyPolicy, StackedNumpyPolicies
+
+ACTION_SIGNALS = {0: "BUY", 1: "SELL", 2: "HOLD"}
+
+# Deterministic PPO actions for many tickers at once. Observations are
+# grouped by model: tickers sharing a model object get one predict() over
+# their stacked observations. Distinct torch policies with the same
+# architecture (class, spaces, parameter names and shapes) are evaluated
+# together: their parameters are stacked once per group and a single
+# vmapped forward pass computes every ticker's action logits. The stacked
+# parameters are rebuilt only when a model of the group changes (e.g. the
+# registry reloaded a retrained file). Exported NumpyPolicies are stacked
+# the same way without torch. Models that cannot be stacked fall back to
+# one predict() per model, and so does a group whose stacked pass fails: a
+# model whose predict() fails only leaves its own tickers out.
+
+
+def architecture(model):
+    """Key shared by policies that can be stacked (None for models without a discrete torch policy)."""
+    if isinstance(model, NumpyPolicy):
+        return model.architecture()
+    policy = getattr(model, "policy", None)
+    if policy is None or not hasattr(policy, "action_net") or not hasattr(model.action_space, "n"):
+        return None
+    shapes = tuple((name, tuple(tensor.shape), str(tensor.dtype)) for name, tensor in policy.state_dict().items())
+    return type(policy).__name__, tuple(model.observation_space.shape), int(model.action_space.n), shapes
+
+
+def actor_logits(policy):
+    """torch module computing the action logits of an ActorCriticPolicy (the actor half of its forward pass)."""
+    import torch as th
+    from stable_baselines3.common.preprocessing import preprocess_obs
+
+    class ActorLogits(th.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.features_extractor = policy.pi_features_extractor
+            self.mlp_extractor = policy.mlp_extractor
+            self.action_net = policy.action_net
+
+        def forward(self, obs):
+            obs = preprocess_obs(obs, policy.observation_space, normalize_images=policy.normalize_images)
+            return self.action_net(self.mlp_extractor.forward_actor(self.features_extractor(obs)))
+
+    return ActorLogits()
+
+
+def deterministic_actions(logits):
+    """argmax of the action probabilities, like CategoricalDistribution.mode()."""
+    import torch as th
+    return th.distributions.Categorical(logits=logits).probs.argmax(dim=-1)
+
+
+def window_actions(model, values, lookback=50):
+    """Deterministic action for every row of `values` (rows x features) from its trailing `lookback` rows,
+    in one predict() call over the sliding windows; -1 for rows before the first full window."""
+    actions = np.full(len(values), -1, dtype=np.int64)
+    if len(values) < lookback:
+        return actions
+    windows = np.lib.stride_tricks.sliding_window_view(np.asarray(values), lookback, axis=0)
+    predicted, _ = model.predict(np.ascontiguousarray(windows.transpose(0, 2, 1)), deterministic=True)
+    actions[lookback - 1:] = np.asarray(predicted).reshape(-1)
+    return actions
+
+
+class StackedPolicies:
+    """Policies of identical architecture evaluated in one vmapped forward pass."""
+
+    def __init__(self, models):
+        import copy
+
+        from torch.func import functional_call, stack_module_state, vmap
+
+        self.models = tuple(models)
+        modules = [actor_logits(model.policy) for model in self.models]
+        self.device = next(self.models[0].policy.parameters()).device
+        self.params, self.buffers = stack_module_state(modules)
+        base = copy.deepcopy(modules[0]).to("meta")  # ✅ Structure only: the weights come from self.params
+
+        def logits(params, buffers, obs):
+            return functional_call(base, (params, buffers), (obs,))
+
+        self.forward = vmap(logits)
+
+    def matches(self, models):
+        return len(models) == len(self.models) and all(a is b for a, b in zip(models, self.models))
+
+    def predict(self, observations):
+        """Actions for a (policies, batch, *obs_shape) array, as a (policies, batch) int array."""
+        import torch as th
+        with th.no_grad():
+            obs = th.as_tensor(observations, device=self.device)
+            return deterministic_actions(self.forward(self.params, self.buffers, obs)).cpu().numpy()
+
+
+class BatchedInference:
+    """Deterministic actions for {ticker: observation} with one forward pass per model or policy group."""
+
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger("BatchedInference")
+        self.architectures = {}  # id(model) -> (model, architecture key)
+        self.groups = {}  # architecture key -> StackedPolicies (False when stacking is unavailable)
+
+    def architecture(self, model):
+        cached = self.architectures.get(id(model))
+        if cached is None or cached[0] is not model:
+            cached = self.architectures[id(model)] = (model, architecture(model))
+        return cached[1]
+
+    def predict(self, models, observations):
+        """{ticker: action} for `models` {ticker: model} and `observations` {ticker: array}.
+
+        Tickers without a model, or whose model failed to predict, are left out.
+        """
+        by_model = {}  # id(model) -> (model, [tickers])
+        for ticker, obs in observations.items():
+            model = models.get(ticker)
+            if model is not None:
+                by_model.setdefault(id(model), (model, []))[1].append(ticker)
+        self.architectures = {key: value for key, value in self.architectures.items() if key in by_model}
+
+        by_architecture = {}
+        for model, tickers in by_model.values():
+            by_architecture.setdefault(self.architecture(model), []).append((model, tickers))
+
+        actions = {}
+        for key, members in by_architecture.items():
+            if key is not None and len(members) > 1:
+                stacked = self.stacked(key, [model for model, _ in members])
+                if stacked is not None:
+                    try:
+                        actions.update(self.predict_stacked(stacked, members, observations))
+                        continue
+                    except Exception as e:
+                        self.logger.error(f"❌ Stacked prediction of {len(members)} policies failed, "
+                                          f"predicting one model at a time: {e}")
+            for model, tickers in members:  # ✅ One call per model, however many tickers share it
+                try:
+                    batch = np.stack([observations[ticker] for ticker in tickers])
+                    predicted, _ = model.predict(batch, deterministic=True)
+                    actions.update(zip(tickers, np.asarray(predicted).reshape(len(tickers)).tolist()))
+                except Exception as e:
+                    self.logger.error(f"❌ Error predicting {', '.join(tickers)}: {e}")
+        return actions
+
+    def stacked(self, key, models):
+        group = self.groups.get(key)
+        if group is False:
+            return None
+        if group is None or not group.matches(models):
+            try:
+                stack = StackedNumpyPolicies if isinstance(models[0], NumpyPolicy) else StackedPolicies
+                group = self.groups[key] = stack(models)
+            except Exception as e:  # e.g. torch without torch.func
+                self.logger.warning(f"⚠️ Cannot stack {len(models)} policies, predicting one model at a time: {e}")
+                self.groups[key] = False
+                return None
+        return group
+
+    def predict_stacked(self, stacked, members, observations):
+        """One forward pass for every (model, tickers) of a group; shorter batches are padded."""
+        width = max(len(tickers) for _, tickers in members)
+        first = observations[members[0][1][0]]
+        batch = np.zeros((len(members), width) + np.shape(first), dtype=np.float32)
+        for i, (_, tickers) in enumerate(members):
+            for j, ticker in enumerate(tickers):
+                batch[i, j] = observations[ticker]
+        predicted = stacked.predict(batch)
+        return {ticker: int(predicted[i, j]) for i, (_, tickers) in enumerate(members)
+                for j, ticker in enumerate(tickers)}
@@ -0,0 +1,134 @@
+import logging
+import os
+import re
+
+import pandas as pd
+import yaml
+
+from utils.batch_fetch import ThrottledFetcher
+from utils.history_store import COLUMNS, HistoryStore, adjust, download_yfinance, period_start
+
+# Where historical bars come from, selected by `market_data.provider` in
+# config.yml. Every provider answers get(ticker, start, end, period,
+# interval, auto_adjust) like yf.download with flat columns:
+#   yfinance  downloads through the history store (only missing ranges)
+#   store     offline: whatever the history store already holds, no network
+#   csv       offline: bars from a CSV file, fully deterministic
+# and get_many(tickers, ...) with the same arguments, returning {ticker: bars}.
+
+
+class CsvProvider:
+    """Daily bars from a CSV file, loaded once.
+
+    Accepts the layouts in data/datasets: long (Date, Ticker, OHLCV columns;
+    ";"-separated files use day-first dates) and wide (<Field>_<TICKER>
+    columns). Periods are counted back from the file's last bar, so the same
+    request returns the same bars on every run.
+    """
+
+    name = "csv"
+
+    def __init__(self, path, logger=None):
+        self.path = path
+        self.logger = logger or logging.getLogger("CsvProvider")
+        self.frames = None
+
+    def load(self):
+        with open(self.path, "r", encoding="utf-8") as file:
+            header = file.readline()
+        sep = ";" if header.count(";") > header.count(",") else ","
+        data = pd.read_csv(self.path, sep=sep)
+        date_column = next(column for column in data.columns if column.lower() in ("date", "datetime"))
+        data.index = pd.DatetimeIndex(pd.to_datetime(data.pop(date_column), dayfirst=sep == ";", errors="coerce"),
+                                      name="Date")
+
+        wide = [re.fullmatch(rf"({'|'.join(COLUMNS)})_(.+)", column) for column in data.columns]
+        if any(wide):
+            tables = {}
+            for match in filter(None, wide):
+                tables.setdefault(match.group(2), {})[match.group(1)] = data[match.group(0)]
+            tables = {ticker: pd.DataFrame(columns) for ticker, columns in tables.items()}
+        else:
+            tables = {ticker: group.drop(columns="Ticker") for ticker, group in data.groupby("Ticker")}
+
+        self.frames = {}
+        for ticker, frame in tables.items():
+            frame = frame[[column for column in COLUMNS if column in frame.columns]].apply(pd.to_numeric,
+                                                                                           errors="coerce")
+            valid = frame["Close"].notna() & frame.index.notna()
+            if not valid.all():
+                self.logger.warning(f"⚠️ {self.path}: skipped {int((~valid).sum())} unreadable row(s) for {ticker}")
+            frame = frame[valid]
+            self.frames[str(ticker)] = frame[~frame.index.duplicated(keep="last")].sort_index()
+        self.logger.info(f"📂 Loaded {len(self.frames)} ticker(s) from {self.path}")
+
+    def get(self, ticker, start=None, end=None, period=None, interval="1d", auto_adjust=False):
+        if interval != "1d":
+            raise ValueError(f"{self.path} only holds daily bars (requested {interval})")
+        if self.frames is None:
+            self.load()
+        data = self.frames.get(ticker)
+        if data is None or data.empty:
+            self.logger.warning(f"⚠️ No bars for {ticker} in {self.path}")
+            return pd.DataFrame(columns=list(COLUMNS[:4]) + ["Volume"])
+
+        last = data.index[-1] + pd.Timedelta(days=1)  # ✅ The file's last bar plays "now"
+        first = pd.Timestamp(start) if start is not None else period_start(period or "1mo", last)
+        keep = data.index >= first
+        if end is not None:
+            keep &= data.index < pd.Timestamp(end)
+        data = data[keep].copy()
+        return adjust(data) if auto_adjust else data
+
+    def get_many(self, tickers, start=None, end=None, period=None, interval="1d", auto_adjust=False):
+        return {ticker: self.get(ticker, start=start, end=end, period=period, interval=interval,
+                                 auto_adjust=auto_adjust) for ticker in dict.fromkeys(tickers)}
+
+
+def create_provider(config_path="config/config.yml"):
+    """Provider selected by `market_data.provider` (history store options from `history_store`,
+    download limits from `market_data.download`)."""
+    settings = {}
+    if os.path.exists(config_path):
+        with open(config_path, "r") as file:
+            settings = yaml.safe_load(file) or {}
+    market_data = settings.get("market_data") or {}
+    store = settings.get("history_store") or {}
+    root, ttl = store.get("root", "data/store"), store.get("ttl", 900)
+
+    download = market_data.get("download") or {}
+    max_workers = download.get("max_workers", 4)
+
+    provider = market_data.get("provider", "yfinance")
+    if provider == "yfinance":
+        fetcher = ThrottledFetcher(download_yfinance, rate=download.get("rate", 2.0), burst=download.get("burst", 4),
+                                   retries=download.get("retries", 3), backoff=download.get("backoff", 1.0))
+        return HistoryStore(root=root, ttl=ttl, fetcher=fetcher, max_workers=max_workers)
+    if provider == "store":
+        return HistoryStore(root=root, ttl=ttl, fetcher=None, max_workers=max_workers)
+    if provider == "csv":
+        return CsvProvider(market_data.get("csv", "data/datasets/processed_etf_data.csv"))
+    raise ValueError(f"Unknown market data provider '{provider}'. Available: ['yfinance', 'store', 'csv']")
+
+
+_provider = None
+
+
+def get_provider():
+    """The configured provider, created on first use."""
+    global _provider
+    if _provider is None:
+        _provider = create_provider()
+    return _provider
+
+
+def get_history(ticker, start=None, end=None, period=None, interval="1d", auto_adjust=False):
+    """Bars for a ticker from the configured provider, like yf.download(ticker, ...) with flat columns."""
+    return get_provider().get(ticker, start=start, end=end, period=period, interval=interval,
+                              auto_adjust=auto_adjust)
+
+
+def get_histories(tickers, start=None, end=None, period=None, interval="1d", auto_adjust=False):
+    """{ticker: bars} for many tickers at once (concurrent, rate-limited downloads)."""
+    return get_provider().get_many(tickers, start=start, end=end, period=period, interval=interval,
+                                   auto_adjust=auto_adjust)
@@ -1,13 +1,14 @@
-import yfinance as yf
 import pandas as pd
 import logging
 
+from utils.data_providers import get_history
+
 logging.basicConfig(level=logging.INFO)
 
 def fetch_historical_data(ticker, period="60d", interval="1h"):
     """Fetches historical stock data."""
     try:
-        df = yf.download(ticker, period=period, interval=interval, auto_adjust=True)
+        df = get_history(ticker, period=period, interval=interval, auto_adjust=True)
         if df.empty:
             logging.error(f"❌ No data received for {ticker}")
             return None
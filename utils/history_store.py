@@ -0,0 +1,316 @@
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from utils.batch_fetch import fetch_many
+
+# On-disk columnar store of historical bars, behind the "yfinance" and
+# "store" market data providers (see utils/data_providers.py):
+#
+#   <root>/<interval>/<TICKER>/meta.json         current version, columns, timezone, covered ranges
+#   <root>/<interval>/<TICKER>/v<N>/<column>.npy one array per column ("Date" as int64 ns)
+#
+# Bars are stored unadjusted with their "Adj Close"; auto_adjust=True reads
+# derive adjusted prices the way yfinance does. A request only downloads the
+# parts of its date range that no earlier request covered (and the recent
+# end again once it is older than `ttl`). Every download overlaps at least
+# one bar that was final when stored: when Yahoo's value for it changed, its
+# history was re-based (split, dividend) and the whole range is downloaded
+# again instead of mixing bases. Writers fill a new version directory and
+# then swap meta.json atomically, so readers in other processes never see a
+# half-written ticker.
+
+COLUMNS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+INTRADAY = re.compile(r"^\d+(m|h)$")
+PERIODS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+EPOCH = pd.Timestamp("1970-01-02")
+
+
+def period_start(period, now):
+    """Start of a yfinance-style period ("60d", "1mo", "5y", "ytd", "max") ending at `now`."""
+    if period == "max":
+        return EPOCH
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        raise ValueError(f"Unsupported period '{period}'")
+    return now - pd.DateOffset(**{PERIODS[match.group(2)]: int(match.group(1))})
+
+
+def subtract_ranges(start, end, covered):
+    """Parts of [start, end) not inside any of the `covered` [start, end) ranges (all int ns)."""
+    missing, cursor = [], start
+    for low, high in sorted(covered):
+        if high <= cursor:
+            continue
+        if low >= end:
+            break
+        if low > cursor:
+            missing.append((cursor, low))
+        cursor = max(cursor, high)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def merge_ranges(ranges):
+    merged = []
+    for low, high in sorted(ranges):
+        if merged and low <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return merged
+
+
+def exchange_stamps(index):
+    """ns timestamps of a bar index in exchange time (the naive clock start/end ranges use)."""
+    return (index.tz_localize(None) if index.tz is not None else index).as_unit("ns").asi8
+
+
+def rebased(stored, fetched, settled):
+    """True when bars stored before `settled` (final when downloaded) now have other prices:
+    the provider adjusted its history since (split, dividend)."""
+    columns = [column for column in ("Close", "Adj Close") if column in stored.columns and column in fetched.columns]
+    if not columns or fetched.empty:
+        return False
+    old = stored[columns].set_axis(exchange_stamps(stored.index))
+    new = fetched[columns].set_axis(exchange_stamps(fetched.index))
+    common = old.index.intersection(new.index)
+    common = common[common < settled]
+    if common.empty:
+        return False
+    return not np.allclose(old.loc[common].to_numpy(dtype=np.float64), new.loc[common].to_numpy(dtype=np.float64),
+                           rtol=1e-4, equal_nan=True)
+
+
+def download_yfinance(ticker, start, end, interval):
+    """Unadjusted bars for [start, end) from Yahoo Finance, with flat columns.
+
+    Network errors and rate limits raise (ThrottledFetcher retries them); a
+    range Yahoo has no bars for comes back empty.
+    """
+    import yfinance as yf  # ✅ Deferred: reads served from disk never import it
+    from yfinance.exceptions import YFPricesMissingError
+    try:
+        # ✅ Ticker.history, not yf.download: download shares module-level state between calls
+        # and must not run from several threads at once
+        data = yf.Ticker(ticker).history(start=start, end=end, interval=interval, auto_adjust=False,
+                                         actions=False, raise_errors=True)
+    except YFPricesMissingError:
+        data = None
+    if data is None or data.empty:
+        return pd.DataFrame(columns=list(COLUMNS))
+    if not INTRADAY.match(interval) and data.index.tz is not None:
+        data.index = data.index.tz_localize(None)  # ✅ Daily bars on exchange dates, like yf.download
+    return data[[column for column in COLUMNS if column in data.columns]]
+
+
+class HistoryStore:
+    """Historical bars per (ticker, interval), downloaded once and read back from memory-mapped .npy files."""
+
+    def __init__(self, root="data/store", ttl=900, fetcher=download_yfinance, max_workers=4, logger=None):
+        self.root = root
+        self.ttl = ttl  # Seconds before the recent end of a range is downloaded again
+        self.fetcher = fetcher  # None: offline, serve stored bars only
+        self.max_workers = max_workers  # Tickers refreshed concurrently by get_many
+        self.logger = logger or logging.getLogger("HistoryStore")
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_path="config/config.yml", **kwargs):
+        """Store configured by the `history_store` section of config.yml."""
+        settings = {}
+        if os.path.exists(config_path):
+            with open(config_path, "r") as file:
+                settings = (yaml.safe_load(file) or {}).get("history_store") or {}
+        return cls(root=settings.get("root", "data/store"), ttl=settings.get("ttl", 900), **kwargs)
+
+    def _dir(self, ticker, interval):
+        return os.path.join(self.root, interval, ticker.replace("/", "_"))
+
+    def _lock(self, ticker, interval):
+        with self.lock:
+            return self.locks.setdefault((ticker, interval), threading.Lock())
+
+    def _meta(self, directory):
+        try:
+            with open(os.path.join(directory, "meta.json"), "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load(self, ticker, interval="1d"):
+        """Every stored bar of a ticker (unadjusted), or None if nothing is stored."""
+        directory = self._dir(ticker, interval)
+        for _ in range(3):
+            meta = self._meta(directory)
+            if not meta or not meta.get("rows"):
+                return None
+            version = os.path.join(directory, f"v{meta['version']}")
+            try:
+                columns = {column: np.load(os.path.join(version, f"{column}.npy"), mmap_mode="r")
+                           for column in ["Date"] + meta["columns"]}
+                break
+            except FileNotFoundError:
+                continue  # ✅ Replaced by another writer meanwhile: read the new version
+        else:
+            return None
+        index = pd.DatetimeIndex(columns.pop("Date").astype("datetime64[ns]"))
+        if meta.get("tz"):
+            index = index.tz_localize("UTC").tz_convert(meta["tz"])
+        index.name = "Datetime" if INTRADAY.match(interval) else "Date"
+        return pd.DataFrame({column: np.asarray(values) for column, values in columns.items()}, index=index)
+
+    def _save(self, ticker, interval, data, covered, fetched_at):
+        directory = self._dir(ticker, interval)
+        version = max(fetched_at, ((self._meta(directory) or {}).get("version", 0)) + 1)
+        target = os.path.join(directory, f"v{version}")
+        os.makedirs(target, exist_ok=True)
+
+        index = data.index
+        tz = str(index.tz) if index.tz is not None else None
+        stamps = (index.tz_convert("UTC").tz_localize(None) if tz else index).as_unit("ns").asi8
+        np.save(os.path.join(target, "Date.npy"), stamps)
+        columns = [column for column in data.columns if column in COLUMNS]
+        for column in columns:
+            np.save(os.path.join(target, f"{column}.npy"), data[column].to_numpy(dtype=np.float64))
+
+        new_meta = {"version": version, "columns": columns, "tz": tz, "rows": len(data),
+                    "covered": merge_ranges(covered), "fetched_at": fetched_at}  # fetched_at: naive local ns
+        temporary = os.path.join(directory, f"meta.json.{os.getpid()}")
+        with open(temporary, "w") as file:
+            json.dump(new_meta, file)
+        os.replace(temporary, os.path.join(directory, "meta.json"))  # ✅ Readers switch versions here
+
+        for name in os.listdir(directory):
+            # ✅ Only older versions: a concurrent writer in another process may be filling a newer one
+            if name.startswith("v") and name[1:].isdigit() and int(name[1:]) < version:
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+    def _range(self, start, end, period, now):
+        end = pd.Timestamp(end) if end is not None else now
+        if start is not None:
+            start = pd.Timestamp(start)
+        else:
+            start = period_start(period or "1mo", end)
+        for value in (start, end):
+            if value.tz is not None:
+                raise ValueError("Pass start/end as naive dates (exchange calendar, like yfinance)")
+        return start, end
+
+    def refresh(self, ticker, start=None, end=None, period=None, interval="1d"):
+        """Download the parts of the range the store does not cover yet; return the number of bars fetched."""
+        if self.fetcher is None:
+            return 0
+        now = pd.Timestamp.now().floor("s")
+        start, end = self._range(start, end, period, now)
+        start_ns, end_ns = start.value, min(end, now).value
+
+        with self._lock(ticker, interval):
+            meta = self._meta(self._dir(ticker, interval)) or {}
+            covered = [tuple(r) for r in meta.get("covered", [])]
+            fetched_at = meta.get("fetched_at", 0)
+            intraday = bool(INTRADAY.match(interval))
+            if covered and now.value - fetched_at >= self.ttl * 1e9:
+                # ✅ Bars up to the last download may have been partial or revised since: expire that end
+                lookback = pd.Timedelta(days=1 if intraday else 4).value
+                cutoff = fetched_at - lookback
+                covered = [(low, min(high, cutoff) if high >= fetched_at else high) for low, high in covered]
+                covered = [(low, high) for low, high in covered if high > low]
+
+            missing = subtract_ranges(start_ns, end_ns, covered)
+            if not missing:
+                return 0
+
+            stored = self.load(ticker, interval)
+            # ✅ Bars this long before the last download were complete then: their prices only change on re-basing
+            settled = fetched_at - pd.Timedelta(days=1 if intraday else 2).value
+            final = exchange_stamps(stored.index) if stored is not None else np.empty(0, dtype=np.int64)
+            final = final[final < settled]
+            parts, fetched = [stored] if stored is not None else [], 0
+            for low, high in missing:
+                low, high = self._overlapping(low, high, final, intraday)
+                data = self.fetcher(ticker, pd.Timestamp(low), pd.Timestamp(high), interval)
+                self.logger.info(f"📥 {ticker} {interval}: {len(data)} bar(s) for "
+                                 f"{pd.Timestamp(low)} -> {pd.Timestamp(high)}")
+                if stored is not None and rebased(stored, data, settled):
+                    self.logger.warning(f"⚠️ {ticker} {interval}: stored prices differ from the provider's "
+                                        f"(split or dividend?), downloading {start} -> {pd.Timestamp(end_ns)} again")
+                    data = self.fetcher(ticker, start, pd.Timestamp(end_ns), interval)
+                    parts, fetched, covered = [data], len(data), []  # ✅ Older stored ranges are on the old basis
+                    break
+                parts.append(data)
+                fetched += len(data)
+
+            self._save(ticker, interval, combine(parts), covered + [(start_ns, end_ns)], now.value)
+            return fetched
+
+    @staticmethod
+    def _overlapping(low, high, final, intraday):
+        """[low, high) widened to the nearest final stored bar when it contains none, so downloads can be checked."""
+        if not len(final) or ((final >= low) & (final < high)).any():
+            return low, high
+        before, after = final[final < low], final[final >= high]
+        if len(before):
+            return int(before[-1]), high
+        if len(after):
+            return low, int(after[0]) + pd.Timedelta(minutes=1 if intraday else 1440).value  # End is exclusive
+        return low, high
+
+    def get(self, ticker, start=None, end=None, period=None, interval="1d", auto_adjust=False):
+        """Bars for a ticker like yf.download(ticker, ...) with flat columns, served from disk when possible."""
+        try:
+            self.refresh(ticker, start, end, period, interval)
+        except Exception as e:
+            self.logger.error(f"❌ Could not refresh {ticker} {interval}, serving stored bars: {e}")
+
+        data = self.load(ticker, interval)
+        if data is None:
+            return pd.DataFrame(columns=list(COLUMNS[:4]) + ["Volume"])
+        first, last = self._range(start, end, period, pd.Timestamp.now().floor("s"))
+        index = data.index.tz_localize(None) if data.index.tz is not None else data.index  # Exchange time
+        keep = index >= first
+        if end is not None:
+            keep &= index < last  # ✅ Open ended: the local clock may be behind the exchange's
+        data = data[keep]
+        return adjust(data) if auto_adjust else data
+
+    def get_many(self, tickers, start=None, end=None, period=None, interval="1d", auto_adjust=False):
+        """{ticker: bars} like get() for each ticker, refreshed `max_workers` tickers at a time."""
+        return fetch_many(self.get, tickers, max_workers=self.max_workers, start=start, end=end, period=period,
+                          interval=interval, auto_adjust=auto_adjust)
+
+
+def combine(parts):
+    """Concatenate bar frames in one timezone; for duplicated timestamps the last part wins (revised bars)."""
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame(columns=list(COLUMNS), index=pd.DatetimeIndex([], name="Date"))
+    tz = next((part.index.tz for part in parts if part.index.tz is not None), None)
+    if tz is not None:
+        parts = [part.tz_convert(tz) if part.index.tz is not None else part.tz_localize(tz) for part in parts]
+    combined = pd.concat(parts)
+    return combined[~combined.index.duplicated(keep="last")].sort_index()
+
+
+def adjust(data):
+    """Adjusted OHLC from unadjusted bars and "Adj Close" (what yf.download(auto_adjust=True) returns)."""
+    if "Adj Close" not in data.columns:
+        return data
+    ratio = data["Adj Close"] / data["Close"]
+    adjusted = data.drop(columns=["Adj Close"])
+    for column in ("Open", "High", "Low", "Close"):
+        if column in adjusted.columns:
+            adjusted[column] = data[column] * ratio
+    return adjusted
+
@@ -0,0 +1,261 @@
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+# Streaming versions of StrategyAgent.calculate_indicators (SMA_50, SMA_200,
+# RSI, ATR, MACD and its signal line). Each ticker keeps ring buffers of the
+# last closes, gains, losses and true ranges with their running sums, and
+# the three EMAs of MACD, so a new bar costs the same however long the
+# history is. Fed the same bars, the values equal the last row of the pandas
+# implementation (MACD is 0 until `slow` bars were seen, RSI is 50 while
+# undefined). Running sums are recomputed from the rings once per ring
+# length, so rounding errors cannot accumulate.
+#
+# The most recent bar can be revised (e.g. today's partial daily bar): the
+# state it replaced is kept so the bar is applied again instead of twice.
+# Providers also revise earlier bars (the history store downloads the last
+# days again): when a bar the rings still hold comes back with another close
+# or true range, the ticker starts over from the frame.
+#
+# sync() keeps each ticker's state to the frame it is given, so the values
+# always equal calculate_indicators on that frame: when the frame's first bar
+# changes (a sliding window such as the last 60 days), the ticker starts over
+# from it. Bars of the same window cost O(1); a slide costs one pass over the
+# frame. With full_history=True the state keeps every bar seen instead (SMA_200
+# and the EMAs then cover more than the frame).
+
+NAN = float("nan")
+
+
+class IndicatorState:
+    """Indicators of one ticker, updated in O(1) per bar."""
+
+    def __init__(self, sma_windows=(50, 200), rsi_period=14, atr_period=14, macd=(12, 26, 9)):
+        self.sma_windows = tuple(sma_windows)
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.macd = tuple(macd)
+        self.alphas = tuple(2.0 / (span + 1) for span in self.macd)
+        self.size = max(max(self.sma_windows), rsi_period, atr_period)
+
+        self.closes = [0.0] * self.size
+        self.gains = [0.0] * self.size
+        self.losses = [0.0] * self.size
+        self.ranges = [0.0] * self.size
+        self.count = 0
+        self.first_time = None  # ns timestamps of the first and last bars, for IndicatorEngine.sync
+        self.last_time = None
+        self.prev_close = NAN
+        self.sma_sums = [0.0] * len(self.sma_windows)
+        self.gain_sum = self.loss_sum = self.range_sum = 0.0
+        self.ema_fast = self.ema_slow = self.ema_signal = 0.0
+        self.undo = None  # State before the last bar: (scalars, overwritten ring values)
+
+    def _scalars(self):
+        return (self.count, self.last_time, self.prev_close, list(self.sma_sums), self.gain_sum, self.loss_sum,
+                self.range_sum, self.ema_fast, self.ema_slow, self.ema_signal)
+
+    def update(self, high, low, close, timestamp=None):
+        """Add a bar; return the indicator values after it."""
+        count = self.count
+        slot = count % self.size
+        self.undo = (self._scalars(), (self.closes[slot], self.gains[slot], self.losses[slot], self.ranges[slot]))
+
+        if count == 0:
+            self.first_time = timestamp
+            true_range, gain, loss = high - low, 0.0, 0.0
+        else:
+            previous = self.prev_close
+            true_range = max(high - low, abs(high - previous), abs(low - previous))
+            delta = close - previous
+            gain, loss = (delta, 0.0) if delta > 0 else (0.0, -delta if delta < 0 else 0.0)
+
+        # ✅ Read the values leaving each window before the slot is overwritten
+        for i, window in enumerate(self.sma_windows):
+            self.sma_sums[i] += close - (self.closes[(count - window) % self.size] if count >= window else 0.0)
+        rsi, atr = self.rsi_period, self.atr_period
+        self.gain_sum += gain - (self.gains[(count - rsi) % self.size] if count >= rsi else 0.0)
+        self.loss_sum += loss - (self.losses[(count - rsi) % self.size] if count >= rsi else 0.0)
+        self.range_sum += true_range - (self.ranges[(count - atr) % self.size] if count >= atr else 0.0)
+        self.closes[slot], self.gains[slot], self.losses[slot], self.ranges[slot] = close, gain, loss, true_range
+
+        fast, slow, signal = self.alphas
+        if count == 0:
+            self.ema_fast = self.ema_slow = close
+            self.ema_signal = 0.0
+        else:
+            self.ema_fast += fast * (close - self.ema_fast)
+            self.ema_slow += slow * (close - self.ema_slow)
+            self.ema_signal += signal * (self.ema_fast - self.ema_slow - self.ema_signal)
+
+        self.count = count + 1
+        self.prev_close = close
+        self.last_time = timestamp
+        if slot == self.size - 1:
+            self._resum()
+        return self.values()
+
+    def revise(self, high, low, close, timestamp=None):
+        """Replace the last bar (same timestamp, new values); return the indicator values after it."""
+        if self.undo is None:
+            raise ValueError("No bar to revise")
+        scalars, ring_values = self.undo
+        (self.count, self.last_time, self.prev_close, self.sma_sums, self.gain_sum, self.loss_sum, self.range_sum,
+         self.ema_fast, self.ema_slow, self.ema_signal) = scalars
+        slot = self.count % self.size
+        self.closes[slot], self.gains[slot], self.losses[slot], self.ranges[slot] = ring_values
+        return self.update(high, low, close, timestamp)
+
+    def _resum(self):
+        """Recompute the running sums from the rings (once per ring length: amortized O(1))."""
+        count, size = self.count, self.size
+
+        def window_sum(ring, window):
+            return math.fsum(ring[(count - 1 - back) % size] for back in range(min(window, count)))
+
+        self.sma_sums = [window_sum(self.closes, window) for window in self.sma_windows]
+        self.gain_sum = window_sum(self.gains, self.rsi_period)
+        self.loss_sum = window_sum(self.losses, self.rsi_period)
+        self.range_sum = window_sum(self.ranges, self.atr_period)
+
+    def values(self):
+        """{"SMA_50", "SMA_200", "RSI", "ATR", "MACD", "MACD_signal"} after the last bar (NaN while undefined)."""
+        count = self.count
+        values = {f"SMA_{window}": total / window if count >= window else NAN
+                  for window, total in zip(self.sma_windows, self.sma_sums)}
+
+        rsi = 50.0  # ✅ Neutral while undefined, like calculate_rsi's fillna(50)
+        if count >= self.rsi_period and self.loss_sum > 0:
+            rsi = 100 - 100 / (1 + self.gain_sum / self.loss_sum)
+        values["RSI"] = rsi
+        values["ATR"] = self.range_sum / self.atr_period if count >= self.atr_period else NAN
+
+        macd = self.ema_fast - self.ema_slow
+        enough = count >= self.macd[1]  # ✅ calculate_macd returns zeros below `slow` bars
+        values["MACD"] = macd if enough else 0.0
+        values["MACD_signal"] = self.ema_signal if enough else 0.0
+        return values
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in (
+            "sma_windows", "rsi_period", "atr_period", "macd", "closes", "gains", "losses", "ranges", "count",
+            "first_time", "last_time", "prev_close", "sma_sums", "gain_sum", "loss_sum", "range_sum", "ema_fast", "ema_slow",
+            "ema_signal", "undo")}
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data["sma_windows"], data["rsi_period"], data["atr_period"], data["macd"])
+        for name, value in data.items():
+            if name not in ("sma_windows", "rsi_period", "atr_period", "macd"):
+                setattr(state, name, value)
+        if state.undo is not None:
+            state.undo = (tuple(state.undo[0]), tuple(state.undo[1]))
+        return state
+
+
+def bar_times(data):
+    """ns timestamps of a bar frame's rows (its DatetimeIndex, else its "Date" column)."""
+    if isinstance(data.index, pd.DatetimeIndex):
+        return data.index.as_unit("ns").asi8
+    return pd.DatetimeIndex(pd.to_datetime(data["Date"])).as_unit("ns").asi8
+
+
+class IndicatorEngine:
+    """IndicatorState per ticker, kept in step with bar frames, with checkpoint/restore."""
+
+    def __init__(self, full_history=False, **params):
+        self.full_history = full_history  # Keep bars from before the frame's first one
+        self.params = params  # IndicatorState arguments
+        self.states = {}
+
+    def warm_start(self, ticker, data):
+        """Start a ticker over from a bar frame (High, Low, Close); return the latest values."""
+        self.states[ticker] = IndicatorState(**self.params)
+        return self._feed(ticker, data, 0)
+
+    def update(self, ticker, high, low, close, timestamp=None):
+        """Add one bar to a ticker; return the latest values."""
+        state = self.states.get(ticker)
+        if state is None:
+            state = self.states[ticker] = IndicatorState(**self.params)
+        return state.update(high, low, close, timestamp)
+
+    def sync(self, ticker, data):
+        """Bring a ticker up to date with a bar frame: only bars after the last one seen are added
+        (the last one is revised). Starts over when the frame does not reach back to it, revised
+        an earlier bar or (without full_history) starts at another bar than the state."""
+        state = self.states.get(ticker)
+        if state is None or state.last_time is None or data.empty:
+            return self.warm_start(ticker, data)
+        times = bar_times(data)
+        if not self.full_history and times[0] != state.first_time:
+            return self.warm_start(ticker, data)  # ✅ The window slid: values of exactly this frame
+        position = int(np.searchsorted(times, state.last_time))
+        if position == len(times) or times[position] != state.last_time or not self._agrees(state, data, position):
+            return self.warm_start(ticker, data)
+
+        high, low, close = (float(data[column].iloc[position]) for column in ("High", "Low", "Close"))
+        state.revise(high, low, close, state.last_time)
+        return self._feed(ticker, data, position + 1)
+
+    @staticmethod
+    def _agrees(state, data, position):
+        """Whether the frame's bars before `position` (the state's last bar) that the rings still hold
+        have the closes and true ranges the state was fed."""
+        overlap = min(position, min(state.count, state.size) - 1)
+        if overlap <= 0:
+            return True
+        start = position - overlap
+        slots = (state.count - 1 - np.arange(overlap, 0, -1)) % state.size
+        close = data["Close"].to_numpy(dtype=np.float64)
+        if not np.allclose(close[start:position], np.asarray(state.closes)[slots], rtol=1e-12, atol=0.0,
+                           equal_nan=True):
+            return False
+
+        # ✅ A true range needs the previous close: the frame's first row is only checked by its close
+        begin = max(start, 1)
+        high = data["High"].to_numpy(dtype=np.float64)[begin:position]
+        low = data["Low"].to_numpy(dtype=np.float64)[begin:position]
+        previous = close[begin - 1:position - 1]
+        ranges = np.maximum(high - low, np.maximum(np.abs(high - previous), np.abs(low - previous)))
+        return np.allclose(ranges, np.asarray(state.ranges)[slots[begin - start:]], rtol=1e-12, atol=0.0,
+                           equal_nan=True)
+
+    def _feed(self, ticker, data, start):
+        state = self.states[ticker]
+        times = bar_times(data)[start:].tolist()
+        values = state.values() if state.count else None
+        for high, low, close, timestamp in zip(data["High"].to_numpy()[start:].tolist(),
+                                               data["Low"].to_numpy()[start:].tolist(),
+                                               data["Close"].to_numpy()[start:].tolist(), times):
+            values = state.update(high, low, close, timestamp)
+        return values
+
+    def latest(self, ticker):
+        state = self.states.get(ticker)
+        return state.values() if state is not None and state.count else None
+
+    def checkpoint(self, path):
+        """Write every ticker's state to a JSON file (atomically replaced)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary = f"{path}.{os.getpid()}"
+        with open(temporary, "w") as file:
+            json.dump({"params": self.params,
+                       "states": {ticker: state.to_dict() for ticker, state in self.states.items()}}, file)
+        os.replace(temporary, path)
+
+    @classmethod
+    def restore(cls, path, full_history=False, **params):
+        """Engine from a checkpoint; an empty engine when the file is missing or has other parameters."""
+        engine = cls(full_history, **params)
+        try:
+            with open(path, "r") as file:
+                saved = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return engine
+        if saved.get("params") == json.loads(json.dumps(params)):
+            engine.states = {ticker: IndicatorState.from_dict(state) for ticker, state in saved["states"].items()}
+        return engine
@@ -1,6 +1,6 @@
 import logging
+import os
 import sys
-import requests
 import json
 
 class Logger:
@@ -43,6 +43,8 @@ class Logger:
 
     def send_to_loki(self, level, message, log_entry):
         """ Envía los logs a Loki en formato JSON """
+        import requests  # Importación diferida: solo se carga al enviar a Loki
+
         payload = {
             "streams": [
                 {
@@ -69,3 +71,26 @@ def get_logger(module_name):
         return backtest_logger
     else:
         return Logger(module_name)
+
+def setup_logger(name="ai_trading_bot", log_file=None, level=logging.INFO):
+    """ Devuelve un logger estándar con salida a consola y, opcionalmente, a archivo """
+    logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger  # Ya configurado (evita handlers duplicados)
+
+    logger.setLevel(level)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    logger.addHandler(console_handler)
+
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
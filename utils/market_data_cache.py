@@ -0,0 +1,198 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+try:
+    from prometheus_client import Counter
+except ImportError:  # prometheus_client is optional: counters are still kept in memory
+    Counter = None
+
+# In-memory cache of historical bars for the strategy agents. An entry is
+# fresh until the bar in progress when it was fetched closes (plus a grace
+# delay for the provider to publish it). After that it is still served for
+# `max_stale` seconds while one background refresh replaces it; later reads
+# wait for a new download. Entries are evicted least recently used once the
+# cached frames exceed `max_bytes`.
+
+COUNTERS = {
+    "hits": "Reads served from fresh cached bars",
+    "stale_hits": "Reads served from expired bars while they are refreshed",
+    "misses": "Reads that waited for a download",
+    "evictions": "Entries dropped to stay within the memory budget",
+    "refreshes": "Background refreshes completed",
+    "refresh_errors": "Background refreshes that failed (the stale bars are kept)",
+}
+INTRADAY = re.compile(r"^(\d+)(m|h)$")
+
+
+def next_bar_close(interval, now, exchange_tz="America/New_York", session=("09:30", "16:00")):
+    """When the bar of `interval` in progress at `now` closes on the exchange (weekends skipped).
+
+    Intraday bars start at the session open and the last one is cut at the
+    close; daily and longer bars close with the session.
+    """
+    local = now.tz_convert(exchange_tz) if now.tzinfo else now.tz_localize(exchange_tz)
+    session_open, session_close = (pd.Timedelta(f"{value}:00") for value in session)
+    match = INTRADAY.match(interval)
+    step = pd.Timedelta(**{"minutes" if match.group(2) == "m" else "hours": int(match.group(1))}) if match else None
+
+    local = local.tz_localize(None)  # ✅ Exchange wall clock: sessions keep their hours across DST changes
+    day = local.normalize()
+    for _ in range(8):
+        if day.weekday() < 5:
+            opens, closes = day + session_open, day + session_close
+            if local < closes:
+                if step is None:
+                    return closes.tz_localize(exchange_tz)
+                bars = (local - opens) // step + 1 if local >= opens else 1
+                return min(opens + bars * step, closes).tz_localize(exchange_tz)
+        day += pd.Timedelta(days=1)
+    raise ValueError(f"No session close found after {now}")
+
+
+class MarketDataCache:
+    """Bars per (ticker, period, interval, auto_adjust), expiring at bar close, LRU within a memory budget.
+
+    Returned frames are shared with the cache: callers must not modify them in place.
+    """
+
+    _prometheus = {}
+
+    def __init__(self, loader=None, max_bytes=64 * 1024 * 1024, max_stale=3600, grace=60,
+                 exchange_tz="America/New_York", session=("09:30", "16:00"), workers=2, name="market_data",
+                 clock=time.time, logger=None):
+        self.loader = loader or load_history
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale  # Seconds past expiry that bars are served while refreshing
+        self.grace = grace  # Seconds after a bar close before the provider is expected to have it
+        self.exchange_tz = exchange_tz
+        self.session = tuple(session)
+        self.name = name
+        self.clock = clock
+        self.logger = logger or logging.getLogger("MarketDataCache")
+
+        self.entries = OrderedDict()  # key -> (data, bytes, expires_at); most recently used last
+        self.bytes = 0
+        self.loading = {}  # key -> Future of the download in progress
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-refresh")
+
+        if Counter is not None and not MarketDataCache._prometheus:
+            for counter, description in COUNTERS.items():
+                MarketDataCache._prometheus[counter] = Counter(f"ai_trading_cache_{counter}", description, ["cache"])
+
+    @classmethod
+    def from_settings(cls, settings, **kwargs):
+        """Cache configured by a `market_data.cache` section of config.yml (may be None)."""
+        options = dict(settings or {})
+        options.update(kwargs)
+        return cls(**options)
+
+    def _count(self, counter, amount=1):
+        with self.lock:
+            self.counts[counter] += amount
+        if counter in MarketDataCache._prometheus:
+            MarketDataCache._prometheus[counter].labels(cache=self.name).inc(amount)
+
+    def expires_at(self, interval, fetched_at):
+        # ✅ Fetched within `grace` of a close: the provider may not have that bar yet, so expire at it again
+        close = next_bar_close(interval, pd.Timestamp(fetched_at - self.grace, unit="s", tz="UTC"),
+                               self.exchange_tz, self.session)
+        return close.timestamp() + self.grace
+
+    def get(self, ticker, period=None, interval="1d", auto_adjust=False, start=None, end=None):
+        """Bars like get_history(...), from the cache when they are still current."""
+        key = (ticker, period, interval, auto_adjust, start, end)
+        now = self.clock()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        if entry is not None:
+            data, _, expires_at = entry
+            if now < expires_at:
+                self._count("hits")
+                return data
+            if now < expires_at + self.max_stale:
+                self._count("stale_hits")
+                self._load(key, background=True)
+                return data
+        self._count("misses")
+        return self._load(key).result()
+
+    def _load(self, key, background=False):
+        """Download `key` once however many readers ask for it meanwhile; return the download's Future."""
+        with self.lock:
+            future = self.loading.get(key)
+            if future is not None:
+                return future
+            future = self.loading[key] = Future()
+        if background:
+            self.pool.submit(self._fetch, key, future, True)
+        else:
+            self._fetch(key, future, False)
+        return future
+
+    def _fetch(self, key, future, background):
+        ticker, period, interval, auto_adjust, start, end = key
+        fetched_at = self.clock()
+        try:
+            data = self.loader(ticker, period=period, interval=interval, auto_adjust=auto_adjust, start=start,
+                               end=end)
+            if data is not None and not data.empty:
+                self.put(key, data, self.expires_at(interval, fetched_at))
+            if background:
+                self._count("refreshes")
+            future.set_result(data)
+        except Exception as e:
+            if background:
+                self._count("refresh_errors")
+                self.logger.warning(f"⚠️ Background refresh of {ticker} {interval} failed, keeping stale bars: {e}")
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                self.loading.pop(key, None)
+
+    def put(self, key, data, expires_at):
+        size = int(data.memory_usage(index=True, deep=True).sum())
+        evicted = 0
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            if size > self.max_bytes:
+                self.logger.warning(f"⚠️ {key[0]} {key[2]} bars ({size} bytes) exceed the cache budget, not cached")
+                return
+            self.entries[key] = (data, size, expires_at)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, dropped, _) = self.entries.popitem(last=False)
+                self.bytes -= dropped
+                evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def invalidate(self, ticker=None):
+        """Drop the cached bars of a ticker (all tickers by default)."""
+        with self.lock:
+            for key in [key for key in self.entries if ticker is None or key[0] == ticker]:
+                self.bytes -= self.entries.pop(key)[1]
+
+    def stats(self):
+        """Counters plus current size: {"hits": ..., "entries": ..., "bytes": ...}."""
+        with self.lock:
+            return {**self.counts, "entries": len(self.entries), "bytes": self.bytes}
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def load_history(ticker, period=None, interval="1d", auto_adjust=False, start=None, end=None):
+    from utils.data_providers import get_history  # ✅ Deferred: only needed on a cache miss
+    return get_history(ticker, start=start, end=end, period=period, interval=interval, auto_adjust=auto_adjust)
@@ -0,0 +1,225 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    from prometheus_client import Counter
+except ImportError:  # prometheus_client is optional: counters are still kept in memory
+    Counter = None
+
+# Trained PPO policies (models/{ticker}_ppo.zip), each loaded once per process
+# and shared by every agent that asks for it. A file is stat'ed at most every
+# `check_interval` seconds: when its mtime changed the model is reloaded in
+# place (the previous one is kept if the new file fails to load). Models are
+# evicted least recently used beyond `max_models` or `max_bytes` of
+# parameters. A file that fails to load is not retried until it changes.
+
+COUNTERS = {
+    "hits": "Models served from memory",
+    "loads": "Models loaded from disk",
+    "reloads": "Models reloaded because their file changed",
+    "load_errors": "Model files that failed to load",
+    "evictions": "Models dropped to stay within the count or memory budget",
+}
+
+
+def load_ppo(path):
+    from stable_baselines3 import PPO  # ✅ Deferred: torch takes seconds to import
+    return PPO.load(path, device="cpu")
+
+
+def load_numpy_policy(path):
+    from utils.numpy_policy import NumpyPolicy
+    return NumpyPolicy.load(path)
+
+
+FORMATS = {
+    "sb3": ("{ticker}_ppo.zip", load_ppo),  # stable-baselines3 PPO (imports torch)
+    "numpy": ("{ticker}_ppo.npz", load_numpy_policy),  # Exported by scripts/export_policy.py (no torch)
+}
+
+
+def model_bytes(model, path=None):
+    """Bytes held by a model's parameters (the file size for models that are neither torch nor NumPy)."""
+    if hasattr(model, "weights") and hasattr(model, "biases"):
+        return sum(array.nbytes for array in model.weights + model.biases)
+    try:
+        return sum(p.numel() * p.element_size() for p in model.policy.parameters())
+    except AttributeError:
+        return os.path.getsize(path) if path else 0
+
+
+class ModelRegistry:
+    """Models per ticker, loaded once, reloaded when their file changes, LRU within count and memory budgets.
+
+    Returned models are shared: callers must not train or modify them.
+    """
+
+    _prometheus = {}
+
+    def __init__(self, root="models", format="sb3", pattern=None, loader=None, max_models=16,
+                 max_bytes=512 * 1024 * 1024, check_interval=5.0, workers=4, preload=(), name="models",
+                 clock=time.monotonic, logger=None):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown model format {format!r}: expected one of {', '.join(FORMATS)}")
+        self.root = root
+        self.format = format
+        self.pattern = pattern or FORMATS[format][0]
+        self.loader = loader or FORMATS[format][1]
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval  # Seconds between mtime checks of a cached model's file
+        self.workers = workers
+        self.preload_tickers = list(preload or ())
+        self.name = name
+        self.clock = clock
+        self.logger = logger or logging.getLogger("ModelRegistry")
+
+        self.entries = OrderedDict()  # ticker -> [model, bytes, mtime, checked_at]; most recently used last
+        self.bytes = 0
+        self.failed = {}  # ticker -> mtime of the file that failed to load
+        self.loading = {}  # ticker -> Future of the load in progress
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.lock = threading.Lock()
+
+        if Counter is not None and not ModelRegistry._prometheus:
+            for counter, description in COUNTERS.items():
+                ModelRegistry._prometheus[counter] = Counter(f"ai_trading_models_{counter}", description, ["registry"])
+
+    @classmethod
+    def from_settings(cls, settings, **kwargs):
+        """Registry configured by the `models` section of config.yml (may be None)."""
+        options = dict(settings or {})
+        options.update(kwargs)
+        return cls(**options)
+
+    def _count(self, counter, amount=1):
+        with self.lock:
+            self.counts[counter] += amount
+        if counter in ModelRegistry._prometheus:
+            ModelRegistry._prometheus[counter].labels(registry=self.name).inc(amount)
+
+    def path(self, ticker):
+        return os.path.join(self.root, self.pattern.format(ticker=ticker))
+
+    def get(self, ticker):
+        """The model of a ticker, or None when its file is missing or does not load."""
+        now = self.clock()
+        with self.lock:
+            entry = self.entries.get(ticker)
+            if entry is not None:
+                self.entries.move_to_end(ticker)
+        if entry is not None and now - entry[3] < self.check_interval:
+            self._count("hits")
+            return entry[0]
+
+        path = self.path(ticker)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            if entry is None and ticker not in self.failed:
+                self.logger.error(f"❌ Model not found: {path}")
+            self.failed[ticker] = None
+            self.drop(ticker)
+            return None
+
+        if entry is not None and entry[2] == mtime:
+            entry[3] = now
+            self._count("hits")
+            return entry[0]
+        if entry is None and ticker in self.failed and self.failed[ticker] == mtime:
+            return None  # Same broken file: not retried until it changes
+        return self._load(ticker, path, mtime, reload=entry is not None).result()
+
+    def _load(self, ticker, path, mtime, reload=False):
+        """Load a ticker's model once however many callers ask for it meanwhile; return the load's Future."""
+        with self.lock:
+            future = self.loading.get(ticker)
+            if future is not None:
+                return future
+            future = self.loading[ticker] = Future()
+        try:
+            model = self.loader(path)
+            self.put(ticker, model, model_bytes(model, path), mtime)
+            self.failed.pop(ticker, None)
+            self._count("reloads" if reload else "loads")
+            self.logger.info(f"📥 {'Reloaded' if reload else 'Loaded'} Model: {path}")
+            future.set_result(model)
+        except Exception as e:
+            self._count("load_errors")
+            self.failed[ticker] = mtime
+            with self.lock:
+                entry = self.entries.get(ticker)
+                if entry is not None:
+                    entry[2], entry[3] = mtime, self.clock()  # ✅ Keep serving the previous model
+            previous = entry[0] if entry is not None else None
+            self.logger.error(f"❌ Model Load Error ({path}): {e}"
+                              + ("; keeping the previous model" if previous is not None else ""))
+            future.set_result(previous)
+        finally:
+            with self.lock:
+                self.loading.pop(ticker, None)
+        return future
+
+    def put(self, ticker, model, size, mtime):
+        evicted = 0
+        with self.lock:
+            previous = self.entries.pop(ticker, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self.entries[ticker] = [model, size, mtime, self.clock()]
+            self.bytes += size
+            while len(self.entries) > 1 and (len(self.entries) > self.max_models or self.bytes > self.max_bytes):
+                _, dropped = self.entries.popitem(last=False)
+                self.bytes -= dropped[1]
+                evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def preload(self, tickers=None):
+        """Load many models in parallel (the configured `preload` tickers by default); return {ticker: model}."""
+        tickers = list(dict.fromkeys(tickers if tickers is not None else self.preload_tickers))
+        if not tickers:
+            return {}
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(tickers))),
+                                thread_name_prefix=f"{self.name}-preload") as pool:
+            models = dict(zip(tickers, pool.map(self.get, tickers)))
+        loaded = sum(model is not None for model in models.values())
+        self.logger.info(f"📦 Preloaded {loaded}/{len(tickers)} models in {time.perf_counter() - started:.2f}s")
+        return models
+
+    def drop(self, ticker):
+        with self.lock:
+            entry = self.entries.pop(ticker, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+
+    def invalidate(self, ticker=None):
+        """Forget the models of a ticker (all tickers by default); they are loaded again on next use."""
+        with self.lock:
+            for key in [key for key in self.entries if ticker is None or key == ticker]:
+                self.bytes -= self.entries.pop(key)[1]
+            for key in [key for key in self.failed if ticker is None or key == ticker]:
+                del self.failed[key]
+
+    def stats(self):
+        """Counters plus current size: {"hits": ..., "models": ..., "bytes": ...}."""
+        with self.lock:
+            return {**self.counts, "models": len(self.entries), "bytes": self.bytes}
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_registry(settings=None):
+    """The process-wide registry (created from a `models` config section on first use)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ModelRegistry.from_settings(settings)
+        return _shared
@@ -0,0 +1,217 @@
+import base64
+import io
+import json
+import os
+import pickle
+import re
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+# PPO policies without torch. export_policy() reads a stable-baselines3 zip
+# (models/{ticker}_ppo.zip) directly: the spaces and policy_kwargs from its
+# "data" JSON, the weights from "policy.pth" through an unpickler that only
+# rebuilds tensors (no torch import, no arbitrary globals). The actor half
+# of the MlpPolicy (flatten -> policy_net -> action_net) is saved to a .npz
+# file; NumpyPolicy evaluates it in float32 with the same operations as
+# torch (x @ W.T + b, activation, softmax then argmax), so a process running
+# the exported policies never imports stable_baselines3 or torch.
+
+ACTIVATIONS = {
+    "Tanh": np.tanh,
+    "ReLU": lambda x: np.maximum(x, np.float32(0)),
+}
+STORAGES = {
+    "FloatStorage": np.float32,
+    "DoubleStorage": np.float64,
+    "HalfStorage": np.float16,
+    "LongStorage": np.int64,
+    "IntStorage": np.int32,
+    "ShortStorage": np.int16,
+    "CharStorage": np.int8,
+    "ByteStorage": np.uint8,
+    "BoolStorage": np.bool_,
+}
+POLICY_LAYER = re.compile(r"^mlp_extractor\.policy_net\.(\d+)\.(weight|bias)$")
+
+
+def rebuild_tensor(storage, offset, size, stride, *unused):
+    itemsize = storage.itemsize
+    return np.lib.stride_tricks.as_strided(storage[offset:], shape=tuple(size),
+                                           strides=tuple(step * itemsize for step in stride)).copy()
+
+
+def rebuild_parameter(data, *unused):
+    return data
+
+
+class StateDictUnpickler(pickle.Unpickler):
+    """Unpickles a torch state_dict into numpy arrays; any other global is refused."""
+
+    GLOBALS = {
+        ("collections", "OrderedDict"): OrderedDict,
+        ("torch._utils", "_rebuild_tensor_v2"): rebuild_tensor,
+        ("torch._utils", "_rebuild_parameter"): rebuild_parameter,
+    }
+
+    def __init__(self, file, archive, prefix, byteorder):
+        super().__init__(file)
+        self.archive = archive
+        self.prefix = prefix
+        self.byteorder = "<" if byteorder == "little" else ">"
+        self.storages = {}
+
+    def find_class(self, module, name):
+        if (module, name) in self.GLOBALS:
+            return self.GLOBALS[(module, name)]
+        if module == "torch" and name in STORAGES:
+            return STORAGES[name]
+        raise pickle.UnpicklingError(f"Refusing to load {module}.{name} from a policy file")
+
+    def persistent_load(self, pid):
+        kind, dtype, key, _location, _numel = pid
+        if kind != "storage":
+            raise pickle.UnpicklingError(f"Unknown persistent id {kind!r}")
+        if key not in self.storages:
+            stored = np.dtype(dtype).newbyteorder(self.byteorder)
+            raw = self.archive.read(f"{self.prefix}data/{key}")
+            self.storages[key] = np.frombuffer(raw, dtype=stored).astype(np.dtype(dtype))
+        return self.storages[key]
+
+
+def read_state_dict(data):
+    """{name: array} from the bytes of a torch.save'd state_dict (zip format)."""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        pickled = next(name for name in archive.namelist() if name.endswith("data.pkl"))
+        prefix = pickled[:-len("data.pkl")]
+        byteorder = "little"
+        if f"{prefix}byteorder" in archive.namelist():
+            byteorder = archive.read(f"{prefix}byteorder").decode().strip()
+        return dict(StateDictUnpickler(io.BytesIO(archive.read(pickled)), archive, prefix, byteorder).load())
+
+
+def activation_name(policy_kwargs):
+    """Name of the policy's activation (SB3 defaults to Tanh); the class is stored cloudpickled."""
+    activation = policy_kwargs.get("activation_fn")
+    if activation is None:
+        return "Tanh"
+    serialized = base64.b64decode(activation.get(":serialized:", "")) if isinstance(activation, dict) else b""
+    for name in sorted(ACTIVATIONS, key=len, reverse=True):
+        if re.search(rb"[^A-Za-z]" + name.encode() + rb"[^A-Za-z]", serialized):
+            return name
+    raise ValueError(f"Unsupported activation {activation!r}: only {', '.join(ACTIVATIONS)} can be exported")
+
+
+def export_policy(source, target):
+    """Write the actor of a stable-baselines3 PPO zip to a .npz file; return the NumpyPolicy."""
+    with zipfile.ZipFile(source) as archive:
+        data = json.loads(archive.read("data"))
+        state = read_state_dict(archive.read("policy.pth"))
+
+    policy_kwargs = data.get("policy_kwargs") or {}
+    if "features_extractor_class" in policy_kwargs:
+        raise ValueError(f"{source}: only the default FlattenExtractor can be exported")
+    if "n" not in data["action_space"]:
+        raise ValueError(f"{source}: only discrete action spaces can be exported")
+
+    layers = sorted({int(match.group(1)) for match in map(POLICY_LAYER.match, state) if match})
+    arrays = {}
+    for i, layer in enumerate(layers):
+        arrays[f"weight_{i}"] = state[f"mlp_extractor.policy_net.{layer}.weight"].astype(np.float32)
+        arrays[f"bias_{i}"] = state[f"mlp_extractor.policy_net.{layer}.bias"].astype(np.float32)
+    arrays[f"weight_{len(layers)}"] = state["action_net.weight"].astype(np.float32)
+    arrays[f"bias_{len(layers)}"] = state["action_net.bias"].astype(np.float32)
+
+    obs_shape = tuple(data["observation_space"]["_shape"])
+    if int(np.prod(obs_shape)) != arrays["weight_0"].shape[1]:
+        raise ValueError(f"{source}: observation shape {obs_shape} does not match the first layer")
+    policy = NumpyPolicy([arrays[f"weight_{i}"] for i in range(len(layers) + 1)],
+                         [arrays[f"bias_{i}"] for i in range(len(layers) + 1)],
+                         activation_name(policy_kwargs), obs_shape)
+    policy.save(target)
+    return policy
+
+
+class NumpyPolicy:
+    """Deterministic actions of an exported PPO actor, with the predict() signature of stable-baselines3."""
+
+    def __init__(self, weights, biases, activation="Tanh", obs_shape=(50, 3)):
+        self.weights = [np.asarray(weight, dtype=np.float32) for weight in weights]  # (out, in) like nn.Linear
+        self.biases = [np.asarray(bias, dtype=np.float32) for bias in biases]
+        self.transposed = [np.ascontiguousarray(weight.T) for weight in self.weights]
+        self.activation = activation
+        self.activate = ACTIVATIONS[activation]
+        self.obs_shape = tuple(obs_shape)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as saved:
+            count = int(saved["layers"])
+            return cls([saved[f"weight_{i}"] for i in range(count)], [saved[f"bias_{i}"] for i in range(count)],
+                       str(saved["activation"]), tuple(int(size) for size in saved["obs_shape"]))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {f"weight_{i}": weight for i, weight in enumerate(self.weights)}
+        arrays.update({f"bias_{i}": bias for i, bias in enumerate(self.biases)})
+        temporary = f"{path}.{os.getpid()}.npz"
+        np.savez(temporary, layers=len(self.weights), activation=self.activation, obs_shape=self.obs_shape,
+                 **arrays)
+        os.replace(temporary, path)  # ✅ Atomic: a registry reloading on mtime never reads half a file
+
+    def logits(self, observations):
+        """Action logits of a (batch, *obs_shape) array."""
+        x = np.asarray(observations, dtype=np.float32).reshape(len(observations), -1)  # ✅ obs.float(), Flatten
+        last = len(self.weights) - 1
+        for i, (weight, bias) in enumerate(zip(self.transposed, self.biases)):
+            x = x @ weight
+            x += bias
+            if i < last:
+                x = self.activate(x)
+        return x
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        """(actions, None) like PPO.predict; `observation` is one observation or a batch of them."""
+        observation = np.asarray(observation)
+        single = observation.shape == self.obs_shape
+        actions = deterministic_actions(self.logits(observation[None] if single else observation))
+        return (actions[0] if single else actions), None
+
+    def architecture(self):
+        """Key shared by policies that StackedNumpyPolicies can evaluate together."""
+        return type(self).__name__, self.obs_shape, self.activation, tuple(weight.shape for weight in self.weights)
+
+
+class StackedNumpyPolicies:
+    """NumpyPolicies of identical shapes evaluated together with batched matrix products."""
+
+    def __init__(self, models):
+        self.models = tuple(models)
+        self.transposed = [np.stack(layer) for layer in zip(*(model.transposed for model in self.models))]
+        self.biases = [np.stack(layer)[:, None, :] for layer in zip(*(model.biases for model in self.models))]
+        self.activate = self.models[0].activate
+
+    def matches(self, models):
+        return len(models) == len(self.models) and all(a is b for a, b in zip(models, self.models))
+
+    def predict(self, observations):
+        """Actions for a (policies, batch, *obs_shape) array, as a (policies, batch) int array."""
+        observations = np.asarray(observations, dtype=np.float32)
+        x = observations.reshape(observations.shape[0], observations.shape[1], -1)
+        last = len(self.transposed) - 1
+        for i, (weight, bias) in enumerate(zip(self.transposed, self.biases)):
+            x = x @ weight
+            x += bias
+            if i < last:
+                x = self.activate(x)
+        return deterministic_actions(x)
+
+
+def deterministic_actions(logits):
+    """Categorical(logits).probs.argmax(): normalize by logsumexp, softmax, first maximum wins."""
+    peak = logits.max(axis=-1, keepdims=True)
+    logits = logits - (peak + np.log(np.exp(logits - peak).sum(axis=-1, keepdims=True)))
+    probs = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    probs /= probs.sum(axis=-1, keepdims=True)
+    return probs.argmax(axis=-1)